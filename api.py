@@ -1,17 +1,153 @@
 import os
+import logging
 import json
 import datetime
-from fastapi import FastAPI, HTTPException
+import time
+import threading
+import asyncio
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from urllib.parse import unquote
+from snapshot import get_schedule_snapshot, get_day_snapshot, status_bucket, file_version, read_json_file
+from stream import LiveBroadcaster
+from matchdetail import MatchDetailCache
+from refresher import BACKGROUND_REFRESH, BackgroundRefresher, build_jobs
+from archive import find_event_day, KEEP_DAYS
+from httpcache import cached_json, body_response, CachedBody
+from packed import SHARED_SNAPSHOT, get_packed_snapshot
+from store import open_store
+from standings import StandingsTable, compute_standings, standings_feed
+from search import NameIndex, AmbiguousName, fold
+from metrics import registry, CONTENT_TYPE
 
 app = FastAPI(title="Goal2GolScoresandFixtures API")
 
 DATA_FOLDER = "data"
 SCHEDULES_FOLDER = os.path.join(DATA_FOLDER, "schedules")
 STANDINGS_FOLDER = os.path.join(DATA_FOLDER, "standings")
-MATCHES_FOLDER = os.path.join(DATA_FOLDER, "matches")
 SEASON_FIXTURES_FOLDER = os.path.join(DATA_FOLDER, "season_fixtures")
 LEAGUE_FIXTURES_FOLDER = os.path.join(DATA_FOLDER, "league_fixtures")
+TEAM_INDEX_FILE = os.path.join(DATA_FOLDER, "team_index.json")
+NAME_INDEX_FILE = os.path.join(DATA_FOLDER, "name_index.json")
+
+# groups /api/scores can return, selected with ?include=
+SCORE_GROUPS = ("live", "fixtures", "all")
+# groups each /api/scores contract version returns without ?include=: v=1 is the original
+# live/fixtures/all triple, v=2 (the default) returns each match once
+SCORES_VERSION_GROUPS = {1: ("live", "fixtures", "all"), 2: ("all",)}
+LEAGUES_KEY = ("leagues",)
+
+# Cache-Control max-age per kind of data, in seconds
+LIVE_MAX_AGE = 15
+FIXTURES_MAX_AGE = 300
+STANDINGS_MAX_AGE = 300
+ARCHIVE_MAX_AGE = 3600
+
+# seconds between refreshes of the details of live matches; 0 turns warming off
+MATCH_WARM_INTERVAL = int(os.environ.get("GOAL2GOL_MATCH_WARM_INTERVAL", "10"))
+# at most this many live matches are kept warm
+MATCH_WARM_LIMIT = 200
+
+# widest date range /api/results will scan
+MAX_RESULTS_DAYS = 31
+DATE_PATTERN = r"^\d{8}$"
+
+REQUEST_SECONDS = registry.histogram(
+    "goal2gol_http_request_duration_seconds", "Time until response headers, per route", ("route", "method", "status")
+)
+LIVE_SUBSCRIBERS = registry.gauge("goal2gol_live_stream_subscribers", "Open /api/live/stream connections")
+
+live_broadcaster = LiveBroadcaster()
+match_details = MatchDetailCache()
+store = open_store()
+
+class RequestMetrics:
+    # plain ASGI wrapper: labels by route template, not raw path, so /api/fixtures/{league_name} is one series
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                route = scope.get("route")
+                REQUEST_SECONDS.observe(
+                    time.perf_counter() - started,
+                    route=getattr(route, "path", "unmatched"), method=scope["method"], status=status[0],
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+app.add_middleware(RequestMetrics)
+
+@app.on_event("startup")
+async def start_live_broadcaster():
+    # with several workers only those serving live stream clients keep a parsed schedule
+    if not SHARED_SNAPSHOT:
+        live_broadcaster.start()
+
+@app.on_event("shutdown")
+async def stop_live_broadcaster():
+    await live_broadcaster.stop()
+
+_refresher = None
+
+@app.on_event("startup")
+async def start_background_refresh():
+    global _refresher
+    if BACKGROUND_REFRESH:
+        try:
+            _refresher = BackgroundRefresher(build_jobs(), after_run=warm_caches)
+        except Exception:
+            logging.exception("Background refresh disabled, the scraper could not be loaded")
+            return
+        _refresher.start()
+
+@app.on_event("shutdown")
+async def stop_background_refresh():
+    if _refresher is not None:
+        _refresher.stop()
+
+def warm_caches(job):
+    # rebuilt on the refresh thread, so the first request after a refresh finds them ready
+    if SHARED_SNAPSHOT:
+        get_packed_snapshot()
+    else:
+        get_schedule_snapshot()
+    if job != "live":
+        get_name_index()
+        load_json_cached(TEAM_INDEX_FILE)
+
+_match_warmer = None
+
+@app.on_event("startup")
+async def start_match_warmer():
+    global _match_warmer
+    if MATCH_WARM_INTERVAL > 0:
+        _match_warmer = asyncio.get_running_loop().create_task(warm_live_matches())
+
+@app.on_event("shutdown")
+async def stop_match_warmer():
+    if _match_warmer is not None:
+        _match_warmer.cancel()
+
+async def warm_live_matches():
+    # live match details are refetched just before they expire, so requests for them are hits
+    while True:
+        try:
+            match_ids = (await asyncio.to_thread(live_match_ids))[:MATCH_WARM_LIMIT]
+            await asyncio.to_thread(match_details.warm, match_ids, MATCH_WARM_INTERVAL)
+        except Exception:
+            logging.exception("Match detail warming failed")
+        await asyncio.sleep(MATCH_WARM_INTERVAL)
 
 # -----------------------------
 # Load JSON
@@ -20,16 +156,154 @@ def load_json_file(path):
     if not os.path.isfile(path):
         return None
     try:
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
+        # labelled by folder: standings, league_fixtures, ...
+        return read_json_file(path, os.path.basename(os.path.dirname(path)) or "data")
     except Exception:
         return None
 
-def get_latest_schedule_file():
-    files = sorted(os.listdir(SCHEDULES_FOLDER))
-    if not files:
+_parsed_files = {}
+
+def load_json_cached(path):
+    # parsed file contents keyed on (name, mtime, size), for files read by several routes
+    try:
+        version = file_version(path)
+    except OSError:
+        return None, None
+    cached = _parsed_files.get(path)
+    if cached is not None and cached[0] == version:
+        return cached
+    data = load_json_file(path)
+    _parsed_files[path] = (version, data)
+    return version, data
+
+def cached_file_response(request, path, max_age, transform=None):
+    # serves a data file from the response cache, re-reading it only when its mtime/size changes
+    try:
+        version = file_version(path)
+    except OSError:
+        return None
+
+    def build():
+        data = load_json_file(path)
+        if not data:
+            return None
+        return transform(data) if transform else data
+
+    return cached_json(request, path, version, build, max_age, last_modified=version[1] // 1_000_000_000)
+
+def cached_team_response(request, team):
+    # slices the team out of its league feed instead of reading a per-team file
+    index_version, index = load_json_cached(TEAM_INDEX_FILE)
+    entry = (index or {}).get(team)
+    if not entry:
+        return None
+    league, name = entry["league"], entry["team"]
+
+    if store is not None:
+        league_version = store.version("league_fixtures", league)
+        build = lambda: store.league_team_fixtures(league, name) or None
+    else:
+        league_version, rows = load_json_cached(os.path.join(LEAGUE_FIXTURES_FOLDER, f"{league}.json"))
+        build = lambda: [r for r in rows or [] if name in (r.get("HomeTeam"), r.get("AwayTeam"))] or None
+    if league_version is None:
+        return None
+    return cached_json(request, ("team", team), (league, name, league_version), build, FIXTURES_MAX_AGE)
+
+def cached_store_response(request, kind, name, read, max_age):
+    # SQLite backend: the per-key version row replaces the file mtime, only the requested rows are read
+    version = store.version(kind, name)
+    if version is None:
+        return None
+    return cached_json(request, (kind, name), ("db", kind, name, version), lambda: read(name) or None, max_age)
+
+def live_match_ids():
+    if SHARED_SNAPSHOT:
+        packed = get_packed_snapshot()
+        if packed is not None:
+            return [str(m["matchId"]) for m in json.loads(packed.rows(packed.group("live")))]
+    snapshot = get_schedule_snapshot()
+    return [str(m["matchId"]) for m in snapshot.live] if snapshot else []
+
+def known_match(match_id):
+    # only ids of the current schedule or the archive reach upstream, so made-up ids cost nothing
+    if SHARED_SNAPSHOT:
+        packed = get_packed_snapshot()
+        if packed is not None and packed.position(match_id) is not None:
+            return True
+    else:
+        snapshot = get_schedule_snapshot()
+        if snapshot is not None and match_id in snapshot.by_match_id:
+            return True
+    # days compacted into the archive are indexed by Eid; the loose days before that are few
+    if find_event_day(match_id) is not None:
+        return True
+    today = datetime.datetime.utcnow().date()
+    for days_back in range(1, KEEP_DAYS + 1):
+        snapshot = get_day_snapshot((today - datetime.timedelta(days=days_back)).strftime("%Y%m%d"))
+        if snapshot is not None and match_id in snapshot.by_match_id:
+            return True
+    return False
+
+_name_index = (None, None)
+
+def get_name_index():
+    # rebuilt in memory (n-grams, word lists) only when the scraper rewrites the index file
+    global _name_index
+    version, data = load_json_cached(NAME_INDEX_FILE)
+    if version is None or not data:
+        return None, None
+    if _name_index[0] != version:
+        _name_index = (version, NameIndex(data))
+    return _name_index
+
+def resolve_name(name, kind, league=None):
+    _, index = get_name_index()
+    if index is None:
+        return None
+    try:
+        entry = index.resolve(unquote(name), kind, league)
+    except AmbiguousName as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": f"'{unquote(name)}' matches several {kind}s, use one of their slugs.", "matches": e.matches},
+        )
+    if entry is not None:
+        logging.info(f"Resolved {kind} '{name}' to '{entry['slug']}'")
+    return entry
+
+_standings_tables = {}
+_standings_lock = threading.Lock()
+
+def cached_standings_response(request, league, as_of_round=None):
+    # tables are computed from the league fixture feed; the full table is kept per league and
+    # only fixtures whose result changed since the last version are re-applied
+    feed = standings_feed(league)
+    if feed is None:
+        return None
+    if store is not None:
+        version = store.version("league_fixtures", feed)
+        read = lambda: store.league_fixtures(feed)
+        last_modified = None
+    else:
+        version, rows = load_json_cached(os.path.join(LEAGUE_FIXTURES_FOLDER, f"{feed}.json"))
+        read = lambda: rows
+        last_modified = version[1] // 1_000_000_000 if version else None
+    if version is None:
         return None
-    return os.path.join(SCHEDULES_FOLDER, files[-1])
+
+    def build():
+        rows = read()
+        if not rows:
+            return None
+        if as_of_round is not None:
+            return compute_standings(rows, as_of_round)
+        with _standings_lock:
+            table = _standings_tables.setdefault(feed, StandingsTable())
+            table.update(rows)
+            return table.rows()
+
+    key = ("standings", feed, as_of_round)
+    return cached_json(request, key, ("computed", feed, version), build, STANDINGS_MAX_AGE, last_modified)
 
 # -----------------------------
 # API Endpoints
@@ -38,81 +312,259 @@ def get_latest_schedule_file():
 def get_root():
     return {"message": "Welcome to the Goal2GolScoresandFixtures API!"}
 
+@app.get("/metrics")
+def get_metrics():
+    LIVE_SUBSCRIBERS.set(len(live_broadcaster.subscribers))
+    # each worker counts for itself: with several, every sample says which one answered the scrape
+    extra = (("worker", str(os.getpid())),) if SHARED_SNAPSHOT else ()
+    return Response(content=registry.render(extra), media_type=CONTENT_TYPE)
+
 @app.get("/api/scores")
-def get_scores():
-    path = get_latest_schedule_file()
-    data = load_json_file(path)
-    if not data:
-        raise HTTPException(status_code=503, detail="Daily match data not ready.")
-    
-    all_matches = []
-    for league in data.get("Stages", []):
-        league_name = league.get("Snm", "Unknown League")
-        league_id = league.get("Cid") or league.get("Sid")
-        for evt in league.get("Events", []):
-            home_team = evt.get("T1")[0].get("Nm", "N/A") if evt.get("T1") else "N/A"
-            away_team = evt.get("T2")[0].get("Nm", "N/A") if evt.get("T2") else "N/A"
-            all_matches.append({
-                "leagueName": league_name,
-                "leagueId": league_id,
-                "homeTeamName": home_team,
-                "awayTeamName": away_team,
-                "matchTime": evt.get("Esd"),
-                "matchStatus": evt.get("Eps"),
-                "homeScore": evt.get("Tr1"),
-                "awayScore": evt.get("Tr2"),
-                "matchId": evt.get("Eid")
-            })
-    
-    live_scores = [m for m in all_matches if m["matchStatus"] not in ["NS", "FT", "Sched", "Cancelled", "Postponed", "Awarded"]]
-    fixtures = [m for m in all_matches if m["matchStatus"] in ["NS", "Sched"]]
-    return {"live": live_scores, "fixtures": fixtures, "all": all_matches}
+def get_scores(
+    request: Request,
+    league: Optional[str] = None,
+    team: Optional[str] = None,
+    status: Optional[str] = None,
+    include: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    date: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    v: int = Query(2, ge=1, le=2),
+):
+    if include is None:
+        groups = list(SCORES_VERSION_GROUPS[v])
+    else:
+        groups = [g.strip() for g in include.split(",") if g.strip()]
+    if not groups or any(g not in SCORE_GROUPS for g in groups):
+        raise HTTPException(status_code=400, detail=f"include must be a comma separated subset of {', '.join(SCORE_GROUPS)}.")
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    if SHARED_SNAPSHOT and date is None:
+        packed = get_packed_snapshot()
+        if packed is not None:
+            return packed_scores_response(request, packed, league, team, status, groups, limit, offset)
+
+    if date is not None:
+        snapshot = get_day_snapshot(date)
+        if not snapshot:
+            raise HTTPException(status_code=404, detail=f"No match data for {date}.")
+    else:
+        snapshot = get_schedule_snapshot()
+        if not snapshot:
+            raise HTTPException(status_code=503, detail="Daily match data not ready.")
+
+    def build():
+        if league is None and team is None and status is None:
+            selected = {"all": snapshot.matches, "live": snapshot.live, "fixtures": snapshot.fixtures}
+        else:
+            matches = [snapshot.matches[i] for i in snapshot.query(league, team, status)]
+            selected = {
+                "all": matches,
+                "live": [m for m in matches if status_bucket(m["matchStatus"]) == "live"],
+                "fixtures": [m for m in matches if status_bucket(m["matchStatus"]) == "fixtures"],
+            }
+
+        response = {}
+        has_more = False
+        for group in groups:
+            rows = selected[group]
+            end = offset + limit if limit else len(rows)
+            response[group] = rows[offset:end]
+            has_more = has_more or end < len(rows)
+        response["nextCursor"] = str(offset + limit) if limit and has_more else None
+        return response
+
+    key = scores_key(date, league, team, status, groups, limit, offset)
+    max_age = ARCHIVE_MAX_AGE if date is not None and date < datetime.datetime.utcnow().strftime("%Y%m%d") else LIVE_MAX_AGE
+    return cached_json(request, key, snapshot.version, build, max_age, last_modified=snapshot.last_modified)
+
+def scores_key(date, league, team, status, groups, limit, offset):
+    # shared by both serving modes, so a body has the same ETag in either
+    return ("scores", date, league, team, status, tuple(groups), limit, offset)
+
+def packed_scores_response(request, packed, league, team, status, groups, limit, offset):
+    # same bodies as the path above, assembled from match JSON already serialized in the shared map
+    unfiltered = league is None and team is None and status is None
+    if unfiltered and limit is None and offset == 0 and len(groups) == 1:
+        key = scores_key(None, None, None, None, groups, None, 0)
+        return body_response(request, packed.body(f"scores:{groups[0]}", key), LIVE_MAX_AGE)
+
+    def build():
+        if unfiltered:
+            selected = {group: packed.group(group) for group in groups}
+        else:
+            positions = packed.query(league, team, status)
+            selected = {"all": positions}
+            for group in ("live", "fixtures"):
+                members = set(packed.group(group))
+                selected[group] = [i for i in positions if i in members]
+
+        parts = []
+        has_more = False
+        for group in groups:
+            rows = selected[group]
+            end = offset + limit if limit else len(rows)
+            parts.append(b'"' + group.encode() + b'":' + packed.rows(rows[offset:end]))
+            has_more = has_more or end < len(rows)
+        next_cursor = json.dumps(str(offset + limit) if limit and has_more else None).encode()
+        return b"{" + b",".join(parts) + b',"nextCursor":' + next_cursor + b"}"
+
+    key = scores_key(None, league, team, status, groups, limit, offset)
+    return cached_json(request, key, packed.version, build, LIVE_MAX_AGE, last_modified=packed.last_modified, raw=True)
+
+@app.get("/api/results")
+def get_results(
+    request: Request,
+    from_date: Optional[str] = Query(None, alias="from", pattern=DATE_PATTERN),
+    to_date: Optional[str] = Query(None, alias="to", pattern=DATE_PATTERN),
+    league: Optional[str] = None,
+):
+    try:
+        end = datetime.datetime.strptime(to_date, "%Y%m%d").date() if to_date else datetime.datetime.utcnow().date()
+        start = datetime.datetime.strptime(from_date, "%Y%m%d").date() if from_date else end - datetime.timedelta(days=6)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be valid YYYYMMDD values.")
+    days = (end - start).days + 1
+    if days < 1 or days > MAX_RESULTS_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range must cover 1 to {MAX_RESULTS_DAYS} days.")
+
+    # only the requested days are opened, each one a loose file, a store query or an archive seek
+    snapshots = []
+    for offset in range(days):
+        date_str = (start + datetime.timedelta(days=offset)).strftime("%Y%m%d")
+        snapshot = get_day_snapshot(date_str)
+        if snapshot is not None:
+            snapshots.append((date_str, snapshot))
+
+    def build():
+        # a match appears in the day it was played and the day after; keep the later, final copy
+        results = {}
+        for date_str, snapshot in snapshots:
+            for i in snapshot.query(league=league, status="finished"):
+                match = snapshot.matches[i]
+                results[match["matchId"]] = dict(match, matchDate=date_str)
+        return {"from": start.strftime("%Y%m%d"), "to": end.strftime("%Y%m%d"), "results": list(results.values())}
+
+    version = tuple((date_str, snapshot.version) for date_str, snapshot in snapshots)
+    return cached_json(request, ("results", start, end, league), version, build, ARCHIVE_MAX_AGE)
+
+@app.get("/api/search")
+def search_names(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: Optional[str] = Query(None, pattern=r"^(team|league|competition)$"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    version, index = get_name_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search index not ready.")
+    # every keystroke is a new query: served with validators but kept out of the response cache
+    content = {"query": q, "results": index.search(q, kind, limit)}
+    body = CachedBody(version, content, last_modified=version[1] // 1_000_000_000, key=("search", fold(q), kind, limit))
+    return body_response(request, body, FIXTURES_MAX_AGE)
 
 @app.get("/api/leagues")
-def get_leagues():
-    path = get_latest_schedule_file()
-    data = load_json_file(path)
-    if not data:
+def get_leagues(request: Request):
+    if SHARED_SNAPSHOT:
+        packed = get_packed_snapshot()
+        if packed is not None:
+            return body_response(request, packed.body("leagues", LEAGUES_KEY), LIVE_MAX_AGE)
+    snapshot = get_schedule_snapshot()
+    if not snapshot:
         raise HTTPException(status_code=503, detail="Daily match data not ready.")
+    return cached_json(
+        request, LEAGUES_KEY, snapshot.version, lambda: snapshot.leagues, LIVE_MAX_AGE,
+        last_modified=snapshot.last_modified,
+    )
 
-    leagues = []
-    seen = set()
-    for league in data.get("Stages", []):
-        league_name = league.get("Snm", "Unknown League")
-        league_id = league.get("Cid") or league.get("Sid")
-        if league_id not in seen:
-            leagues.append({"leagueName": league_name, "leagueId": league_id})
-            seen.add(league_id)
-    return leagues
+@app.get("/api/live/stream")
+async def get_live_stream():
+    if SHARED_SNAPSHOT:
+        await live_broadcaster.ensure_started()
+    if live_broadcaster.full:
+        raise HTTPException(status_code=503, detail="Too many live stream subscribers.")
+    return StreamingResponse(
+        live_broadcaster.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/api/fixtures/{league_name}/{team_name}")
-def get_team_fixtures(league_name: str, team_name: str):
-    path = os.path.join(SEASON_FIXTURES_FOLDER, f"{unquote(team_name).lower()}.json")
-    data = load_json_file(path)
-    if not data:
+def get_team_fixtures(league_name: str, team_name: str, request: Request):
+    team = unquote(team_name).lower()
+    response = cached_team_response(request, team)
+    if response is None:
+        # names that are not a slug ("atletico madrid", "Nott'm Forest") go through the name index
+        league = resolve_name(league_name, "league")
+        entry = resolve_name(team_name, "team", league["slug"] if league else None)
+        if entry is not None:
+            response = cached_team_response(request, entry["slug"])
+    if response is None:
+        # teams missing from the index fall back to per-team files written by older scrapes
+        if store is not None:
+            response = cached_store_response(request, "team_fixtures", team, store.team_fixtures, FIXTURES_MAX_AGE)
+        else:
+            path = os.path.join(SEASON_FIXTURES_FOLDER, f"{team}.json")
+            response = cached_file_response(request, path, FIXTURES_MAX_AGE)
+    if response is None:
         raise HTTPException(status_code=404, detail=f"Season fixtures not found for team '{team_name}'.")
-    return data
+    return response
 
 @app.get("/api/fixtures/{league_name}")
-def get_league_fixtures(league_name: str):
-    path = os.path.join(LEAGUE_FIXTURES_FOLDER, f"{unquote(league_name).lower().replace(' ', '-')}.json")
-    data = load_json_file(path)
-    if not data:
+def get_league_fixtures(league_name: str, request: Request):
+    league = unquote(league_name).lower().replace(' ', '-')
+    if store is not None:
+        response = cached_store_response(request, "league_fixtures", league, store.league_fixtures, FIXTURES_MAX_AGE)
+    else:
+        path = os.path.join(LEAGUE_FIXTURES_FOLDER, f"{league}.json")
+        response = cached_file_response(request, path, FIXTURES_MAX_AGE)
+    if response is None:
+        entry = resolve_name(league_name, "league")
+        if entry is not None and entry["slug"] != league:
+            return get_league_fixtures(entry["slug"], request)
         raise HTTPException(status_code=404, detail=f"League fixtures not found for '{league_name}'.")
-    return data
+    return response
 
 @app.get("/api/standings/{league_name}")
-def get_standings(league_name: str):
-    path = os.path.join(STANDINGS_FOLDER, f"{unquote(league_name).lower().replace(' ', '-')}.json")
-    data = load_json_file(path)
-    if not data:
+def get_standings(
+    league_name: str,
+    request: Request,
+    round: Optional[int] = Query(None, ge=1),
+):
+    league = unquote(league_name).lower().replace(' ', '-')
+    response = cached_standings_response(request, league, round)
+    if response is None:
+        entry = resolve_name(league_name, "league")
+        if entry is not None and entry["standings"] != league:
+            league = entry["standings"]
+            response = cached_standings_response(request, league, round)
+    if response is not None:
+        return response
+    if round is not None:
+        raise HTTPException(status_code=404, detail=f"No fixture results to compute standings for '{league_name}'.")
+    # leagues without a fixture feed keep the last scraped table
+    if store is not None:
+        response = cached_store_response(request, "standings", league, store.standings, STANDINGS_MAX_AGE)
+    else:
+        path = os.path.join(STANDINGS_FOLDER, f"{league}.json")
+        response = cached_file_response(request, path, STANDINGS_MAX_AGE)
+    if response is None:
         raise HTTPException(status_code=404, detail=f"Standings not found for league '{league_name}'.")
-    return data
+    return response
 
 @app.get("/api/match/{match_id}")
-def get_matches(league_name: str):
-    path = os.path.join(MATCHES_FOLDER, f"{unquote(league_name).lower().replace(' ', '-')}_match.json")
-    data = load_json_file(path)
-    if not data:
-        raise HTTPException(status_code=404, detail="Matches data not found.")
-    return data.get("Players", [])
+async def get_match(request: Request, match_id: str = Path(..., pattern=r"^\d{1,12}$")):
+    if not await run_in_threadpool(known_match, match_id):
+        raise HTTPException(status_code=404, detail=f"Match {match_id} not found.")
+    # async so requests waiting on one upstream fetch do not each hold a threadpool thread
+    entry = await match_details.get_async(match_id)
+    if entry is None or entry.error is not None:
+        raise HTTPException(status_code=503, detail=f"Match {match_id} details unavailable, try again shortly.")
+    if entry.body is None:
+        raise HTTPException(status_code=404, detail=f"Match {match_id} not found.")
+    return body_response(request, entry.body, entry.max_age())
@@ -0,0 +1,188 @@
+import os
+import json
+import gzip
+import argparse
+import datetime
+import logging
+from fsutil import atomic_write
+from records import event_ids, encode_schedule
+from store import open_store
+
+DATA_FOLDER = "data"
+SCHEDULES_FOLDER = os.path.join(DATA_FOLDER, "schedules")
+ARCHIVE_FOLDER = os.path.join(DATA_FOLDER, "archive")
+CURRENT_SCHEDULE_FILE = os.path.join(DATA_FOLDER, "current_schedule.json")
+
+# daily files newer than this stay loose in data/schedules
+KEEP_DAYS = 7
+# monthly archives older than this are deleted
+RETENTION_MONTHS = 12
+
+# -----------------------------
+# Archive layout
+# -----------------------------
+# data/archive/YYYYMM-G.json.gz concatenated gzip members, one per day (valid as a single gzip stream)
+# data/archive/YYYYMM.idx.json  {"file": "YYYYMM-G.json.gz", "generation": G,
+#                                "days": {"YYYYMMDD": [offset, length]}, "events": {"Eid": "YYYYMMDD"}}
+# A rewrite goes to a new generation, so a reader holding the old index still reads the old archive;
+# the generation it replaced is kept until the next rewrite of the month.
+def index_path(month):
+    return os.path.join(ARCHIVE_FOLDER, f"{month}.idx.json")
+
+_indexes = {}
+
+def load_index(month):
+    try:
+        st = os.stat(index_path(month))
+    except OSError:
+        return None
+    version = (st.st_mtime_ns, st.st_size)
+    cached = _indexes.get(month)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    try:
+        with open(index_path(month), encoding="utf-8") as f:
+            index = json.load(f)
+    except Exception:
+        return None
+    _indexes[month] = (version, index)
+    return index
+
+def read_archived_day(date_str):
+    # seeks to the day's gzip member, nothing else in the month is decompressed
+    month = date_str[:6]
+    index = load_index(month)
+    if not index or date_str not in index["days"]:
+        return None
+    offset, length = index["days"][date_str]
+    with open(os.path.join(ARCHIVE_FOLDER, index["file"]), "rb") as f:
+        f.seek(offset)
+        blob = f.read(length)
+    return json.loads(gzip.decompress(blob))
+
+def archived_day_version(date_str):
+    month = date_str[:6]
+    index = load_index(month)
+    if not index or date_str not in index["days"]:
+        return None
+    return ("archive", date_str, index["file"], tuple(index["days"][date_str]))
+
+def find_event_day(event_id):
+    for filename in sorted(os.listdir(ARCHIVE_FOLDER), reverse=True) if os.path.isdir(ARCHIVE_FOLDER) else []:
+        if filename.endswith(".idx.json"):
+            index = load_index(filename[:6])
+            if index and event_id in index["events"]:
+                return index["events"][event_id]
+    return None
+
+# -----------------------------
+# Compaction & retention
+# -----------------------------
+def current_schedule_name():
+    try:
+        with open(CURRENT_SCHEDULE_FILE, encoding="utf-8") as f:
+            return json.load(f)["file"]
+    except Exception:
+        return None
+
+def compact(keep_days=KEEP_DAYS, today=None, store=None):
+    # daily schedules from data/schedules and, with the SQLite backend, from the store
+    today = today or datetime.datetime.utcnow().date()
+    cutoff = (today - datetime.timedelta(days=keep_days)).strftime("%Y%m%d")
+    current = current_schedule_name()
+    stored = set(store.schedule_dates()) if store is not None else set()
+    files = set()
+    for filename in os.listdir(SCHEDULES_FOLDER) if os.path.isdir(SCHEDULES_FOLDER) else []:
+        date_str = filename[:-len(".json")]
+        if filename.endswith(".json") and len(date_str) == 8 and date_str.isdigit():
+            files.add(date_str)
+    candidates = {}
+    for date_str in sorted(files | stored):
+        if date_str >= cutoff or f"{date_str}.json" == current:
+            continue
+        candidates.setdefault(date_str[:6], []).append(date_str)
+
+    os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+    for month, dates in candidates.items():
+        # the store wins over a file for the same day, as it does for readers (snapshot._day_source)
+        schedules = {}
+        for date_str in dates:
+            if date_str in stored:
+                schedules[date_str] = store.load_schedule(date_str) or {"Stages": []}
+            else:
+                with open(os.path.join(SCHEDULES_FOLDER, f"{date_str}.json"), encoding="utf-8") as f:
+                    schedules[date_str] = json.load(f)
+        archive_month(month, schedules)
+        for date_str in dates:
+            if date_str in files:
+                os.remove(os.path.join(SCHEDULES_FOLDER, f"{date_str}.json"))
+            if date_str in stored:
+                store.delete_schedule(date_str)
+        logging.info(f"Archived {len(dates)} daily schedules into {month}")
+
+def archive_month(month, schedules):
+    # schedules: date -> schedule of that day, replacing what the archive held for those days
+    index = load_index(month) or {"file": None, "generation": 0, "days": {}, "events": {}}
+    old_blob = b""
+    if index["file"]:
+        with open(os.path.join(ARCHIVE_FOLDER, index["file"]), "rb") as f:
+            old_blob = f.read()
+
+    days = {}
+    for date_str, (offset, length) in index["days"].items():
+        if date_str not in schedules:
+            days[date_str] = old_blob[offset:offset + length]
+    events = {eid: day for eid, day in index["events"].items() if day not in schedules}
+    for date_str in sorted(schedules):
+        data = schedules[date_str]
+        days[date_str] = gzip.compress(encode_schedule(data), compresslevel=9, mtime=0)
+        for event_id in event_ids(data):
+            # later days win: a match carried over from yesterday's feed ends up on its final day
+            if event_id and events.get(event_id, "") <= date_str:
+                events[event_id] = date_str
+
+    generation = index["generation"] + 1
+    blob = bytearray()
+    new_index = {"file": f"{month}-{generation}.json.gz", "generation": generation, "days": {}, "events": events}
+    for date_str in sorted(days):
+        new_index["days"][date_str] = [len(blob), len(days[date_str])]
+        blob += days[date_str]
+    # new archive first, then the index that points into it; the generation just replaced stays
+    # for readers that loaded the old index a moment ago, anything older goes
+    atomic_write(os.path.join(ARCHIVE_FOLDER, new_index["file"]), bytes(blob))
+    atomic_write(index_path(month), json.dumps(new_index, separators=(",", ":")).encode("utf-8"))
+    for filename in os.listdir(ARCHIVE_FOLDER):
+        stem = filename[:-len(".json.gz")]
+        if filename.endswith(".json.gz") and stem.startswith(f"{month}-") \
+                and stem[7:].isdigit() and int(stem[7:]) < generation - 1:
+            os.remove(os.path.join(ARCHIVE_FOLDER, filename))
+
+def apply_retention(retention_months=RETENTION_MONTHS, today=None, store=None):
+    today = today or datetime.datetime.utcnow().date()
+    month_index = today.year * 12 + today.month - 1 - retention_months
+    oldest = f"{month_index // 12:04d}{month_index % 12 + 1:02d}"
+    if store is not None:
+        # days compaction has not moved out of the store yet expire all the same
+        for date_str in store.schedule_dates():
+            if date_str[:6] < oldest:
+                store.delete_schedule(date_str)
+                logging.info(f"Removed expired schedule {date_str} from the store")
+    if not os.path.isdir(ARCHIVE_FOLDER):
+        return
+    for filename in os.listdir(ARCHIVE_FOLDER):
+        if filename[:6].isdigit() and filename[:6] < oldest:
+            os.remove(os.path.join(ARCHIVE_FOLDER, filename))
+            logging.info(f"Removed expired archive {filename}")
+
+# -----------------------------
+# python archive.py [--keep-days N] [--retention-months M]
+# -----------------------------
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Compact old daily schedules into monthly archives")
+    parser.add_argument("--keep-days", type=int, default=KEEP_DAYS)
+    parser.add_argument("--retention-months", type=int, default=RETENTION_MONTHS)
+    args = parser.parse_args()
+    store = open_store()
+    compact(args.keep_days, store=store)
+    apply_retention(args.retention_months, store=store)
@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import datetime
+import platform
+import tempfile
+import tracemalloc
+import logging
+import subprocess
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+EVENTS_PER_STAGE = 20
+ROUTE_REQUESTS = 200
+SCRAPER_REPEATS = 3
+BOT_REPEATS = 20
+SEED = 2025
+
+STATUSES = ("NS", "NS", "NS", "FT", "FT", "FT", "HT", "45'", "67'", "Postponed")
+COUNTRIES = ("England", "Spain", "Italy", "Germany", "France", "Portugal", "Netherlands", "Brazil", "Japan", "Mexico")
+FIXTURE_LEAGUES = ("premier-league", "la-liga", "serie-a", "bundesliga")
+FIXTURE_TEAMS = 20
+
+# -----------------------------
+# Synthetic data
+# -----------------------------
+def team_name(i):
+    return f"Team {i:05d} Atlético"
+
+def synthetic_schedule(events, date_str, rng, first_eid=1):
+    # livescore-shaped: Stages[Sid, Snm, Cid, Events[Eid, T1/T2, Esd, Eps, Tr1, Tr2]]
+    stages = []
+    eid = first_eid
+    for stage_no in range((events + EVENTS_PER_STAGE - 1) // EVENTS_PER_STAGE):
+        stage_events = []
+        for _ in range(min(EVENTS_PER_STAGE, events - stage_no * EVENTS_PER_STAGE)):
+            status = rng.choice(STATUSES)
+            started = status not in ("NS", "Postponed")
+            home = rng.randrange(events // 2 + 2)
+            stage_events.append({
+                "Eid": str(eid),
+                "T1": [{"ID": str(home), "Nm": team_name(home)}],
+                "T2": [{"ID": str(home + 1), "Nm": team_name(home + 1)}],
+                "Eps": status,
+                "Esd": int(date_str) * 1_000_000 + rng.randrange(10, 23) * 10_000,
+                "Tr1": str(rng.randrange(5)) if started else None,
+                "Tr2": str(rng.randrange(5)) if started else None,
+            })
+            eid += 1
+        stages.append({
+            # Sid follows the Eid range, so two days generated with overlapping Eids share stages
+            "Sid": str((first_eid - 1) // EVENTS_PER_STAGE + stage_no + 1),
+            "Snm": f"Division {stage_no}",
+            "Cid": str(stage_no % 500 + 1),
+            "Cnm": rng.choice(COUNTRIES),
+            "Events": stage_events,
+        })
+    return {"Stages": stages}
+
+def synthetic_league_fixtures(rng, teams=FIXTURE_TEAMS):
+    # fixturedownload-shaped double round robin; the first half of the season has results
+    names = [f"{chr(65 + i % 26)}{i} United" for i in range(teams)]
+    rounds = []
+    order = names[:]
+    for _ in range(teams - 1):
+        rounds.append([(order[i], order[-1 - i]) for i in range(teams // 2)])
+        order = [order[0]] + [order[-1]] + order[1:-1]
+    rounds += [[(away, home) for home, away in r] for r in rounds]
+    rows = []
+    for round_no, pairs in enumerate(rounds, 1):
+        played = round_no <= len(rounds) // 2
+        for home, away in pairs:
+            rows.append({
+                "MatchNumber": len(rows) + 1,
+                "RoundNumber": round_no,
+                "DateUtc": f"2025-{8 + round_no // 5 % 5:02d}-{round_no % 28 + 1:02d} 15:00:00Z",
+                "Location": f"{home} Stadium",
+                "HomeTeam": home,
+                "AwayTeam": away,
+                "Group": None,
+                "HomeTeamScore": rng.randrange(5) if played else None,
+                "AwayTeamScore": rng.randrange(5) if played else None,
+            })
+    return rows
+
+def write_json(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(content, f, ensure_ascii=False, indent=2)
+
+def write_data_tree(root, events, date_str, rng):
+    from records import compact_schedule
+
+    data = os.path.join(root, "data")
+    schedule = synthetic_schedule(events, date_str, rng)
+    # the schedule file as the scraper writes it: compact records
+    path = os.path.join(data, "schedules", f"{date_str}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(compact_schedule(schedule), f, ensure_ascii=False, separators=(",", ":"))
+    write_json(os.path.join(data, "current_schedule.json"), {"file": f"{date_str}.json"})
+    team_index = {}
+    for league in FIXTURE_LEAGUES:
+        rows = synthetic_league_fixtures(rng)
+        write_json(os.path.join(data, "league_fixtures", f"{league}.json"), rows)
+        for row in rows:
+            team_index.setdefault(row["HomeTeam"].lower().replace(" ", "-"), {"league": league, "team": row["HomeTeam"]})
+    write_json(os.path.join(data, "team_index.json"), team_index)
+    return schedule
+
+# -----------------------------
+# Measurement
+# -----------------------------
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def latency_stats(samples):
+    total = sum(samples)
+    return {
+        "samples": len(samples),
+        "mean_ms": round(total / len(samples) * 1000, 4),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 4),
+        "throughput_rps": round(len(samples) / total, 1) if total else None,
+    }
+
+def measure(fn, repeats):
+    # timed runs are untraced; one extra traced run gives the peak allocation
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "samples": repeats,
+        "mean_ms": round(sum(samples) / repeats * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+def api_routes(schedule, date_str):
+    first_stage = schedule["Stages"][0]
+    team = first_stage["Events"][0]["T1"][0]["Nm"]
+    league = FIXTURE_LEAGUES[0]
+    return [
+        ("scores", "/api/scores"),
+        ("scores_live", "/api/scores?include=live"),
+        ("scores_page", "/api/scores?limit=100&cursor=100"),
+        ("scores_league", f"/api/scores?league={first_stage['Cid']}"),
+        ("scores_team", f"/api/scores?team={team}"),
+        ("scores_status", "/api/scores?status=finished"),
+        ("scores_date", f"/api/scores?date={date_str}&include=fixtures"),
+        ("results", f"/api/results?from={date_str}&to={date_str}"),
+        ("leagues", "/api/leagues"),
+        ("league_fixtures", f"/api/fixtures/{league}"),
+        ("team_fixtures", f"/api/fixtures/{league}/a0-united"),
+        ("standings", f"/api/standings/{league}"),
+        ("standings_round", f"/api/standings/{league}?round=10"),
+    ]
+
+def bench_api(schedule, date_str, requests_per_route):
+    from fastapi.testclient import TestClient
+    import api
+
+    # no "with": the live broadcaster's startup hook stays off, only the request path is timed
+    client = TestClient(api.app)
+    records = []
+    for name, url in api_routes(schedule, date_str):
+        started = time.perf_counter()
+        response = client.get(url)
+        cold = time.perf_counter() - started
+        samples = []
+        for _ in range(requests_per_route):
+            started = time.perf_counter()
+            client.get(url)
+            samples.append(time.perf_counter() - started)
+        record = {"suite": "api", "name": name, "url": url, "status": response.status_code,
+                  "bytes": len(response.content), "cold_ms": round(cold * 1000, 3)}
+        record.update(latency_stats(samples))
+        etag = response.headers.get("etag")
+        if etag:
+            revalidations = []
+            for _ in range(requests_per_route):
+                started = time.perf_counter()
+                client.get(url, headers={"If-None-Match": etag})
+                revalidations.append(time.perf_counter() - started)
+            record["not_modified_p50_ms"] = round(percentile(revalidations, 0.5) * 1000, 4)
+        records.append(record)
+    return records
+
+def bench_snapshot(schedule):
+    from snapshot import ScheduleSnapshot
+    from records import compact_schedule
+
+    compact = compact_schedule(schedule)
+    raw_result = measure(lambda: ScheduleSnapshot(("bench", 0, 0), schedule), SCRAPER_REPEATS)
+    result = measure(lambda: ScheduleSnapshot(("bench", 0, 0), compact), SCRAPER_REPEATS)
+    return [
+        dict(result, suite="snapshot", name="build"),
+        dict(raw_result, suite="snapshot", name="build_livescore_shape"),
+    ]
+
+def bench_scraper(schedule, date_str, rng):
+    from records import compact_schedule
+    try:
+        import scraper
+    except ImportError as e:
+        # scraper.py needs config.py (bot token, chat id); report the gap instead of faking it
+        return [{"suite": "scraper", "name": "merge", "skipped": f"scraper not importable: {e}"}]
+
+    previous = (datetime.datetime.strptime(date_str, "%Y%m%d") - datetime.timedelta(days=1)).strftime("%Y%m%d")
+    events = sum(len(stage["Events"]) for stage in schedule["Stages"])
+    # yesterday's feed shares half its stages and events with today, the usual overlap of a two-day fetch
+    overlap_from = events // 2 // EVENTS_PER_STAGE * EVENTS_PER_STAGE + 1
+    yesterday = synthetic_schedule(events, previous, rng, first_eid=overlap_from)
+
+    # ScheduleMerger builds its own stage dicts and event lists, the input days are left untouched
+    merged = scraper.merge_stages([yesterday, schedule])
+    merge_result = measure(lambda: scraper.merge_stages([yesterday, schedule]), SCRAPER_REPEATS)
+
+    def serialize():
+        # the save_schedule path: normalize to compact records, compact dump, encode, digest
+        payload = json.dumps(compact_schedule(merged), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        hashlib.sha256(payload).hexdigest()
+
+    serialize_result = measure(serialize, SCRAPER_REPEATS)
+    size = len(json.dumps(compact_schedule(merged), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    raw_size = len(json.dumps(merged, ensure_ascii=False, indent=2).encode("utf-8"))
+    return [
+        dict(merge_result, suite="scraper", name="merge",
+             merged_events=sum(len(s["Events"]) for s in merged["Stages"])),
+        dict(serialize_result, suite="scraper", name="serialize", bytes=size, livescore_bytes=raw_size),
+    ]
+
+def bench_bot():
+    from snapshot import get_schedule_snapshot
+    import bot
+
+    snapshot = get_schedule_snapshot()
+    render = measure(lambda: bot.RenderedReplies(snapshot), BOT_REPEATS)
+    rows = measure(lambda: [bot.fmt_match(m) for m in snapshot.matches], BOT_REPEATS)
+    return [
+        dict(render, suite="bot", name="rendered_replies"),
+        dict(rows, suite="bot", name="fmt_match_all", rows=len(snapshot.matches)),
+    ]
+
+# -----------------------------
+# Runner
+# -----------------------------
+def run_metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "suite": "meta",
+        "timestamp": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+def run(sizes, suites, requests_per_route, emit):
+    # everything runs against a generated data/ tree in a temp dir; nothing touches the network
+    os.environ.pop("GOAL2GOL_DB", None)
+    # the test client logs every request at INFO once scraper.py configures logging
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    emit(run_metadata())
+    home = os.getcwd()
+    for size in sizes:
+        rng = random.Random(SEED + size)
+        date_str = "20250115"
+        with tempfile.TemporaryDirectory(prefix="goal2gol-bench-") as root:
+            schedule = write_data_tree(root, size, date_str, rng)
+            os.chdir(root)
+            try:
+                records = []
+                if "snapshot" in suites:
+                    records += bench_snapshot(schedule)
+                if "api" in suites:
+                    records += bench_api(schedule, date_str, requests_per_route)
+                if "scraper" in suites:
+                    records += bench_scraper(schedule, date_str, rng)
+                if "bot" in suites:
+                    records += bench_bot()
+            finally:
+                os.chdir(home)
+            for record in records:
+                record["events"] = size
+                emit(record)
+
+# -----------------------------
+# python benchmark.py [--sizes 1000,10000] [--suites api,scraper] [--output results.jsonl]
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks on synthetic schedules; one JSON record per line")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma separated event counts per schedule")
+    parser.add_argument("--suites", default="snapshot,api,scraper,bot")
+    parser.add_argument("--requests", type=int, default=ROUTE_REQUESTS, help="warm requests per API route")
+    parser.add_argument("--output", help="append results to this file instead of stdout")
+    args = parser.parse_args()
+
+    out = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+
+    def emit(record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    try:
+        run([int(s) for s in args.sizes.split(",")], set(args.suites.split(",")), args.requests, emit)
+    finally:
+        if out is not sys.stdout:
+            out.close()
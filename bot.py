@@ -1,25 +1,119 @@
-import json
-from telegram import Update
-from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
-import os
+import time
+import asyncio
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+from telegram.ext import ApplicationBuilder, CommandHandler, CallbackQueryHandler, ContextTypes
+from snapshot import get_schedule_snapshot
+from notifier import Subscriptions, AlertQueue, Notifier
+from leaguepages import load_league_data, paginate, did_you_mean
+from search import AmbiguousName
 
-DATA_FOLDER = "data"
-SCHEDULES_FOLDER = os.path.join(DATA_FOLDER, "schedules")
-
-# Load JSON from file
-def load_latest_data():
-    today_file = os.path.join(SCHEDULES_FOLDER, sorted(os.listdir(SCHEDULES_FOLDER))[-1])
-    try:
-        with open(today_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data
-    except Exception:
-        return {"Stages": []}
+# how long a version check of the schedule snapshot is trusted before stat-ing the file again
+SNAPSHOT_CHECK_INTERVAL = 5.0
+REPLY_ROWS = 10
 
 def fmt_row(home, away, hs, as_, status):
     score = f"{hs}-{as_}" if hs is not None and as_ is not None else "–"
     return f"{home} {score} {away} ({status})"
 
+def fmt_match(m):
+    return fmt_row(m["homeTeamName"], m["awayTeamName"], m["homeScore"], m["awayScore"], m["matchStatus"])
+
+# -----------------------------
+# Pre-rendered replies
+# -----------------------------
+class RenderedReplies:
+    def __init__(self, snapshot):
+        self.version = snapshot.version if snapshot else None
+        self.live_lines = [fmt_match(m) for m in snapshot.live] if snapshot else []
+        self.fixture_lines = [fmt_match(m) for m in snapshot.fixtures] if snapshot else []
+        self.live_pages = (
+            paginate("Live Scores", self.live_lines, REPLY_ROWS) if self.live_lines else ["No live matches right now."]
+        )
+        self.matches_pages = (
+            paginate("Today’s Fixtures", self.fixture_lines, REPLY_ROWS)
+            if self.fixture_lines else ["No fixtures available right now."]
+        )
+        self.live_text = self.live_pages[0]
+        self.matches_text = self.matches_pages[0]
+
+_replies = None
+_replies_checked = 0.0
+_replies_lock = asyncio.Lock()
+
+async def current_replies():
+    global _replies, _replies_checked
+    if _replies is not None and time.monotonic() - _replies_checked < SNAPSHOT_CHECK_INTERVAL:
+        return _replies
+    async with _replies_lock:
+        if _replies is not None and time.monotonic() - _replies_checked < SNAPSHOT_CHECK_INTERVAL:
+            return _replies
+        # stat + (re)parse happen in a worker thread so other chats keep being served
+        snapshot = await asyncio.to_thread(get_schedule_snapshot)
+        version = snapshot.version if snapshot else None
+        if _replies is None or _replies.version != version:
+            _replies = RenderedReplies(snapshot)
+        _replies_checked = time.monotonic()
+        return _replies
+
+_league_data = None
+_league_data_checked = 0.0
+_league_data_lock = asyncio.Lock()
+
+async def current_league_data():
+    # same version check as current_replies, over the league fixture, standings and index files
+    global _league_data, _league_data_checked
+    if _league_data is not None and time.monotonic() - _league_data_checked < SNAPSHOT_CHECK_INTERVAL:
+        return _league_data
+    async with _league_data_lock:
+        if _league_data is not None and time.monotonic() - _league_data_checked < SNAPSHOT_CHECK_INTERVAL:
+            return _league_data
+        _league_data = await asyncio.to_thread(load_league_data, _league_data)
+        _league_data_checked = time.monotonic()
+        return _league_data
+
+# -----------------------------
+# Paged replies
+# -----------------------------
+# callback data is "page:<kind>:<key>:<page>", well under Telegram's 64 bytes for any slug
+async def list_pages(kind, key):
+    if kind == "live":
+        return (await current_replies()).live_pages
+    if kind == "matches":
+        return (await current_replies()).matches_pages
+    return (await current_league_data()).pages(kind, key)
+
+def page_keyboard(kind, key, page, count):
+    if count <= 1:
+        return None
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton("« Prev", callback_data=f"page:{kind}:{key}:{page - 1}"))
+    if page < count - 1:
+        buttons.append(InlineKeyboardButton("Next »", callback_data=f"page:{kind}:{key}:{page + 1}"))
+    return InlineKeyboardMarkup([buttons])
+
+async def reply_pages(update, pages, kind, key="", page=0):
+    page = min(max(page, 0), len(pages) - 1)
+    await update.message.reply_text(pages[page], reply_markup=page_keyboard(kind, key, page, len(pages)))
+
+async def page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    _, kind, key, page = query.data.split(":", 3)
+    pages = await list_pages(kind, key)
+    if not pages:
+        await query.edit_message_text("This list is no longer available.")
+        return
+    # the data may have changed since the keyboard was sent: clamp to the pages there are now
+    page = min(max(int(page), 0), len(pages) - 1)
+    try:
+        await query.edit_message_text(pages[page], reply_markup=page_keyboard(kind, key, page, len(pages)))
+    except BadRequest as e:
+        # a double tap asks for the page already shown
+        if "not modified" not in str(e).lower():
+            raise
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(
         "Welcome to Goal2Gol ⚽\nUse /live for live scores, /matches for fixtures, /help for help."
@@ -30,56 +124,97 @@ async def help_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "/start – Start the bot\n"
         "/live – Live football scores\n"
         "/matches – Today’s fixtures\n"
+        "/team <name> – A team's season fixtures\n"
+        "/table <league> – League table\n"
+        "/league <league> – A league's season fixtures\n"
+        "/follow <team> – Goal and status alerts for a team\n"
+        "/unfollow [team] – Stop alerts for a team (or all teams)\n"
         "/help – This help"
     )
 
 async def live(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    latest_data = load_latest_data()
-    live_matches = []
-    for league in latest_data.get("Stages", []):
-        for evt in league.get("Events", []):
-            if evt.get("Eps") not in ["NS", "FT", "Sched", "Cancelled", "Postponed", "Awarded"]:
-                live_matches.append(evt)
-
-    if not live_matches:
-        await update.message.reply_text("No live matches right now.")
+    replies = await current_replies()
+    await reply_pages(update, replies.live_pages, "live")
+
+async def matches(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    replies = await current_replies()
+    await reply_pages(update, replies.matches_pages, "matches")
+
+async def team(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    name = " ".join(context.args).strip()
+    if not name:
+        await update.message.reply_text("Usage: /team <name>")
+        return
+    data = await current_league_data()
+    try:
+        slug = data.resolve_team(name)
+    except AmbiguousName as e:
+        await update.message.reply_text(did_you_mean(e))
+        return
+    pages = data.pages("team", slug) if slug else None
+    if not pages:
+        await update.message.reply_text(f"No fixtures found for team '{name}'.")
         return
+    await reply_pages(update, pages, "team", slug, data.first_page("team", slug))
 
-    lines = [
-        fmt_row(
-            evt.get("T1")[0].get("Nm", "N/A") if evt.get("T1") else "N/A",
-            evt.get("T2")[0].get("Nm", "N/A") if evt.get("T2") else "N/A",
-            evt.get("Tr1"),
-            evt.get("Tr2"),
-            evt.get("Eps")
-        )
-        for evt in live_matches[:10]
-    ]
-    await update.message.reply_text("Live Scores:\n" + "\n".join(lines))
+async def table(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    name = " ".join(context.args).strip()
+    if not name:
+        await update.message.reply_text("Usage: /table <league>")
+        return
+    data = await current_league_data()
+    try:
+        league = data.resolve_league(name)
+    except AmbiguousName as e:
+        await update.message.reply_text(did_you_mean(e))
+        return
+    pages = data.pages("table", league) if league else None
+    if not pages:
+        await update.message.reply_text(f"No table found for league '{name}'.")
+        return
+    await reply_pages(update, pages, "table", league)
 
-async def matches(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    latest_data = load_latest_data()
-    fixtures = []
-    for league in latest_data.get("Stages", []):
-        for evt in league.get("Events", []):
-            if evt.get("Eps") in ["NS", "Sched"]:
-                fixtures.append(evt)
-
-    if not fixtures:
-        await update.message.reply_text("No fixtures available right now.")
+async def league(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    name = " ".join(context.args).strip()
+    if not name:
+        await update.message.reply_text("Usage: /league <league>")
+        return
+    data = await current_league_data()
+    try:
+        feed = data.resolve_league(name)
+    except AmbiguousName as e:
+        await update.message.reply_text(did_you_mean(e))
         return
+    pages = data.pages("league", feed) if feed else None
+    if not pages:
+        await update.message.reply_text(f"No fixtures found for league '{name}'.")
+        return
+    await reply_pages(update, pages, "league", feed, data.first_page("league", feed))
 
-    lines = [
-        fmt_row(
-            evt.get("T1")[0].get("Nm", "N/A") if evt.get("T1") else "N/A",
-            evt.get("T2")[0].get("Nm", "N/A") if evt.get("T2") else "N/A",
-            evt.get("Tr1"),
-            evt.get("Tr2"),
-            evt.get("Eps")
-        )
-        for evt in fixtures[:10]
-    ]
-    await update.message.reply_text("Today’s Fixtures:\n" + "\n".join(lines))
+subscriptions = Subscriptions()
+
+async def follow(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    team_name = " ".join(context.args).strip()
+    if not team_name:
+        await update.message.reply_text("Usage: /follow <team>")
+        return
+    subscriptions.follow(update.effective_chat.id, team_name)
+    await asyncio.to_thread(subscriptions.save)
+    await update.message.reply_text(f"Following {team_name}. You will get goal and status alerts.")
+
+async def unfollow(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    team_name = " ".join(context.args).strip() or None
+    removed = subscriptions.unfollow(update.effective_chat.id, team_name)
+    if not removed:
+        await update.message.reply_text("You were not following that team." if team_name else "You are not following any team.")
+        return
+    await asyncio.to_thread(subscriptions.save)
+    await update.message.reply_text(f"Stopped alerts for {team_name}." if team_name else "Stopped all alerts.")
+
+async def start_notifier(app):
+    queue = AlertQueue(lambda chat_id, text: app.bot.send_message(chat_id=chat_id, text=text))
+    app.create_task(queue.run())
+    app.create_task(Notifier(subscriptions, queue).run())
 
 # -----------------------------
 # Main
@@ -90,11 +225,17 @@ async def main():
         print("Telegram bot token not configured. Exiting.")
         return
 
-    app = ApplicationBuilder().token(telegram_bot_token).build()
+    app = ApplicationBuilder().token(telegram_bot_token).post_init(start_notifier).build()
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("help", help_cmd))
     app.add_handler(CommandHandler("live", live))
     app.add_handler(CommandHandler("matches", matches))
+    app.add_handler(CommandHandler("team", team))
+    app.add_handler(CommandHandler("table", table))
+    app.add_handler(CommandHandler("league", league))
+    app.add_handler(CallbackQueryHandler(page_callback, pattern=r"^page:"))
+    app.add_handler(CommandHandler("follow", follow))
+    app.add_handler(CommandHandler("unfollow", unfollow))
 
     await app.run_polling()
 
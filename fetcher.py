@@ -0,0 +1,384 @@
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+import requests
+from urllib.parse import urlsplit
+from fsutil import atomic_write
+from metrics import registry
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 15
+DEFAULT_DEADLINE = 300
+# minimum spacing between two requests to the same host, in seconds
+DEFAULT_HOST_INTERVAL = 0.1
+
+# retries after a connection error, timeout, 5xx or 429, with full-jitter exponential backoff
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF = 0.5
+# adaptive timeout: smoothed latency plus this many smoothed deviations, never below MIN_TIMEOUT
+# and never above the caller's timeout (the same estimator TCP uses for its retransmit timer)
+TIMEOUT_DEVIATIONS = 4
+MIN_TIMEOUT = 2.0
+# consecutive failed attempts that open a host's circuit; the cool-down doubles on each reopen
+FAILURE_THRESHOLD = 5
+COOL_DOWN = 60
+MAX_COOL_DOWN = 1800
+
+FETCH_SECONDS = registry.histogram("goal2gol_fetch_duration_seconds", "Upstream request time per source host", ("source",))
+FETCHES = registry.counter(
+    "goal2gol_fetches_total", "Upstream fetches per source host by result (ok, not_modified, error, deadline, circuit_open)",
+    ("source", "result"),
+)
+
+RETRIES = registry.counter("goal2gol_fetch_retries_total", "Upstream request retries per source host", ("source",))
+CIRCUIT_OPEN = registry.gauge("goal2gol_source_circuit_open", "1 while a source host is being fast-failed", ("source",))
+SOURCE_TIMEOUT = registry.gauge("goal2gol_source_timeout_seconds", "Current adaptive request timeout per source host", ("source",))
+
+# -----------------------------
+# Results
+# -----------------------------
+class FetchResult:
+    def __init__(self, key, url):
+        self.key = key
+        self.url = url
+        self.status = None
+        self.data = None
+        self.error = None
+        self.elapsed = 0.0
+        # set when the upstream answered 304 or returned a body we already have
+        self.not_modified = False
+        # validators for `data`, recorded in the manifest by commit() once the caller stored it
+        self.manifest = None
+        self.validators = None
+
+    @property
+    def ok(self):
+        return self.error is None and self.status is not None and self.status < 400
+
+    def commit(self):
+        if self.manifest is not None and self.validators is not None:
+            self.manifest.record_url(self.url, *self.validators)
+            self.validators = None
+
+# -----------------------------
+# Manifest (validators per URL, digests per written file)
+# -----------------------------
+class Manifest:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.urls = {}
+        self.files = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.urls = data.get("urls", {})
+            self.files = data.get("files", {})
+        except Exception:
+            pass
+
+    def url_entry(self, url):
+        with self._lock:
+            return dict(self.urls.get(url, {}))
+
+    def record_url(self, url, etag, last_modified, digest):
+        with self._lock:
+            self.urls[url] = {"etag": etag, "lastModified": last_modified, "sha256": digest}
+
+    def forget_url(self, url):
+        with self._lock:
+            self.urls.pop(url, None)
+
+    def file_digest(self, path):
+        with self._lock:
+            return self.files.get(path)
+
+    def record_file(self, path, digest):
+        with self._lock:
+            self.files[path] = digest
+
+    def save(self):
+        with self._lock:
+            payload = json.dumps({"urls": self.urls, "files": self.files}, ensure_ascii=False, sort_keys=True)
+        try:
+            atomic_write(self.path, payload.encode("utf-8"))
+        except Exception:
+            logging.error(f"Failed to save manifest to {self.path}")
+
+# -----------------------------
+# Per-source health (latency estimate, circuit breaker), persisted between runs
+# -----------------------------
+class SourceHealth:
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        # hosts whose circuit is half-open with a probe request in flight
+        self._probing = set()
+        self.sources = {}
+        if path is not None:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.sources = json.load(f)
+            except Exception:
+                pass
+
+    def _source(self, host):
+        source = self.sources.get(host)
+        if source is None:
+            source = self.sources[host] = {
+                "latency": None, "deviation": 0.0, "failures": 0, "opens": 0, "openUntil": 0, "lastError": None,
+            }
+        return source
+
+    def timeout_for(self, host, ceiling):
+        with self._lock:
+            source = self.sources.get(host)
+            if not source or source.get("latency") is None:
+                return ceiling
+            return min(ceiling, max(MIN_TIMEOUT, source["latency"] + TIMEOUT_DEVIATIONS * source["deviation"]))
+
+    def allow(self, host):
+        with self._lock:
+            source = self.sources.get(host)
+            if not source or source["failures"] < FAILURE_THRESHOLD:
+                return True
+            if time.time() < source["openUntil"] or host in self._probing:
+                return False
+            # cool-down over: let one request through to probe the host
+            self._probing.add(host)
+            return True
+
+    def release(self, host):
+        # an attempt that never reached the host gives up its probe turn without a verdict
+        with self._lock:
+            self._probing.discard(host)
+
+    def record_success(self, host, elapsed):
+        with self._lock:
+            self._probing.discard(host)
+            source = self._source(host)
+            if source["latency"] is None:
+                source["latency"], source["deviation"] = elapsed, elapsed / 2
+            else:
+                source["deviation"] = 0.75 * source["deviation"] + 0.25 * abs(elapsed - source["latency"])
+                source["latency"] = 0.875 * source["latency"] + 0.125 * elapsed
+            if source["failures"] >= FAILURE_THRESHOLD:
+                logging.info(f"Circuit for {host} closed again")
+            source["failures"] = source["opens"] = 0
+            CIRCUIT_OPEN.set(0, source=host)
+            SOURCE_TIMEOUT.set(round(max(MIN_TIMEOUT, source["latency"] + TIMEOUT_DEVIATIONS * source["deviation"]), 3),
+                               source=host)
+
+    def record_failure(self, host, error):
+        with self._lock:
+            probing = host in self._probing
+            self._probing.discard(host)
+            source = self._source(host)
+            source["failures"] += 1
+            source["lastError"] = error
+            if source["failures"] >= FAILURE_THRESHOLD and (probing or time.time() >= source["openUntil"]):
+                source["opens"] += 1
+                cool_down = min(COOL_DOWN * 2 ** (source["opens"] - 1), MAX_COOL_DOWN)
+                source["openUntil"] = time.time() + cool_down
+                CIRCUIT_OPEN.set(1, source=host)
+                logging.warning(f"Circuit for {host} open for {cool_down}s after {source['failures']} failures: {error}")
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            payload = json.dumps(self.sources, ensure_ascii=False, sort_keys=True)
+        try:
+            atomic_write(self.path, payload.encode("utf-8"))
+        except Exception:
+            logging.error(f"Failed to save source health to {self.path}")
+
+def conditional_headers(entry):
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("lastModified"):
+        headers["If-Modified-Since"] = entry["lastModified"]
+    return headers
+
+# -----------------------------
+# Fetch engine
+# -----------------------------
+class Fetcher:
+    def __init__(self, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT,
+                 host_interval=DEFAULT_HOST_INTERVAL, host_intervals=None, manifest=None, health=None,
+                 retries=DEFAULT_RETRIES):
+        self.manifest = manifest
+        self.health = health if health is not None else SourceHealth()
+        self.retries = retries
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.host_interval = host_interval
+        self.host_intervals = host_intervals or {}
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._next_slot = {}
+
+    def session_for(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                # one keep-alive pool per host, sized so every worker can hold a connection
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def _reserve_slot(self, host):
+        interval = self.host_intervals.get(host, self.host_interval)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        return slot
+
+    def _fetch_one(self, result, deadline_at, timeout, conditional):
+        host = urlsplit(result.url).netloc
+        for attempt in range(self.retries + 1):
+            if not self.health.allow(host):
+                # a retry the circuit stops keeps the error of the attempt before it
+                if attempt == 0:
+                    result.error = f"circuit open for {host}"
+                return result
+            reached_host = self._attempt(result, host, deadline_at, timeout, conditional, attempt)
+            if result.error is None:
+                return result
+            if result.status is not None and 400 <= result.status < 500 and result.status != 429:
+                # the host answered; the URL is wrong, not the host
+                self.health.record_success(host, result.elapsed)
+                return result
+            if not reached_host:
+                # our own deadline ran out, which says nothing about the host
+                self.health.release(host)
+                return result
+            self.health.record_failure(host, result.error)
+            if attempt == self.retries:
+                return result
+            backoff = random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+            if time.monotonic() + backoff >= deadline_at:
+                return result
+            RETRIES.inc(source=host)
+            time.sleep(backoff)
+        return result
+
+    def _attempt(self, result, host, deadline_at, timeout, conditional, attempt):
+        # False when a failure is down to the deadline rather than the host
+        result.status = result.data = result.error = result.validators = None
+        slot = self._reserve_slot(host)
+        if slot >= deadline_at:
+            result.error = "deadline exceeded before request could start"
+            return False
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        entry = self.manifest.url_entry(result.url) if self.manifest is not None and conditional else {}
+        remaining = deadline_at - time.monotonic()
+        # each retry allows twice the adaptive timeout, up to the caller's
+        attempt_timeout = min(timeout, self.health.timeout_for(host, timeout) * 2 ** attempt)
+        # a timeout cut short by the deadline is the deadline's, not the host's
+        deadline_bound = remaining < attempt_timeout
+        started = time.monotonic()
+        try:
+            response = self.session_for(host).get(
+                result.url, headers=conditional_headers(entry), timeout=min(attempt_timeout, max(remaining, 0.1))
+            )
+            result.status = response.status_code
+            # every successful outcome, a 304 included, falls through to record_success below,
+            # which also settles a half-open probe
+            if response.status_code == 304:
+                result.not_modified = True
+            else:
+                response.raise_for_status()
+                digest = hashlib.sha256(response.content).hexdigest()
+                if entry.get("sha256") == digest:
+                    # upstream ignored the validators but sent the same bytes, skip the parse
+                    result.not_modified = True
+                else:
+                    result.data = response.json()
+                    result.manifest = self.manifest
+                    result.validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"), digest)
+        except requests.Timeout as e:
+            result.error = str(e) or e.__class__.__name__
+            if deadline_bound:
+                return False
+        except Exception as e:
+            result.error = str(e) or e.__class__.__name__
+        finally:
+            result.elapsed = time.monotonic() - started
+            FETCH_SECONDS.observe(result.elapsed, source=host)
+        if result.error is None:
+            self.health.record_success(host, result.elapsed)
+        return True
+
+    def fetch_all(self, urls, deadline=DEFAULT_DEADLINE, timeout=None, revalidate=None):
+        # urls maps a caller key (team, league, ...) to the URL to fetch;
+        # revalidate limits conditional requests to keys whose local copy still exists
+        timeout = timeout or self.timeout
+        deadline_at = time.monotonic() + deadline
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {pool.submit(self._fetch_one, FetchResult(key, url), deadline_at, timeout,
+                                   revalidate is None or key in revalidate): key
+                       for key, url in urls.items()}
+            pending = set(futures)
+            while pending:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                _, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        finally:
+            # anything still queued at the deadline is dropped, running requests are bounded by their timeout
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        results = {}
+        for future, key in futures.items():
+            if future in pending:
+                result = FetchResult(key, urls[key])
+                result.error = "deadline exceeded"
+            else:
+                result = future.result()
+            results[key] = result
+            FETCHES.inc(source=urlsplit(result.url).netloc, result=fetch_outcome(result))
+        log_timings(results)
+        self.health.save()
+        return results
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+def fetch_outcome(result):
+    if result.not_modified:
+        return "not_modified"
+    if result.ok:
+        return "ok"
+    if result.error and result.error.startswith("circuit open"):
+        return "circuit_open"
+    return "deadline" if result.error and result.error.startswith("deadline exceeded") else "error"
+
+def log_timings(results, slowest=5):
+    if not results:
+        return
+    failed = [r for r in results.values() if not r.ok]
+    unchanged = sum(1 for r in results.values() if r.not_modified)
+    ranked = sorted(results.values(), key=lambda r: r.elapsed, reverse=True)
+    total = sum(r.elapsed for r in results.values())
+    logging.info(f"Fetched {len(results)} URLs ({len(failed)} failed, {unchanged} unchanged), {total:.2f}s of request time")
+    for r in ranked[:slowest]:
+        logging.info(f"  {r.elapsed:.2f}s {r.status} {r.url}")
@@ -0,0 +1,143 @@
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Response
+from metrics import registry
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+MAX_CACHED_BODIES = 512
+
+CACHE_LOOKUPS = registry.counter("goal2gol_response_cache_lookups_total", "Response cache lookups by result", ("result",))
+CACHE_BUILD_SECONDS = registry.histogram("goal2gol_response_build_seconds", "Time to build and serialize an uncached response body")
+CACHE_ENTRIES = registry.gauge("goal2gol_response_cache_entries", "Bodies held in the response cache")
+NOT_MODIFIED = registry.counter("goal2gol_http_not_modified_total", "Requests answered 304 from a validator")
+
+# -----------------------------
+# Pre-encoded bodies
+# -----------------------------
+def etag_for(key, version):
+    # the resource's cache key is part of the tag: every body built from one data version
+    # would otherwise share it, and a 304 for one URL would answer another
+    return '"' + hashlib.sha1(repr((key, version)).encode("utf-8")).hexdigest() + '"'
+
+class CachedBody:
+    def __init__(self, version, content, last_modified=None, raw=None, key=None):
+        self.version = version
+        # raw: an already serialized body, e.g. assembled from a packed snapshot
+        if raw is None:
+            raw = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.raw = raw
+        self.etag = etag_for(key, version)
+        self.last_modified = last_modified
+        self._lock = threading.Lock()
+        self._encoded = {}
+
+    def encoded(self, encoding):
+        # compressed once per data version, on first request for that encoding
+        with self._lock:
+            body = self._encoded.get(encoding)
+            if body is None:
+                if encoding == "br":
+                    body = brotli.compress(self.raw, quality=5)
+                else:
+                    body = gzip.compress(self.raw, compresslevel=6, mtime=0)
+                self._encoded[encoding] = body
+            return body
+
+    def variant_etag(self, encoding):
+        if encoding is None:
+            return self.etag
+        return self.etag[:-1] + f'-{encoding}"'
+
+class ResponseCache:
+    def __init__(self, max_entries=MAX_CACHED_BODIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._bodies = OrderedDict()
+
+    def get(self, key, version, build, last_modified=None, raw=False):
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None and body.version == version:
+                self._bodies.move_to_end(key)
+                CACHE_LOOKUPS.inc(result="hit")
+                return body
+        CACHE_LOOKUPS.inc(result="miss")
+        with CACHE_BUILD_SECONDS.time():
+            content = build()
+            if content is None:
+                return None
+            if raw:
+                body = CachedBody(version, None, last_modified, raw=content, key=key)
+            else:
+                body = CachedBody(version, content, last_modified, key=key)
+        with self._lock:
+            self._bodies[key] = body
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+            CACHE_ENTRIES.set(len(self._bodies))
+        return body
+
+response_cache = ResponseCache()
+
+# -----------------------------
+# Conditional responses
+# -----------------------------
+def choose_encoding(accept_encoding, size):
+    if size < 1024:
+        return None
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def not_modified(request, body):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        return any(body.variant_etag(enc) in tags for enc in (None, "gzip", "br"))
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and body.last_modified is not None:
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= int(body.last_modified)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def cached_json(request, key, version, build, max_age, last_modified=None, raw=False):
+    # returns None when build() has nothing to serve, so the route can raise its own 404/503;
+    # with raw=True build() returns serialized JSON bytes instead of an object
+    body = response_cache.get(key, version, build, last_modified, raw)
+    if body is None:
+        return None
+    return body_response(request, body, max_age)
+
+def body_response(request, body, max_age):
+    # body: anything with raw, etag, last_modified, variant_etag() and encoded()
+    encoding = choose_encoding(request.headers.get("accept-encoding"), len(body.raw))
+    headers = {
+        "ETag": body.variant_etag(encoding),
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+    if body.last_modified is not None:
+        headers["Last-Modified"] = formatdate(body.last_modified, usegmt=True)
+    if not_modified(request, body):
+        NOT_MODIFIED.inc()
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=body.raw, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=body.encoded(encoding), media_type="application/json", headers=headers)
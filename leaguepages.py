@@ -0,0 +1,186 @@
+import os
+import logging
+from collections import defaultdict, OrderedDict
+from snapshot import file_version, read_json_file
+from search import NameIndex, LEAGUE_NAMES, build_name_index
+from standings import StandingsTable, standings_feed, standings_name
+
+DATA_FOLDER = "data"
+LEAGUE_FIXTURES_FOLDER = os.path.join(DATA_FOLDER, "league_fixtures")
+STANDINGS_FOLDER = os.path.join(DATA_FOLDER, "standings")
+TEAM_INDEX_FILE = os.path.join(DATA_FOLDER, "team_index.json")
+NAME_INDEX_FILE = os.path.join(DATA_FOLDER, "name_index.json")
+
+PAGE_ROWS = 10
+# rendered lists kept per data version; a league's season is about 40 pages, a team's about 4
+MAX_CACHED_LISTS = 256
+
+def paginate(title, lines, rows=PAGE_ROWS):
+    # message texts, one per page; the page counter only shows when there is more than one
+    chunks = [lines[i:i + rows] for i in range(0, len(lines), rows)] or [[]]
+    if len(chunks) == 1:
+        return [f"{title}:\n" + "\n".join(chunks[0])]
+    return [f"{title} ({n}/{len(chunks)}):\n" + "\n".join(chunk) for n, chunk in enumerate(chunks, 1)]
+
+def league_title(feed):
+    names = LEAGUE_NAMES.get(feed)
+    return names[0] if names else feed.replace("-", " ").title()
+
+def did_you_mean(error):
+    # reply to an AmbiguousName: the contenders with the slug that picks each one
+    lines = [
+        f"{m['name']} ({league_title(m['league'])}): {m['slug']}" if m.get("league") else f"{m['name']}: {m['slug']}"
+        for m in error.matches
+    ]
+    return f"'{error.name}' matches several names, try one of:\n" + "\n".join(lines)
+
+def fmt_fixture(row):
+    home_score, away_score = row.get("HomeTeamScore"), row.get("AwayTeamScore")
+    score = f"{home_score}-{away_score}" if home_score is not None and away_score is not None else "v"
+    kickoff = (row.get("DateUtc") or "")[:16]
+    return f"{kickoff} {row.get('HomeTeam')} {score} {row.get('AwayTeam')}"
+
+def fmt_table_row(row):
+    name = (row.get("team") or {}).get("name")
+    difference = int(row.get("goalDifference") or 0)
+    return f"{row.get('rank')}. {name} – {row.get('points')} pts ({row.get('games')} P, {difference:+d} GD)"
+
+def played(row):
+    return row.get("HomeTeamScore") is not None and row.get("AwayTeamScore") is not None
+
+# -----------------------------
+# Indexes over the scraper's league files, per data version
+# -----------------------------
+def league_data_version():
+    version = []
+    for folder in (LEAGUE_FIXTURES_FOLDER, STANDINGS_FOLDER):
+        try:
+            names = sorted(f for f in os.listdir(folder) if f.endswith(".json"))
+        except OSError:
+            names = []
+        version += [(folder, *file_version(os.path.join(folder, name))) for name in names]
+    for path in (TEAM_INDEX_FILE, NAME_INDEX_FILE):
+        if os.path.isfile(path):
+            version.append(file_version(path))
+    return tuple(version)
+
+def read_file(path, kind):
+    try:
+        return read_json_file(path, kind)
+    except Exception:
+        return None
+
+class LeagueData:
+    def __init__(self, version):
+        self.version = version
+        # feed -> fixtures in kickoff order; (feed, team) -> positions in that list
+        self.leagues = {}
+        self.team_fixtures = defaultdict(list)
+        for entry in version:
+            if entry[0] != LEAGUE_FIXTURES_FOLDER:
+                continue
+            feed = entry[1][:-len(".json")]
+            rows = read_file(os.path.join(LEAGUE_FIXTURES_FOLDER, entry[1]), "league_fixtures") or []
+            rows = sorted(rows, key=lambda r: (r.get("DateUtc") or "", r.get("MatchNumber") or 0))
+            self.leagues[feed] = rows
+            for i, row in enumerate(rows):
+                for team in (row.get("HomeTeam"), row.get("AwayTeam")):
+                    if team:
+                        self.team_fixtures[(feed, team)].append(i)
+        self.standings = {
+            entry[1][:-len(".json")] for entry in version if entry[0] == STANDINGS_FOLDER
+        }
+        self.team_index = read_file(TEAM_INDEX_FILE, "data") or {}
+        # built here from the fixture feeds when the scraper has not written the index yet
+        names = read_file(NAME_INDEX_FILE, "data") or build_name_index(self.leagues, self.team_index, None)
+        self.names = NameIndex(names)
+        # (kind, key) -> rendered pages, so a callback query is a lookup
+        self._pages = OrderedDict()
+
+    def resolve_league(self, name):
+        slug = name.strip().lower().replace(" ", "-")
+        for candidate in (slug, standings_feed(slug)):
+            if candidate in self.leagues:
+                return candidate
+        if slug in self.standings:
+            return slug
+        entry = self.names.resolve(name, "league")
+        return entry["slug"] if entry is not None else None
+
+    def resolve_team(self, name):
+        slug = name.strip().lower()
+        if slug in self.team_index:
+            return slug
+        entry = self.names.resolve(name, "team")
+        return entry["slug"] if entry is not None and entry["slug"] in self.team_index else None
+
+    def pages(self, kind, key):
+        cache_key = (kind, key)
+        pages = self._pages.get(cache_key)
+        if pages is None:
+            pages = self._render(kind, key)
+            if pages is None:
+                return None
+            self._pages[cache_key] = pages
+            while len(self._pages) > MAX_CACHED_LISTS:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(cache_key)
+        return pages
+
+    def first_page(self, kind, key):
+        # fixture lists open on the page with the next match still to play
+        rows = self._rows(kind, key)
+        if not rows:
+            return 0
+        upcoming = next((i for i, row in enumerate(rows) if not played(row)), len(rows) - 1)
+        return upcoming // PAGE_ROWS
+
+    def _rows(self, kind, key):
+        if kind == "league":
+            return self.leagues.get(key)
+        if kind == "team":
+            entry = self.team_index.get(key)
+            if entry is None:
+                return None
+            rows = self.leagues.get(entry["league"], [])
+            return [rows[i] for i in self.team_fixtures.get((entry["league"], entry["team"]), ())]
+        return None
+
+    def _render(self, kind, key):
+        if kind == "table":
+            return self._render_table(key)
+        rows = self._rows(kind, key)
+        if not rows:
+            return None
+        if kind == "league":
+            title = f"{league_title(key)} fixtures"
+        else:
+            entry = self.team_index[key]
+            title = f"{entry['team']} – {league_title(entry['league'])} fixtures"
+        return paginate(title, [fmt_fixture(row) for row in rows])
+
+    def _render_table(self, league):
+        # computed from the fixture feed like /api/standings, else the last scraped table
+        feed = standings_feed(league)
+        if feed in self.leagues and any(played(row) for row in self.leagues[feed]):
+            table = StandingsTable()
+            table.update(self.leagues[feed])
+            rows = table.rows()
+        else:
+            name = standings_name(league)
+            if name not in self.standings:
+                return None
+            rows = read_file(os.path.join(STANDINGS_FOLDER, f"{name}.json"), "standings")
+            if not rows:
+                return None
+        return paginate(f"{league_title(league)} table", [fmt_table_row(row) for row in rows], rows=20)
+
+def load_league_data(current=None):
+    # the current indexes while no league file changed, else indexes rebuilt from disk
+    version = league_data_version()
+    if current is not None and current.version == version:
+        return current
+    data = LeagueData(version)
+    logging.info(f"League pages: {len(data.leagues)} leagues, {len(data.team_fixtures)} teams indexed")
+    return data
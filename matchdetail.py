@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from fetcher import Fetcher
+from httpcache import CachedBody
+from snapshot import status_bucket
+from metrics import registry
+
+# livescore scoreboard per event (Eid); point it at a local stub with GOAL2GOL_MATCH_DETAIL_URL
+MATCH_DETAIL_URL = os.environ.get(
+    "GOAL2GOL_MATCH_DETAIL_URL", "https://prod-public-api.livescore.com/v1/api/app/scoreboard/soccer/{match_id}"
+)
+
+MAX_MATCH_ENTRIES = 2048
+# seconds a fetched detail is served before the next request refetches it, per status bucket
+MATCH_TTLS = {"live": 15, "fixtures": 300, "finished": 3600, "other": 60}
+# unknown upstream ids and failed fetches are remembered too, so a burst cannot reach upstream
+NOT_FOUND_TTL = 300
+ERROR_TTL = 10
+# followers give up waiting on the leader's fetch after this long
+FETCH_WAIT = 10
+FETCH_TIMEOUT = 5
+# threads running the fetches started by get_async; waiters on the event loop hold none
+FETCH_THREADS = 8
+
+MATCH_LOOKUPS = registry.counter(
+    "goal2gol_match_detail_lookups_total", "Match detail lookups by result (hit, miss, coalesced, stale)", ("result",)
+)
+MATCH_ENTRIES = registry.gauge("goal2gol_match_detail_entries", "Match details held in memory")
+
+def fetch_details(match_ids, fetcher):
+    # match_id -> FetchResult, all requested at once
+    urls = {match_id: MATCH_DETAIL_URL.format(match_id=match_id) for match_id in match_ids}
+    return fetcher.fetch_all(urls, deadline=FETCH_WAIT, timeout=FETCH_TIMEOUT, revalidate=set())
+
+class MatchEntry:
+    def __init__(self, body, ttl, bucket=None, error=None):
+        # body: CachedBody of the upstream payload, None when upstream has no such match or failed
+        self.body = body
+        self.bucket = bucket
+        self.error = error
+        self.expires = time.monotonic() + ttl
+
+    def fresh(self):
+        return time.monotonic() < self.expires
+
+    def max_age(self):
+        return max(1, int(self.expires - time.monotonic()))
+
+def detail_body(match_id, data):
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # versioned by content, so refetching an unchanged match keeps its ETag
+    version = ("match", match_id, hashlib.sha1(raw).hexdigest())
+    return CachedBody(version, None, int(time.time()), raw=raw, key=("match", match_id))
+
+# -----------------------------
+# TTL/LRU cache with single-flight fetches
+# -----------------------------
+class MatchDetailCache:
+    def __init__(self, fetch=None, max_entries=MAX_MATCH_ENTRIES):
+        self.fetcher = Fetcher(max_workers=8, timeout=FETCH_TIMEOUT)
+        self.fetch = fetch or (lambda match_ids: fetch_details(match_ids, self.fetcher))
+        self.max_entries = max_entries
+        # ids one warm fetch can start at the per-host rate and still finish within FETCH_WAIT
+        self.warm_batch = max(1, int((FETCH_WAIT - FETCH_TIMEOUT) / max(self.fetcher.host_interval, 0.001)))
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # match_id -> Future resolved when the fetch in flight for it lands
+        self._inflight = {}
+        self._executor = None
+
+    def _claim(self, match_id):
+        # (entry, None, False) for a fresh entry, else (None, flight, True if this caller fetches)
+        with self._lock:
+            entry = self._entries.get(match_id)
+            if entry is not None and entry.fresh():
+                self._entries.move_to_end(match_id)
+                MATCH_LOOKUPS.inc(result="hit")
+                return entry, None, False
+            flight = self._inflight.get(match_id)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[match_id] = Future()
+        # a follower waits for the leader's result instead of calling upstream
+        MATCH_LOOKUPS.inc(result="miss" if leader else "coalesced")
+        return None, flight, leader
+
+    def _landed(self, match_id):
+        with self._lock:
+            return self._entries.get(match_id)
+
+    def get(self, match_id):
+        entry, flight, leader = self._claim(match_id)
+        if flight is None:
+            return entry
+        if leader:
+            self._refresh([match_id])
+        else:
+            wait([flight], FETCH_WAIT)
+        return self._landed(match_id)
+
+    async def get_async(self, match_id):
+        # get() for the event loop: the fetch runs on the cache's own threads and every caller,
+        # leader or follower, awaits the flight without holding a thread of the server's pool
+        entry, flight, leader = self._claim(match_id)
+        if flight is None:
+            return entry
+        if leader:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(FETCH_THREADS, thread_name_prefix="match-detail")
+            self._executor.submit(self._refresh, [match_id])
+        await asyncio.wait([asyncio.wrap_future(flight)], timeout=FETCH_WAIT)
+        return self._landed(match_id)
+
+    def warm(self, match_ids, horizon=0):
+        # refetch the given matches that expire within horizon seconds and are not already being
+        # fetched, in batches of warm_batch so no batch outruns its deadline
+        soon = time.monotonic() + horizon
+        pending = list(dict.fromkeys(match_ids))
+        warmed = 0
+        while pending:
+            with self._lock:
+                due = []
+                while pending and len(due) < self.warm_batch:
+                    match_id = pending.pop(0)
+                    if match_id not in self._inflight \
+                            and (match_id not in self._entries or self._entries[match_id].expires <= soon):
+                        due.append(match_id)
+                for match_id in due:
+                    self._inflight[match_id] = Future()
+            if due:
+                self._refresh(due)
+                warmed += len(due)
+        return warmed
+
+    def _refresh(self, match_ids):
+        # callers have registered match_ids in _inflight; always released here
+        try:
+            try:
+                results = self.fetch(match_ids)
+            except Exception:
+                logging.exception("Match detail fetch failed")
+                results = {}
+            fresh = {}
+            for match_id in match_ids:
+                result = results.get(match_id)
+                if result is not None and result.ok and result.data is not None:
+                    bucket = status_bucket(result.data.get("Eps"))
+                    fresh[match_id] = MatchEntry(detail_body(match_id, result.data), MATCH_TTLS[bucket], bucket)
+                elif result is not None and result.status == 404:
+                    fresh[match_id] = MatchEntry(None, NOT_FOUND_TTL)
+                else:
+                    error = result.error if result is not None else "no result"
+                    logging.warning(f"Match detail {match_id}: {error}")
+                    fresh[match_id] = error
+            with self._lock:
+                for match_id, entry in fresh.items():
+                    previous = self._entries.get(match_id)
+                    if isinstance(entry, str):
+                        # upstream failed: keep serving the last good copy for a little longer
+                        if previous is not None:
+                            MATCH_LOOKUPS.inc(result="stale")
+                            previous.expires = time.monotonic() + ERROR_TTL
+                            continue
+                        entry = MatchEntry(None, ERROR_TTL, error=entry)
+                    self._entries[match_id] = entry
+                    self._entries.move_to_end(match_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                MATCH_ENTRIES.set(len(self._entries))
+        finally:
+            with self._lock:
+                for match_id in match_ids:
+                    flight = self._inflight.pop(match_id, None)
+                    if flight is not None:
+                        flight.set_result(None)
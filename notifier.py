@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import defaultdict
+from telegram.error import RetryAfter, Forbidden, BadRequest
+from snapshot import get_schedule_snapshot, normalize_name
+from fsutil import atomic_write
+
+DATA_FOLDER = "data"
+SUBSCRIPTIONS_FILE = os.path.join(DATA_FOLDER, "subscriptions.json")
+
+# Telegram allows about 30 messages/s overall and 1 message/s per chat
+GLOBAL_RATE = 25
+PER_CHAT_INTERVAL = 1.1
+MAX_SEND_RETRIES = 5
+MAX_CONCURRENT_SENDS = 50
+MAX_MESSAGE_LENGTH = 4096
+WATCH_INTERVAL = 3.0
+# match fields that trigger an alert for followers
+ALERT_FIELDS = ("matchStatus", "homeScore", "awayScore")
+
+# -----------------------------
+# Subscriptions
+# -----------------------------
+class Subscriptions:
+    def __init__(self, path=SUBSCRIPTIONS_FILE):
+        self.path = path
+        self.by_chat = defaultdict(set)
+        self.by_team = defaultdict(set)
+        try:
+            with open(path, encoding="utf-8") as f:
+                for chat_id, teams in json.load(f).items():
+                    for team in teams:
+                        self._add(int(chat_id), team)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logging.exception(f"Failed to load subscriptions from {path}")
+
+    def _add(self, chat_id, team):
+        self.by_chat[chat_id].add(team)
+        self.by_team[team].add(chat_id)
+
+    def follow(self, chat_id, team_name):
+        team = normalize_name(team_name)
+        self._add(chat_id, team)
+        return team
+
+    def unfollow(self, chat_id, team_name=None):
+        teams = [normalize_name(team_name)] if team_name else list(self.by_chat.get(chat_id, ()))
+        removed = []
+        for team in teams:
+            if team in self.by_chat.get(chat_id, ()):
+                self.by_chat[chat_id].discard(team)
+                self.by_team[team].discard(chat_id)
+                if not self.by_team[team]:
+                    del self.by_team[team]
+                removed.append(team)
+        if not self.by_chat.get(chat_id):
+            self.by_chat.pop(chat_id, None)
+        return removed
+
+    def followers(self, *team_names):
+        chats = set()
+        for name in team_names:
+            chats |= self.by_team.get(normalize_name(name), set())
+        return chats
+
+    def save(self):
+        payload = {str(chat_id): sorted(teams) for chat_id, teams in self.by_chat.items()}
+        atomic_write(self.path, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+# -----------------------------
+# Rate-limited send queue
+# -----------------------------
+class AlertQueue:
+    def __init__(self, send, global_rate=GLOBAL_RATE, per_chat_interval=PER_CHAT_INTERVAL,
+                 max_retries=MAX_SEND_RETRIES, max_concurrent=MAX_CONCURRENT_SENDS):
+        # send(chat_id, text) is a coroutine, e.g. bot.send_message
+        self.send = send
+        self.global_interval = 1.0 / global_rate
+        self.per_chat_interval = per_chat_interval
+        self.max_retries = max_retries
+        self.pending = {}
+        self.ready = asyncio.Queue()
+        self.next_allowed = {}
+        self._next_global = 0.0
+        self._paused_until = 0.0
+        self._sends = asyncio.Semaphore(max_concurrent)
+
+    def put(self, chat_id, line):
+        # alerts for a chat that is already waiting are batched into its next message
+        if chat_id in self.pending:
+            self.pending[chat_id].append(line)
+        else:
+            self.pending[chat_id] = [line]
+            self.ready.put_nowait(chat_id)
+
+    async def _global_slot(self):
+        now = time.monotonic()
+        slot = max(now, self._next_global, self._paused_until)
+        self._next_global = slot + self.global_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            chat_id = await self.ready.get()
+            wait = self.next_allowed.get(chat_id, 0.0) - time.monotonic()
+            if wait > 0:
+                loop.call_later(wait, self.ready.put_nowait, chat_id)
+                continue
+            await self._global_slot()
+            await self._sends.acquire()
+            lines = self.pending.pop(chat_id, [])
+            self.next_allowed[chat_id] = time.monotonic() + self.per_chat_interval
+            loop.create_task(self._deliver(chat_id, lines))
+
+    async def _deliver(self, chat_id, lines):
+        try:
+            for text in split_message(lines):
+                await self._send_with_retry(chat_id, text)
+        finally:
+            self._sends.release()
+
+    async def _send_with_retry(self, chat_id, text):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.send(chat_id, text)
+            except RetryAfter as e:
+                # flood control applies to the whole bot, hold every send back
+                retry_after = e.retry_after
+                delay = float(retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after)
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            except (Forbidden, BadRequest) as e:
+                logging.info(f"Dropping alert for chat {chat_id}: {e}")
+                return False
+            except Exception:
+                delay = min(60.0, 2 ** attempt) * random.uniform(0.5, 1.5)
+            else:
+                return True
+            if attempt == self.max_retries:
+                break
+            await asyncio.sleep(delay)
+        logging.error(f"Giving up on alert for chat {chat_id} after {self.max_retries + 1} attempts")
+        return False
+
+def split_message(lines):
+    chunk = []
+    size = 0
+    for line in lines:
+        if chunk and size + len(line) + 1 > MAX_MESSAGE_LENGTH:
+            yield "\n".join(chunk)
+            chunk, size = [], 0
+        chunk.append(line[:MAX_MESSAGE_LENGTH])
+        size += len(line) + 1
+    if chunk:
+        yield "\n".join(chunk)
+
+# -----------------------------
+# Score watcher
+# -----------------------------
+def alert_text(previous, match):
+    score = f"{match['homeScore']}-{match['awayScore']}" if match["homeScore"] is not None else "–"
+    scored = previous["homeScore"] != match["homeScore"] or previous["awayScore"] != match["awayScore"]
+    prefix = "⚽ GOAL! " if scored else ""
+    return f"{prefix}{match['homeTeamName']} {score} {match['awayTeamName']} ({match['matchStatus']})"
+
+class Notifier:
+    def __init__(self, subscriptions, queue, interval=WATCH_INTERVAL):
+        self.subscriptions = subscriptions
+        self.queue = queue
+        self.interval = interval
+        self.version = None
+        self.matches = {}
+
+    def diff(self, snapshot):
+        fresh = {m["matchId"]: m for m in snapshot.matches}
+        first = self.version is None
+        self.version = snapshot.version
+        previous_matches, self.matches = self.matches, fresh
+        if first:
+            return 0
+        sent = 0
+        for match_id, match in fresh.items():
+            previous = previous_matches.get(match_id)
+            # brand-new events are fixtures appearing in the feed, not something to alert on
+            if previous is None or all(previous.get(f) == match.get(f) for f in ALERT_FIELDS):
+                continue
+            chats = self.subscriptions.followers(match["homeTeamName"], match["awayTeamName"])
+            if not chats:
+                continue
+            text = alert_text(previous, match)
+            for chat_id in chats:
+                self.queue.put(chat_id, text)
+            sent += len(chats)
+        return sent
+
+    async def run(self):
+        while True:
+            try:
+                snapshot = await asyncio.to_thread(get_schedule_snapshot)
+                if snapshot is not None and snapshot.version != self.version:
+                    queued = self.diff(snapshot)
+                    if queued:
+                        logging.info(f"Queued {queued} match alerts")
+            except Exception:
+                logging.exception("Match alert watcher failed")
+            await asyncio.sleep(self.interval)
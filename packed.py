@@ -0,0 +1,308 @@
+import os
+import gzip
+import json
+import mmap
+import array
+import struct
+import hashlib
+import logging
+import threading
+from functools import cached_property
+from snapshot import ScheduleSnapshot, schedule_source, normalize_name, NOT_LIVE_STATUSES, FIXTURE_STATUSES
+from fsutil import atomic_write
+from httpcache import brotli, etag_for
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: publishing is not serialized between processes
+    fcntl = None
+
+# Set GOAL2GOL_SHARED_SNAPSHOT=1 when running several API workers: the schedule is published once
+# as a read-only file that every worker memory-maps, instead of each worker parsing its own copy.
+SHARED_SNAPSHOT = os.environ.get("GOAL2GOL_SHARED_SNAPSHOT", "") not in ("", "0")
+
+DATA_FOLDER = "data"
+PACKED_FOLDER = os.path.join(DATA_FOLDER, "packed")
+# {"file": "schedule-<sha1>.bin", "source": [version of the schedule it was built from]}
+PACKED_POINTER_FILE = os.path.join(PACKED_FOLDER, "current.json")
+PACKED_LOCK_FILE = os.path.join(PACKED_FOLDER, ".lock")
+# files kept besides the current one, for workers still holding the previous map
+KEEP_PREVIOUS = 1
+
+MAGIC = b"G2GPACK1"
+SCORE_GROUPS = ("all", "live", "fixtures")
+
+# -----------------------------
+# File layout
+# -----------------------------
+# MAGIC | uint32 header length | header JSON | padding to 8 | data
+# data: the unfiltered /api/scores body per group (all, live, fixtures), each holding its matches
+#       as compact comma separated JSON; their gzip/br encodings; the /api/leagues body;
+#       uint32 (start, end) of every match inside the "all" body; uint32 postings for the indexes.
+def dumps(content):
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class PackedWriter:
+    def __init__(self):
+        self.data = bytearray()
+
+    def add(self, blob):
+        start = len(self.data)
+        self.data += blob
+        return [start, len(blob)]
+
+    def add_encodings(self, raw):
+        encodings = {"gzip": self.add(gzip.compress(raw, compresslevel=6, mtime=0))}
+        if brotli is not None:
+            encodings["br"] = self.add(brotli.compress(raw, quality=5))
+        return encodings
+
+    def add_body(self, raw):
+        return {"raw": self.add(raw), **self.add_encodings(raw)}
+
+def build_packed(version, data):
+    snapshot = ScheduleSnapshot(version, data)
+    writer = PackedWriter()
+    positions = {
+        "all": range(len(snapshot.matches)),
+        "live": [i for i, m in enumerate(snapshot.matches) if m["matchStatus"] not in NOT_LIVE_STATUSES],
+        "fixtures": [i for i, m in enumerate(snapshot.matches) if m["matchStatus"] in FIXTURE_STATUSES],
+    }
+    encoded = [dumps(m) for m in snapshot.matches]
+
+    # each unfiltered /api/scores body is stored once, and its match array doubles as the group
+    # slice that paginated and multi-group responses are assembled from
+    groups = {}
+    bodies = {}
+    offsets = array.array("I")
+    for group in SCORE_GROUPS:
+        body_start = len(writer.data)
+        writer.data += b'{"' + group.encode() + b'":'
+        start = len(writer.data)
+        writer.data += b"["
+        for n, i in enumerate(positions[group]):
+            if n:
+                writer.data += b","
+            if group == "all":
+                offsets.extend((len(writer.data), len(writer.data) + len(encoded[i])))
+            writer.data += encoded[i]
+        writer.data += b"]"
+        groups[group] = [start, len(writer.data) - start]
+        writer.data += b',"nextCursor":null}'
+        raw = bytes(writer.data[body_start:])
+        bodies[f"scores:{group}"] = {"raw": [body_start, len(raw)], **writer.add_encodings(raw)}
+    bodies["leagues"] = writer.add_body(dumps(snapshot.leagues))
+
+    postings = array.array("I")
+    index = {}
+    sources = {
+        "league_id": snapshot.by_league_id, "league_name": snapshot.by_league_name,
+        "status": snapshot.by_status, "team": snapshot.by_team,
+        "match_id": {match_id: [i] for match_id, i in snapshot.by_match_id.items()},
+    }
+    for name, source in sources.items():
+        index[name] = {}
+        for key, items in source.items():
+            index[name][key] = [len(postings), len(items)]
+            postings.extend(items)
+    for group in ("live", "fixtures"):
+        index.setdefault("group", {})[group] = [len(postings), len(positions[group])]
+        postings.extend(positions[group])
+
+    offsets_at = writer.add(offsets.tobytes())
+    postings_at = writer.add(postings.tobytes())
+    header = dumps({
+        "version": list(version), "lastModified": snapshot.last_modified, "count": len(snapshot.matches),
+        "groups": groups, "offsets": offsets_at, "postings": postings_at, "index": index, "bodies": bodies,
+    })
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    prefix += b"\0" * (-len(prefix) % 8)
+    return prefix, writer.data
+
+# -----------------------------
+# Publishing
+# -----------------------------
+def read_pointer():
+    try:
+        with open(PACKED_POINTER_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def publish_packed(version, data):
+    os.makedirs(PACKED_FOLDER, exist_ok=True)
+    prefix, body = build_packed(version, data)
+    digest = hashlib.sha1(prefix)
+    digest.update(body)
+    filename = f"schedule-{digest.hexdigest()[:16]}.bin"
+    path = os.path.join(PACKED_FOLDER, filename)
+    if not os.path.exists(path):
+        atomic_write(path, prefix + body)
+    # workers compare "source" with the schedule they would otherwise parse
+    atomic_write(PACKED_POINTER_FILE, json.dumps({"file": filename, "source": list(version)}).encode("utf-8"))
+    # unlinked files stay readable through the maps workers already hold
+    packed = sorted(
+        (f for f in os.listdir(PACKED_FOLDER) if f.startswith("schedule-") and f.endswith(".bin") and f != filename),
+        key=lambda f: os.stat(os.path.join(PACKED_FOLDER, f)).st_mtime_ns, reverse=True,
+    )
+    for stale in packed[KEEP_PREVIOUS:]:
+        os.remove(os.path.join(PACKED_FOLDER, stale))
+    logging.info(f"Published packed schedule {filename}")
+    return path
+
+class publish_lock:
+    # one publisher at a time across workers; the others wait, then map what it wrote
+    def __enter__(self):
+        os.makedirs(PACKED_FOLDER, exist_ok=True)
+        self.f = open(PACKED_LOCK_FILE, "a")
+        if fcntl is not None:
+            fcntl.flock(self.f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.f, fcntl.LOCK_UN)
+        self.f.close()
+
+def publish_current():
+    version, load = schedule_source()
+    if version is None:
+        return None
+    with publish_lock():
+        pointer = read_pointer()
+        if pointer and pointer.get("source") == list(version):
+            return os.path.join(PACKED_FOLDER, pointer["file"])
+        data = load()
+        if not data:
+            return None
+        return publish_packed(version, data)
+
+# -----------------------------
+# Reading (zero-copy until a response is assembled)
+# -----------------------------
+class PackedBody:
+    # the httpcache body interface over slices of the map
+    def __init__(self, packed, spans, key):
+        self.version = packed.version
+        self.etag = etag_for(key, packed.version)
+        self.last_modified = packed.last_modified
+        self._packed = packed
+        self._spans = spans
+
+    @cached_property
+    def raw(self):
+        return self._packed.slice(self._spans["raw"])
+
+    def variant_etag(self, encoding):
+        if encoding is None:
+            return self.etag
+        return self.etag[:-1] + f'-{encoding}"'
+
+    def encoded(self, encoding):
+        if encoding in self._spans:
+            return self._packed.slice(self._spans[encoding])
+        return brotli.compress(self.raw, quality=5)
+
+class PackedSnapshot:
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a packed schedule")
+        (header_length,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._map[header_start:header_start + header_length])
+        self.base = header_start + header_length + (-(header_start + header_length) % 8)
+        # tuple, so ETags match the ones a single-process API hands out for the same data
+        self.version = tuple(header["version"])
+        self.last_modified = header["lastModified"]
+        self.count = header["count"]
+        self.groups = header["groups"]
+        self.index = header["index"]
+        self.bodies = header["bodies"]
+        view = memoryview(self._map)
+        self.offsets = self._view(view, header["offsets"]).cast("I")
+        self.postings = self._view(view, header["postings"]).cast("I")
+
+    def _view(self, view, span):
+        start, length = span
+        return view[self.base + start:self.base + start + length]
+
+    def slice(self, span):
+        start, length = span
+        return self._map[self.base + start:self.base + start + length]
+
+    def body(self, name, key):
+        # key: the response cache key the single-process API serves this body under
+        spans = self.bodies.get(name)
+        return PackedBody(self, spans, key) if spans else None
+
+    def _postings(self, kind, key):
+        span = self.index.get(kind, {}).get(key)
+        if span is None:
+            return []
+        start, count = span
+        return self.postings[start:start + count].tolist()
+
+    def query(self, league=None, team=None, status=None):
+        # same semantics as ScheduleSnapshot.query
+        candidates = []
+        if league is not None:
+            candidates.append(self._postings("league_id", league) or self._postings("league_name", normalize_name(league)))
+        if team is not None:
+            candidates.append(self._postings("team", normalize_name(team)))
+        if status is not None:
+            candidates.append(self._postings("status", status))
+        if not candidates:
+            return range(self.count)
+        candidates.sort(key=len)
+        smallest, others = candidates[0], [set(c) for c in candidates[1:]]
+        return [i for i in smallest if all(i in other for other in others)]
+
+    def position(self, match_id):
+        positions = self._postings("match_id", match_id)
+        return positions[0] if positions else None
+
+    def group(self, group):
+        return range(self.count) if group == "all" else self._postings("group", group)
+
+    def rows(self, positions):
+        # a JSON array of the given matches, copied straight out of the map
+        offsets = self.offsets
+        return b"[" + b",".join(self._map[self.base + offsets[2 * i]:self.base + offsets[2 * i + 1]] for i in positions) + b"]"
+
+_packed = None
+_packed_lock = threading.Lock()
+
+def get_packed_snapshot():
+    global _packed
+    try:
+        version, _ = schedule_source()
+    except Exception:
+        return _packed
+    if version is None:
+        return None
+    source = list(version)
+    current = _packed
+    if current is not None and current.source == source:
+        return current
+    # as with the parsed snapshot, requests keep the previous map while another thread publishes
+    if not _packed_lock.acquire(blocking=current is None):
+        return current
+    try:
+        if _packed is not None and _packed.source == source:
+            return _packed
+        try:
+            pointer = read_pointer()
+            if not pointer or pointer.get("source") != source:
+                publish_current()
+                pointer = read_pointer()
+            if pointer and pointer.get("source") == source:
+                _packed = PackedSnapshot(os.path.join(PACKED_FOLDER, pointer["file"]), source)
+        except Exception:
+            logging.exception("Failed to load packed schedule")
+        return _packed
+    finally:
+        _packed_lock.release()
@@ -0,0 +1,151 @@
+import time
+import queue
+import logging
+import threading
+import traceback
+from metrics import registry
+
+DEFAULT_STAGE_TIMEOUT = 300
+
+STAGE_SECONDS = registry.gauge("goal2gol_scrape_stage_duration_seconds", "Wall time of each stage in the last run", ("stage",))
+STAGE_SUCCESS = registry.gauge("goal2gol_scrape_stage_success", "1 if the stage completed in the last run, 0 if it failed", ("stage",))
+STAGE_STATUS = registry.gauge(
+    "goal2gol_scrape_stage_status", "Outcome of each stage in the last run (1 for the current status)", ("stage", "status")
+)
+STATUSES = ("ok", "failed", "timeout", "skipped")
+
+# -----------------------------
+# Stages
+# -----------------------------
+class StageDeadlineExceeded(Exception):
+    pass
+
+# deadline of the stage running on this thread, None outside a stage
+_current = threading.local()
+# name -> thread of the last run of each stage, so an abandoned run is not overlapped by the next
+_threads = {}
+_threads_lock = threading.Lock()
+
+def time_left(default):
+    # seconds the running stage has left, capped at default
+    deadline = getattr(_current, "deadline", None)
+    if deadline is None:
+        return default
+    return min(default, max(0.0, deadline - time.monotonic()))
+
+def check_deadline():
+    # writers call this first, so a stage abandoned at its timeout stops instead of writing on
+    deadline = getattr(_current, "deadline", None)
+    if deadline is not None and time.monotonic() >= deadline:
+        raise StageDeadlineExceeded("stage timeout passed, abandoning the rest of the stage")
+
+class Stage:
+    def __init__(self, name, run, deps=(), timeout=DEFAULT_STAGE_TIMEOUT, priority=100, default=True):
+        self.name = name
+        self.run = run
+        # stages that must finish successfully first; deps left out of a run are assumed satisfied
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        # lower starts first among stages that are ready at the same time
+        self.priority = priority
+        # False keeps the stage out of a plain run, it only runs when asked for by name
+        self.default = default
+
+class StageResult:
+    def __init__(self, name, status, elapsed=0.0, error=None):
+        self.name = name
+        self.status = status
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+def select_stages(stages, names=None):
+    known = {stage.name for stage in stages}
+    if names is None:
+        return {stage.name for stage in stages if stage.default}
+    unknown = set(names) - known
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}. Known: {', '.join(sorted(known))}")
+    return set(names)
+
+# -----------------------------
+# Scheduler
+# -----------------------------
+def run_stages(stages, names=None):
+    # every ready stage starts at once on its own daemon thread; a stage past its timeout is
+    # reported and abandoned, so it can neither hold back the rest of the run nor the process exit.
+    # An abandoned stage stops at its next fetch or write (time_left, check_deadline), and is not
+    # started again while its thread is still alive.
+    by_name = {stage.name: stage for stage in stages}
+    selected = select_stages(stages, names)
+    done = queue.Queue()
+    results = {}
+    running = {}
+
+    def worker(stage, deadline):
+        _current.deadline = deadline
+        started = time.perf_counter()
+        try:
+            stage.run()
+        except Exception:
+            done.put(StageResult(stage.name, "failed", time.perf_counter() - started, traceback.format_exc()))
+        else:
+            done.put(StageResult(stage.name, "ok", time.perf_counter() - started))
+
+    pending = sorted(selected, key=lambda name: (by_name[name].priority, name))
+    while pending or running:
+        for name in list(pending):
+            deps = [dep for dep in by_name[name].deps if dep in selected]
+            if any(dep in results and not results[dep].ok for dep in deps):
+                failed = [dep for dep in deps if dep in results and not results[dep].ok]
+                results[name] = StageResult(name, "skipped", error=f"dependency {', '.join(failed)} did not complete")
+                pending.remove(name)
+            elif all(dep in results for dep in deps):
+                pending.remove(name)
+                with _threads_lock:
+                    previous = _threads.get(name)
+                    if previous is not None and previous.is_alive():
+                        results[name] = StageResult(name, "skipped", error="the previous run of this stage is still going")
+                        continue
+                    running[name] = time.monotonic() + by_name[name].timeout
+                    thread = threading.Thread(target=worker, args=(by_name[name], running[name]),
+                                              name=f"stage-{name}", daemon=True)
+                    _threads[name] = thread
+                    thread.start()
+        if not running:
+            # nothing left can start: only a dependency cycle gets here
+            for name in pending:
+                results[name] = StageResult(name, "skipped", error="dependency cycle")
+            break
+
+        try:
+            result = done.get(timeout=max(0.0, min(running.values()) - time.monotonic()))
+        except queue.Empty:
+            result = None
+        if result is not None and result.name in running:
+            del running[result.name]
+            results[result.name] = result
+        now = time.monotonic()
+        for name, deadline in list(running.items()):
+            if now >= deadline:
+                del running[name]
+                results[name] = StageResult(name, "timeout", by_name[name].timeout,
+                                            f"no result after {by_name[name].timeout}s")
+
+    report(results)
+    return results
+
+def report(results):
+    for result in sorted(results.values(), key=lambda r: r.elapsed, reverse=True):
+        for status in STATUSES:
+            STAGE_STATUS.set(1 if status == result.status else 0, stage=result.name, status=status)
+        STAGE_SUCCESS.set(1 if result.ok else 0, stage=result.name)
+        if result.status != "skipped":
+            STAGE_SECONDS.set(round(result.elapsed, 6), stage=result.name)
+        if result.ok:
+            logging.info(f"Stage {result.name}: ok in {result.elapsed:.2f}s")
+        else:
+            logging.error(f"Stage {result.name}: {result.status} after {result.elapsed:.2f}s\n{result.error}")
@@ -0,0 +1,146 @@
+import json
+
+# -----------------------------
+# Compact schedule records
+# -----------------------------
+# The scraper stores each day's schedule in this shape instead of the full livescore payload:
+# {"format": 1,
+#  "stages": [[Sid, Cid, Snm, Cnm], ...],
+#  "teams": ["Arsenal", ...],
+#  "events": [[Eid, stage, home, away, Esd, Eps, Tr1, Tr2], ...]}
+# stage/home/away are positions in the stages/teams tables (home/away null when the feed has no team),
+# and events are grouped by stage in feed order. Readers accept the livescore shape as well, for
+# schedules written before the change and the SQLite store.
+SCHEDULE_FORMAT = 1
+
+EID, STAGE, HOME, AWAY, ESD, EPS, TR1, TR2 = range(8)
+SID, CID, SNM, CNM = range(4)
+# livescore event field -> record position
+EVENT_FIELDS = {"Esd": ESD, "Eps": EPS, "Tr1": TR1, "Tr2": TR2}
+
+def is_compact(data):
+    return isinstance(data, dict) and data.get("format") == SCHEDULE_FORMAT
+
+def event_team(evt, side):
+    teams = evt.get(side)
+    return teams[0].get("Nm") if teams else None
+
+class CompactSchedule:
+    def __init__(self):
+        self.stages = []
+        self.stage_positions = {}
+        self.teams = []
+        self.team_positions = {}
+        # Eid -> record, and per stage the Eids in feed order
+        self.events = {}
+        self.stage_events = []
+
+    @classmethod
+    def load(cls, data):
+        schedule = cls()
+        if is_compact(data):
+            for stage in data["stages"]:
+                schedule.stage_positions[stage[SID]] = len(schedule.stages)
+                schedule.stages.append(list(stage))
+                schedule.stage_events.append([])
+            schedule.teams = list(data["teams"])
+            schedule.team_positions = {name: i for i, name in enumerate(schedule.teams)}
+            for record in data["events"]:
+                schedule.events[record[EID]] = list(record)
+                schedule.stage_events[record[STAGE]].append(record[EID])
+        else:
+            for stage in (data or {}).get("Stages", []):
+                schedule.stage(stage)
+                for evt in stage.get("Events", []):
+                    schedule.upsert(stage, evt)
+        return schedule
+
+    def stage(self, stage):
+        # interned by Sid; a renamed stage keeps its position
+        row = [stage.get("Sid"), stage.get("Cid"), stage.get("Snm"), stage.get("Cnm")]
+        position = self.stage_positions.get(row[SID])
+        if position is None:
+            position = self.stage_positions[row[SID]] = len(self.stages)
+            self.stages.append(row)
+            self.stage_events.append([])
+        else:
+            self.stages[position] = row
+        return position
+
+    def team(self, name):
+        if name is None:
+            return None
+        position = self.team_positions.get(name)
+        if position is None:
+            position = self.team_positions[name] = len(self.teams)
+            self.teams.append(name)
+        return position
+
+    def record(self, stage, evt):
+        return [
+            evt.get("Eid"), self.stage(stage), self.team(event_team(evt, "T1")), self.team(event_team(evt, "T2")),
+            evt.get("Esd"), evt.get("Eps"), evt.get("Tr1"), evt.get("Tr2"),
+        ]
+
+    def upsert(self, stage, evt):
+        # stores the event's record and returns the one it replaced, None for a new event
+        if not evt.get("Eid"):
+            return None
+        record = self.record(stage, evt)
+        previous = self.events.get(record[EID])
+        if previous is None:
+            self.stage_events[record[STAGE]].append(record[EID])
+        elif previous[STAGE] != record[STAGE]:
+            self.stage_events[previous[STAGE]].remove(record[EID])
+            self.stage_events[record[STAGE]].append(record[EID])
+        self.events[record[EID]] = record
+        return previous
+
+    def to_json(self):
+        # teams are renumbered in order of first use, so the same schedule always encodes to the
+        # same bytes however it was built (a full update, live upserts, or read back from the store)
+        teams = []
+        renumbered = {}
+        events = []
+        for eids in self.stage_events:
+            for eid in eids:
+                record = list(self.events[eid])
+                for side in (HOME, AWAY):
+                    if record[side] is not None:
+                        position = renumbered.get(record[side])
+                        if position is None:
+                            position = renumbered[record[side]] = len(teams)
+                            teams.append(self.teams[record[side]])
+                        record[side] = position
+                events.append(record)
+        return {"format": SCHEDULE_FORMAT, "stages": self.stages, "teams": teams, "events": events}
+
+def compact_schedule(data):
+    return data if is_compact(data) else CompactSchedule.load(data).to_json()
+
+def encode_schedule(data):
+    # the bytes a schedule file holds: compact records, no whitespace
+    return json.dumps(compact_schedule(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def expand_schedule(data):
+    # the livescore shape, holding only the fields records keep
+    if not is_compact(data):
+        return data
+    teams = data["teams"]
+    stages = [
+        {"Sid": sid, "Cid": cid, "Snm": snm, "Cnm": cnm, "Events": []} for sid, cid, snm, cnm in data["stages"]
+    ]
+    for record in data["events"]:
+        evt = {"Eid": record[EID]}
+        for side, position in (("T1", HOME), ("T2", AWAY)):
+            if record[position] is not None:
+                evt[side] = [{"Nm": teams[record[position]]}]
+        for field, position in EVENT_FIELDS.items():
+            evt[field] = record[position]
+        stages[record[STAGE]]["Events"].append(evt)
+    return {"Stages": stages}
+
+def event_ids(data):
+    if is_compact(data):
+        return [record[EID] for record in data["events"]]
+    return [evt.get("Eid") for stage in data.get("Stages", []) for evt in stage.get("Events", [])]
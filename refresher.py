@@ -0,0 +1,141 @@
+import os
+import time
+import logging
+import threading
+import traceback
+from metrics import registry
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: every process refreshes
+    fcntl = None
+
+# Set GOAL2GOL_BACKGROUND_REFRESH=1 to have the API process scrape on its own schedule instead of
+# relying on a separately scheduled scraper.py run; one container then runs the whole service.
+BACKGROUND_REFRESH = os.environ.get("GOAL2GOL_BACKGROUND_REFRESH", "") not in ("", "0")
+# seconds between runs of each job
+LIVE_REFRESH_INTERVAL = float(os.environ.get("GOAL2GOL_REFRESH_LIVE", "30"))
+SCHEDULE_REFRESH_INTERVAL = float(os.environ.get("GOAL2GOL_REFRESH_SCHEDULE", "900"))
+FIXTURES_REFRESH_INTERVAL = float(os.environ.get("GOAL2GOL_REFRESH_FIXTURES", "21600"))
+
+DATA_FOLDER = "data"
+# held for the life of the process that refreshes, so only one of several workers scrapes
+REFRESH_LOCK_FILE = os.path.join(DATA_FOLDER, ".refresh.lock")
+
+# pipeline stages each slower job runs; deps outside a job are assumed done by the other job
+SCHEDULE_STAGES = ("schedule", "name_index")
+FIXTURES_STAGES = ("league_fixtures", "standings", "team_index", "name_index", "archive")
+
+REFRESH_SECONDS = registry.gauge("goal2gol_refresh_duration_seconds", "Duration of the last run of each refresh job", ("job",))
+REFRESH_LAST_SUCCESS = registry.gauge(
+    "goal2gol_refresh_last_success_timestamp_seconds", "Unix time of the last successful run of each refresh job", ("job",)
+)
+REFRESH_RUNS = registry.counter("goal2gol_refresh_runs_total", "Refresh job runs by result", ("job", "result"))
+
+# -----------------------------
+# Jobs
+# -----------------------------
+class RefreshJob:
+    def __init__(self, name, run, interval):
+        self.name = name
+        self.run = run
+        self.interval = interval
+
+def build_jobs():
+    # imported here: the scraper needs config.py, which a pure API deployment does not have
+    import scraper
+
+    live = scraper.LiveUpdater()
+    # the live tick patches an in-memory copy of the schedule the full update rewrites
+    schedule_lock = threading.Lock()
+
+    def run_stages(names):
+        results = scraper.updateToday(list(names))
+        failed = [name for name, result in results.items() if not result.ok]
+        if failed:
+            raise RuntimeError(f"stage(s) did not complete: {', '.join(sorted(failed))}")
+
+    def live_tick():
+        with schedule_lock:
+            live.tick()
+
+    def schedule_update():
+        with schedule_lock:
+            try:
+                run_stages(SCHEDULE_STAGES)
+            finally:
+                live.reset()
+
+    return [
+        RefreshJob("live", live_tick, LIVE_REFRESH_INTERVAL),
+        RefreshJob("schedule", schedule_update, SCHEDULE_REFRESH_INTERVAL),
+        RefreshJob("fixtures", lambda: run_stages(FIXTURES_STAGES), FIXTURES_REFRESH_INTERVAL),
+    ]
+
+# -----------------------------
+# Runner
+# -----------------------------
+class BackgroundRefresher:
+    def __init__(self, jobs, after_run=None):
+        self.jobs = jobs
+        # called after every successful run, e.g. to rebuild snapshots before a request needs them
+        self.after_run = after_run
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock_file = None
+
+    def _acquire_leader(self):
+        if fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(REFRESH_LOCK_FILE) or ".", exist_ok=True)
+        self._lock_file = open(REFRESH_LOCK_FILE, "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        return True
+
+    def start(self):
+        if self._threads:
+            return True
+        if not self._acquire_leader():
+            logging.info("Another process is refreshing the data, this one only serves it")
+            return False
+        for job in self.jobs:
+            # each job on its own thread, so a long fixtures run never delays a live tick
+            thread = threading.Thread(target=self._loop, args=(job,), name=f"refresh-{job.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logging.info(f"Background refresh started: {', '.join(f'{j.name} every {j.interval:g}s' for j in self.jobs)}")
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _loop(self, job):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.run_job(job)
+            self._stop.wait(max(0.0, job.interval - (time.monotonic() - started)))
+
+    def run_job(self, job):
+        # a failed run leaves the files, and so what is served, as the last good run wrote them
+        started = time.monotonic()
+        try:
+            job.run()
+            if self.after_run is not None:
+                self.after_run(job.name)
+        except Exception:
+            REFRESH_RUNS.inc(job=job.name, result="failed")
+            logging.error(f"Refresh job {job.name} failed:\n{traceback.format_exc()}")
+            return False
+        finally:
+            REFRESH_SECONDS.set(round(time.monotonic() - started, 6), job=job.name)
+        REFRESH_RUNS.inc(job=job.name, result="ok")
+        REFRESH_LAST_SUCCESS.set(int(time.time()), job=job.name)
+        return True
@@ -0,0 +1,74 @@
+from itertools import takewhile
+from snapshot import status_bucket
+
+# -----------------------------
+# Merging daily livescore feeds into one schedule
+# -----------------------------
+# event fields whose change is reported in the live change log
+LIVE_FIELDS = ("Tr1", "Tr2", "Eps")
+
+def event_freshness(evt):
+    # finished/called-off > live > not started, then match minute, then goals scored
+    status = evt.get("Eps") or ""
+    progress = {"fixtures": 0, "live": 1}.get(status_bucket(status), 2)
+    minute = 45 if status == "HT" else int("".join(takewhile(str.isdigit, status)) or 0)
+    home, away = str(evt.get("Tr1") or ""), str(evt.get("Tr2") or "")
+    goals = (int(home) if home.isdigit() else 0) + (int(away) if away.isdigit() else 0)
+    return (progress, minute, goals)
+
+class ScheduleMerger:
+    # one pass over every event: stages keyed by Sid, events by Eid. When an event shows up in
+    # more than one day's feed the fresher copy replaces the older one in place; on a tie the
+    # later day wins, so today's feed beats yesterday's for a match played across midnight.
+    def __init__(self):
+        self.stages = {}
+        self.events = {}
+        # events without an Eid: compact records, the store and live updates all key events by
+        # Eid, so such an event could never be written or kept current, and it is left out
+        self.dropped = 0
+
+    def add(self, day):
+        for stage in day.get("Stages", []):
+            stage_id = stage.get("Sid")
+            if not stage_id:
+                continue
+            merged = self.stages.get(stage_id)
+            if merged is None:
+                merged = self.stages[stage_id] = dict(stage, Events=[])
+            for evt in stage.get("Events", []):
+                event_id = evt.get("Eid")
+                if not event_id:
+                    self.dropped += 1
+                    continue
+                seen = self.events.get(event_id)
+                if seen is None:
+                    merged["Events"].append(evt)
+                    self.events[event_id] = (merged["Events"], len(merged["Events"]) - 1)
+                    continue
+                # freshness is only worked out when two feeds disagree on the score or status
+                events, position = seen
+                current = events[position]
+                if all(evt.get(field) == current.get(field) for field in LIVE_FIELDS) \
+                        or event_freshness(evt) >= event_freshness(current):
+                    events[position] = evt
+
+    def fill(self, day, date_strs):
+        # events of a previous schedule that start on one of date_strs and no fresh feed had
+        for stage in day.get("Stages", []):
+            stage_id = stage.get("Sid")
+            events = [
+                evt for evt in stage.get("Events", [])
+                if evt.get("Eid") and evt["Eid"] not in self.events and str(evt.get("Esd") or "")[:8] in date_strs
+            ]
+            if stage_id and events:
+                self.add({"Stages": [dict(stage, Events=events)]})
+
+    def result(self):
+        return {"Stages": list(self.stages.values())}
+
+def merge_stages(days):
+    # days in chronological order
+    merger = ScheduleMerger()
+    for day in days:
+        merger.add(day)
+    return merger.result()
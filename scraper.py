@@ -1,10 +1,27 @@
 import os
 import json
+import time
+import hashlib
+import argparse
 import datetime
+import contextlib
+from urllib.parse import unquote
 import logging
 import requests
 import traceback
 from config import telegram_bot_token, telegram_chatid
+from fetcher import Fetcher, Manifest, SourceHealth, DEFAULT_DEADLINE
+from store import open_store
+from fsutil import atomic_write
+from snapshot import publish_current_schedule, latest_schedule_file, file_version
+from schedulemerge import ScheduleMerger, merge_stages, LIVE_FIELDS
+from standings import compute_standings, standings_feed, standings_name
+from metrics import registry
+from pipeline import Stage, run_stages, time_left, check_deadline
+from search import build_name_index
+from records import CompactSchedule, compact_schedule, expand_schedule, is_compact, EVENT_FIELDS
+import archive
+import packed
 
 # -----------------------------
 # Logging & Setup
@@ -17,13 +34,29 @@ STANDINGS_FOLDER = os.path.join(DATA_FOLDER, "standings")
 MATCHES_FOLDER = os.path.join(DATA_FOLDER, "matches")
 SEASON_FIXTURES_FOLDER = os.path.join(DATA_FOLDER, "season_fixtures")
 LEAGUE_FIXTURES_FOLDER = os.path.join(DATA_FOLDER, "league_fixtures")
+LIVE_FOLDER = os.path.join(DATA_FOLDER, "live")
+# full livescore payloads, only written with GOAL2GOL_KEEP_RAW=1 (for debugging the normalization)
+RAW_FOLDER = os.path.join(DATA_FOLDER, "raw")
+KEEP_RAW_SCHEDULES = os.environ.get("GOAL2GOL_KEEP_RAW", "") not in ("", "0")
+MANIFEST_FILE = os.path.join(DATA_FOLDER, "fetch_manifest.json")
+# per-host latency estimates and circuit breaker state, kept between runs
+SOURCE_HEALTH_FILE = os.path.join(DATA_FOLDER, "source_health.json")
+TEAM_INDEX_FILE = os.path.join(DATA_FOLDER, "team_index.json")
+NAME_INDEX_FILE = os.path.join(DATA_FOLDER, "name_index.json")
+# node_exporter textfile collector target, rewritten at the end of every run
+METRICS_TEXTFILE = os.environ.get("GOAL2GOL_METRICS_TEXTFILE", os.path.join(DATA_FOLDER, "metrics", "scraper.prom"))
+LIVE_METRICS_TEXTFILE = os.environ.get(
+    "GOAL2GOL_LIVE_METRICS_TEXTFILE", os.path.join(DATA_FOLDER, "metrics", "scraper-live.prom")
+)
 
-for folder in [SCHEDULES_FOLDER, STANDINGS_FOLDER, MATCHES_FOLDER, SEASON_FIXTURES_FOLDER, LEAGUE_FIXTURES_FOLDER]:
+for folder in [SCHEDULES_FOLDER, STANDINGS_FOLDER, MATCHES_FOLDER, SEASON_FIXTURES_FOLDER, LEAGUE_FIXTURES_FOLDER, LIVE_FOLDER]:
     os.makedirs(folder, exist_ok=True)
 
 # -----------------------------
 # URLs & Config
 # -----------------------------
+# Team slugs served by /api/fixtures/{league}/{team}. These feeds are no longer downloaded:
+# each URL only tells build_team_index() which league feed and team a legacy slug refers to.
 TEAM_FIXTURE_URLS = {
     # example teams
     "arsenal": "https://fixturedownload.com/feed/json/epl-2025/arsenal",
@@ -306,9 +339,15 @@ LEAGUE_FIXTURE_URLS = {
 	"bundesliga": "https://fixturedownload.com/feed/json/bundesliga-2025",
 	"mls": "https://fixturedownload.com/feed/json/mls-2025",
 	"la-liga": "https://fixturedownload.com/feed/json/la-liga-2025",
-	"europa-league": "https://fixturedownload.com/feed/json/la-liga-2025"	
+	"europa-league": "https://fixturedownload.com/feed/json/europa-league-2025"
 	}
 
+# slug prefix for teams of cup competitions, so "cl-arsenal" does not clash with "arsenal"
+LEAGUE_TEAM_PREFIXES = {
+    "uefa-champions-league": "cl-",
+    "europa-league": "el-",
+}
+
 THESPORTSDB_LEAGUE_IDS = {
     "premier-league": 4328,
     "serie-a": 4332,
@@ -324,6 +363,23 @@ THESPORTSDB_LEAGUE_IDS = {
     "europa-league": 4481
 }
 CURRENT_SEASON_PARAM = "2025-2026"
+
+LIVE_POLL_INTERVAL = 15
+# days around today merged into today's schedule file, e.g. GOAL2GOL_DAYS_AHEAD=3 for a weekend view
+SCHEDULE_DAYS_BACK = int(os.environ.get("GOAL2GOL_DAYS_BACK", 1))
+SCHEDULE_DAYS_AHEAD = int(os.environ.get("GOAL2GOL_DAYS_AHEAD", 0))
+SCHEDULE_FETCH_BATCH = 4
+# shared across stages so keep-alive connections to fixturedownload.com are reused
+manifest = Manifest(MANIFEST_FILE)
+fetcher = Fetcher(
+    max_workers=8, host_intervals={"fixturedownload.com": 0.2}, manifest=manifest, health=SourceHealth(SOURCE_HEALTH_FILE)
+)
+# optional SQLite backend (GOAL2GOL_DB), written alongside the JSON tree
+store = open_store()
+
+RUN_SECONDS = registry.gauge("goal2gol_scrape_run_duration_seconds", "Wall time of the last run", ("mode",))
+LAST_SUCCESS = registry.gauge("goal2gol_scrape_last_success_timestamp_seconds", "Unix time of the last successful run", ("mode",))
+SAVED_FILES = registry.counter("goal2gol_scrape_files_total", "Data files handled by save_json, by result", ("result",))
 # -----------------------------
 # Helper Functions
 # -----------------------------
@@ -337,115 +393,439 @@ def send_telegram_alert(message: str):
     except Exception:
         pass
 
-def save_json(content, path):
+def load_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def save_json(content, path, compact=False):
+    # True when written, False when the file already held these bytes, None when the write failed
+    check_deadline()
     try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(content, f, ensure_ascii=False, indent=2)
+        if compact:
+            payload = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        else:
+            payload = json.dumps(content, ensure_ascii=False, indent=2).encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        if os.path.exists(path) and digest == (manifest.file_digest(path) or file_sha256(path)):
+            # identical bytes: leave the file (and its mtime) alone so readers keep their caches
+            logging.info(f"Unchanged, skipped {path}")
+            SAVED_FILES.inc(result="unchanged")
+            return False
+        atomic_write(path, payload)
+        manifest.record_file(path, digest)
         logging.info(f"Saved JSON to {path}")
+        SAVED_FILES.inc(result="written")
+        return True
     except Exception:
         logging.error(f"Failed to save JSON to {path}")
+        SAVED_FILES.inc(result="error")
+        return None
 
-def fetch_data_for_date(date_str):
+def save_schedule(data, date_str):
+    # livescore payloads are normalized to compact records (records.py) before they are written
+    if KEEP_RAW_SCHEDULES and not is_compact(data):
+        os.makedirs(RAW_FOLDER, exist_ok=True)
+        save_json(data, os.path.join(RAW_FOLDER, f"{date_str}.json"))
+    data = compact_schedule(data)
+    path = os.path.join(SCHEDULES_FOLDER, f"{date_str}.json")
+    save_json(data, path, compact=True)
+    if store is not None:
+        store.save_schedule(date_str, data)
+    # readers resolve the schedule through this pointer instead of listing the folder
+    publish_current_schedule(path)
+    if packed.SHARED_SNAPSHOT:
+        # pack it here so no API worker has to on its next request
+        try:
+            packed.publish_current()
+        except Exception:
+            logging.exception("Failed to publish packed schedule")
+
+def write_metrics(path=METRICS_TEXTFILE):
     try:
-        url = f"https://prod-public-api.livescore.com/v1/api/app/date/soccer/{date_str}/0"
-        res = requests.get(url, timeout=20)
-        res.raise_for_status()
-        return res.json()
-    except requests.RequestException:
-        return {}
+        registry.write_textfile(path)
+    except Exception:
+        logging.error(f"Failed to write metrics to {path}")
+
+def stage_transaction():
+    # one SQLite transaction per scrape stage; a no-op when the store is disabled
+    check_deadline()
+    return store.transaction() if store is not None else contextlib.nullcontext()
+
+def existing_keys(keys, folder):
+    return {key for key in keys if os.path.exists(os.path.join(folder, f"{key}.json"))}
+
+def schedule_url(date_str):
+    return f"https://prod-public-api.livescore.com/v1/api/app/date/soccer/{date_str}/0"
+
+def fetch_data_for_date(date_str):
+    return fetch_schedules([date_str])[date_str]
+
+def fetch_schedules(date_strs):
+    # all days in one fetch_all, so they are requested concurrently; None for a day that failed,
+    # so callers can tell a failed fetch from a day without matches
+    results = fetcher.fetch_all(
+        {d: schedule_url(d) for d in date_strs}, deadline=time_left(DEFAULT_DEADLINE), timeout=20, revalidate=set()
+    )
+    for d in date_strs:
+        if not results[d].ok:
+            logging.error(f"Could not fetch schedule for {d}: {results[d].error}")
+    return {d: (results[d].data or {}) if results[d].ok else None for d in date_strs}
 
 # -----------------------------
 # Scraper Functions
 # -----------------------------
-def save_team_fixture_data():
-    for team_name, url in TEAM_FIXTURE_URLS.items():
-        try:
-            response = requests.get(url, timeout=15)
-            response.raise_for_status()
-            save_json(response.json(), os.path.join(SEASON_FIXTURES_FOLDER, f"{team_name}.json"))
-        except Exception as e:
-            logging.error(f"Could not fetch fixture data for {team_name}: {e}")
-
 def save_league_fixture_data():
-    for league_name, url in LEAGUE_FIXTURE_URLS.items():
-        try:
-            response = requests.get(url, timeout=20)
-            response.raise_for_status()
-            save_json(response.json(), os.path.join(LEAGUE_FIXTURES_FOLDER, f"{league_name}.json"))
-        except Exception as e:
-            logging.error(f"Could not fetch full fixture data for {league_name}: {e}")
+    results = fetcher.fetch_all(
+        LEAGUE_FIXTURE_URLS, deadline=time_left(DEFAULT_DEADLINE), timeout=20,
+        revalidate=existing_keys(LEAGUE_FIXTURE_URLS, LEAGUE_FIXTURES_FOLDER)
+    )
+    saved = []
+    with stage_transaction():
+        for league_name, result in results.items():
+            if result.not_modified:
+                continue
+            if result.ok:
+                if save_json(result.data, os.path.join(LEAGUE_FIXTURES_FOLDER, f"{league_name}.json")) is None:
+                    continue
+                if store is not None:
+                    store.save_league_fixtures(league_name, result.data)
+                saved.append(result)
+            else:
+                logging.error(f"Could not fetch full fixture data for {league_name}: {result.error}")
+    # the next run only revalidates against a body that made it to disk and the store
+    for result in saved:
+        result.commit()
+
+def fixture_slug(team_name):
+    # fixturedownload.com team slug: "B. Dortmund" -> "b-dortmund", "Bodø/Glimt" -> "bodø-glimt"
+    return team_name.lower().replace(".", "").replace("/", "-").replace(" ", "-")
+
+def build_team_index():
+    # slug -> league feed + team name, derived from the league fixtures already on disk
+    index = {}
+    team_names = {}
+    for league_name in LEAGUE_FIXTURE_URLS:
+        rows = load_json(os.path.join(LEAGUE_FIXTURES_FOLDER, f"{league_name}.json")) or []
+        names = {name for row in rows for name in (row.get("HomeTeam"), row.get("AwayTeam")) if name}
+        team_names[league_name] = {fixture_slug(name): name for name in names}
+        prefix = LEAGUE_TEAM_PREFIXES.get(league_name, "")
+        for slug, name in sorted(team_names[league_name].items()):
+            index.setdefault(f"{prefix}{slug}", {"league": league_name, "team": name})
+
+    # legacy hand-picked slugs keep resolving to the same team they used to download
+    feed_leagues = {url: league_name for league_name, url in LEAGUE_FIXTURE_URLS.items()}
+    for slug, url in TEAM_FIXTURE_URLS.items():
+        feed, _, team_slug = url.rpartition("/")
+        league_name = feed_leagues.get(feed)
+        name = team_names.get(league_name, {}).get(unquote(team_slug))
+        if name:
+            index[slug] = {"league": league_name, "team": name}
+        else:
+            logging.warning(f"Team slug {slug} not found in {league_name or feed} fixtures")
+
+    save_json(index, TEAM_INDEX_FILE)
+    return index
+
+def save_name_index():
+    # names /api/search and slug resolution work from: fixture feed leagues and teams plus
+    # every team and competition in the current livescore schedule
+    league_fixtures = {
+        league_name: load_json(os.path.join(LEAGUE_FIXTURES_FOLDER, f"{league_name}.json")) or []
+        for league_name in LEAGUE_FIXTURE_URLS
+    }
+    team_index = load_json(TEAM_INDEX_FILE) or {}
+    schedule_path = latest_schedule_file()
+    schedule = load_json(schedule_path) if schedule_path else None
+    index = build_name_index(league_fixtures, team_index, schedule)
+    save_json(index, NAME_INDEX_FILE)
+    logging.info(f"Name index: {len(index['entries'])} entries, {len(index['keys'])} keys")
 
 def save_standings_from_thesportsdb():
-    for league_name, league_id in THESPORTSDB_LEAGUE_IDS.items():
-        try:
-            url = f"https://www.thesportsdb.com/api/v1/json/3/lookuptable.php?l={league_id}&s={CURRENT_SEASON_PARAM}"
-            response = requests.get(url, timeout=20)
-            response.raise_for_status()
-            data = response.json()
-            standings_data = data.get('table', [])
-            reformatted_data = []
-            for team in standings_data:
-                team_stats = {
-                    "rank": team.get('intRank'),
-                    "team": {"name": team.get('strTeam')},
-                    "games": team.get('intPlayed'),
-                    "wins": team.get('intWin'),
-                    "draws": team.get('intDraw'),
-                    "losses": team.get('intLoss'),
-                    "goalsFor": team.get('intGoalsFor'),
-                    "goalsAgainst": team.get('intGoalsAgainst'),
-                    "goalDifference": team.get('intGoalDifference'),
-                    "points": team.get('intPoints')
-                }
-                reformatted_data.append(team_stats)
-            save_json(reformatted_data, os.path.join(STANDINGS_FOLDER, f"{league_name}.json"))
-        except Exception as e:
-            logging.error(f"Failed to fetch standings for {league_name}: {e}")
+    # superseded by save_computed_standings, kept for leagues without a fixture feed
+    urls = {
+        league_name: f"https://www.thesportsdb.com/api/v1/json/3/lookuptable.php?l={league_id}&s={CURRENT_SEASON_PARAM}"
+        for league_name, league_id in THESPORTSDB_LEAGUE_IDS.items()
+    }
+    results = fetcher.fetch_all(
+        urls, deadline=time_left(DEFAULT_DEADLINE), timeout=20, revalidate=existing_keys(urls, STANDINGS_FOLDER)
+    )
+    saved = []
+    with stage_transaction():
+        for league_name, result in results.items():
+            # outside the try below, which would log the timeout and carry on
+            check_deadline()
+            if result.not_modified:
+                continue
+            if not result.ok:
+                logging.error(f"Failed to fetch standings for {league_name}: {result.error}")
+                continue
+            try:
+                standings_data = (result.data or {}).get('table') or []
+                reformatted_data = []
+                for team in standings_data:
+                    team_stats = {
+                        "rank": team.get('intRank'),
+                        "team": {"name": team.get('strTeam')},
+                        "games": team.get('intPlayed'),
+                        "wins": team.get('intWin'),
+                        "draws": team.get('intDraw'),
+                        "losses": team.get('intLoss'),
+                        "goalsFor": team.get('intGoalsFor'),
+                        "goalsAgainst": team.get('intGoalsAgainst'),
+                        "goalDifference": team.get('intGoalDifference'),
+                        "points": team.get('intPoints')
+                    }
+                    reformatted_data.append(team_stats)
+                if save_json(reformatted_data, os.path.join(STANDINGS_FOLDER, f"{league_name}.json")) is None:
+                    continue
+                if store is not None:
+                    store.save_standings(league_name, reformatted_data)
+                saved.append(result)
+            except Exception as e:
+                logging.error(f"Failed to fetch standings for {league_name}: {e}")
+    for result in saved:
+        result.commit()
+
+def save_computed_standings():
+    # tables come from the league fixture results already on disk, no extra upstream round trip
+    with stage_transaction():
+        for feed in LEAGUE_FIXTURE_URLS:
+            league_name = standings_name(feed)
+            if standings_feed(league_name) != feed:
+                continue
+            fixtures = load_json(os.path.join(LEAGUE_FIXTURES_FOLDER, f"{feed}.json"))
+            if not fixtures:
+                continue
+            table = compute_standings(fixtures)
+            save_json(table, os.path.join(STANDINGS_FOLDER, f"{league_name}.json"))
+            if store is not None:
+                store.save_standings(league_name, table)
+
+def schedule_window(today=None, days_back=None, days_ahead=None):
+    today = today or datetime.datetime.utcnow().date()
+    days_back = SCHEDULE_DAYS_BACK if days_back is None else days_back
+    days_ahead = SCHEDULE_DAYS_AHEAD if days_ahead is None else days_ahead
+    return [(today + datetime.timedelta(days=offset)).strftime("%Y%m%d") for offset in range(-days_back, days_ahead + 1)]
+
+def update_schedule():
+    dates = schedule_window()
+    today_str = datetime.datetime.utcnow().date().strftime("%Y%m%d")
+    # days are fetched concurrently in small batches and merged as each batch lands, so only
+    # one batch of raw feeds is held at a time however wide the window is
+    merger = ScheduleMerger()
+    fetched = 0
+    failed = set()
+    for start in range(0, len(dates), SCHEDULE_FETCH_BATCH):
+        batch = dates[start:start + SCHEDULE_FETCH_BATCH]
+        days = fetch_schedules(batch)
+        for date_str in batch:
+            day = days.pop(date_str)
+            if day is None:
+                failed.add(date_str)
+                continue
+            if day.get("Stages"):
+                fetched += 1
+            else:
+                logging.warning(f"No schedule data for {date_str}")
+            merger.add(day)
+    if not fetched:
+        raise RuntimeError(f"Livescore returned no stages for {dates[0]}-{dates[-1]}, keeping the current schedule")
+    if failed:
+        # a day whose fetch failed keeps the events the last good schedule had for it
+        yesterday_str = (datetime.datetime.utcnow().date() - datetime.timedelta(days=1)).strftime("%Y%m%d")
+        for date_str in (today_str, yesterday_str):
+            previous = load_json(os.path.join(SCHEDULES_FOLDER, f"{date_str}.json"))
+            if previous:
+                merger.fill(expand_schedule(previous), failed)
+                break
+        logging.warning(f"Kept last good events for {len(failed)} failed day(s): {', '.join(sorted(failed))}")
+    if merger.dropped:
+        logging.warning(f"Dropped {merger.dropped} event(s) without an Eid")
+    final_data = merger.result()
+    logging.info(f"Merged {len(merger.events)} events in {len(merger.stages)} stages from {fetched}/{len(dates)} days")
+    save_schedule(final_data, today_str)
+
+def compact_archive():
+    archive.compact(store=store)
+    archive.apply_retention(store=store)
 
 # -----------------------------
 # Main Update Function
 # -----------------------------
-def updateToday():
+# the schedule the API serves goes first and depends on nothing else; a slow or failing
+# fixtures/standings source only skips the stages that read its output
+UPDATE_STAGES = [
+    Stage("schedule", update_schedule, timeout=120, priority=0),
+    Stage("league_fixtures", save_league_fixture_data, timeout=180, priority=10),
+    Stage("standings", save_computed_standings, deps=("league_fixtures",), timeout=60, priority=20),
+    Stage("team_index", build_team_index, deps=("league_fixtures",), timeout=60, priority=20),
+    Stage("name_index", save_name_index, deps=("team_index", "schedule"), timeout=60, priority=30),
+    Stage("archive", compact_archive, deps=("schedule",), timeout=300, priority=30),
+    Stage("thesportsdb_standings", save_standings_from_thesportsdb, timeout=120, priority=40, default=False),
+]
+
+def updateToday(stage_names=None):
     logging.info("Starting daily update...")
+    started = time.perf_counter()
     try:
-        save_standings_from_thesportsdb()
-        save_team_fixture_data()
-        save_league_fixture_data()
+        results = run_stages(UPDATE_STAGES, stage_names)
+        failed = [r for r in results.values() if not r.ok]
+        if failed:
+            summary = "\n".join(f"{r.name}: {r.status}\n{(r.error or '')[-1000:]}" for r in failed)
+            logging.error(f"❌ updateToday: {len(failed)} stage(s) did not complete")
+            send_telegram_alert(f"❌ updateToday: {len(failed)} stage(s) did not complete:\n{summary}")
+        else:
+            LAST_SUCCESS.set(int(time.time()), mode="daily")
+            logging.info("✅ Daily update completed successfully.")
+        return results
+    finally:
+        manifest.save()
+        RUN_SECONDS.set(round(time.perf_counter() - started, 6), mode="daily")
+        write_metrics()
 
-        today_utc = datetime.datetime.utcnow().date()
-        yesterday_utc = today_utc - datetime.timedelta(days=1)
-        today_str = today_utc.strftime("%Y%m%d")
-        yesterday_str = yesterday_utc.strftime("%Y%m%d")
+# -----------------------------
+# Live Mode
+# -----------------------------
+def apply_live_update(schedule, fresh):
+    # upserts the events of `fresh` into the CompactSchedule and returns the reported changes;
+    # non-reported fields (kick-off time, team names) are kept current silently
+    changes = []
+    live_positions = [EVENT_FIELDS[field] for field in LIVE_FIELDS]
+    for fresh_stage in fresh.get("Stages", []):
+        stage_id = fresh_stage.get("Sid")
+        if not stage_id:
+            continue
+        for fresh_evt in fresh_stage.get("Events", []):
+            if not fresh_evt.get("Eid"):
+                continue
+            previous = schedule.upsert(fresh_stage, fresh_evt)
+            record = schedule.events[fresh_evt["Eid"]]
+            if previous is None:
+                changes.append(live_change("new", stage_id, fresh_evt))
+            elif any(previous[i] != record[i] for i in live_positions):
+                changes.append(live_change("update", stage_id, fresh_evt))
+    return changes
 
-        today_data = fetch_data_for_date(today_str)
-        yesterday_data = fetch_data_for_date(yesterday_str)
+def live_change(kind, stage_id, evt):
+    change = {"type": kind, "Sid": stage_id, "Eid": evt.get("Eid")}
+    for field in LIVE_FIELDS:
+        change[field] = evt.get(field)
+    return change
 
-        combined_stages = yesterday_data.get("Stages", []) + today_data.get("Stages", [])
+def write_change_log(date_str, changes):
+    stamp = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    path = os.path.join(LIVE_FOLDER, f"changes-{date_str}.jsonl")
+    try:
+        with open(path, 'a', encoding='utf-8') as f:
+            for change in changes:
+                f.write(json.dumps(dict(change, ts=stamp), ensure_ascii=False, separators=(",", ":")) + "\n")
+    except Exception:
+        logging.error(f"Failed to append live changes to {path}")
 
-        merged_stages = {}
-        for stage in combined_stages:
-            stage_id = stage.get("Sid")
-            if not stage_id:
-                continue
-            if stage_id not in merged_stages:
-                merged_stages[stage_id] = stage
-            else:
-                existing_events = {evt.get("Eid") for evt in merged_stages[stage_id].get("Events", [])}
-                new_events = [evt for evt in stage.get("Events", []) if evt.get("Eid") not in existing_events]
-                merged_stages[stage_id]["Events"].extend(new_events)
+class LiveUpdater:
+    # today's schedule held in memory and patched with each poll of the livescore feed
+    def __init__(self):
+        self.reset()
 
-        final_data = {"Stages": list(merged_stages.values())}
-        save_json(final_data, os.path.join(SCHEDULES_FOLDER, f"{today_str}.json"))
+    def reset(self):
+        # the next tick reloads from disk, e.g. after a full schedule update rewrote it
+        self.date_str = None
+        self.version = None
+        self.schedule = None
 
-        logging.info("✅ Daily update completed successfully.")
-    except Exception:
-        err = traceback.format_exc()
-        logging.error(f"❌ updateToday failed:\n{err}")
-        send_telegram_alert(f"❌ updateToday crashed:\n{err}")
-        raise
+    def source(self, today_str):
+        # the schedule a tick starts from and its version (file, plus the store's when enabled);
+        # before the first full update of the day that is the previous schedule, so yesterday's
+        # events (late finishes included) stay served until the full update replaces them
+        path = os.path.join(SCHEDULES_FOLDER, f"{today_str}.json")
+        if not os.path.exists(path):
+            path = latest_schedule_file()
+        try:
+            version = file_version(path) if path else None
+        except OSError:
+            version = None
+        if store is not None:
+            version = (version, store.version("schedule", today_str))
+        return path, version
+
+    def sync(self, today_str):
+        # reloads when the day changed or another writer (a cron full update, say) replaced the
+        # schedule since our last load or save, so its output is patched instead of overwritten
+        path, version = self.source(today_str)
+        if today_str == self.date_str and version == self.version:
+            return False
+        if today_str == self.date_str:
+            logging.info(f"Schedule changed since the last live tick, reloading {path}")
+        elif path != os.path.join(SCHEDULES_FOLDER, f"{today_str}.json"):
+            logging.info(f"No schedule for {today_str} yet, live updates start from {path}")
+        self.date_str, self.version = today_str, version
+        self.schedule = CompactSchedule.load(load_json(path) if path else None)
+        return True
+
+    def tick(self):
+        today_str = datetime.datetime.utcnow().date().strftime("%Y%m%d")
+        self.sync(today_str)
+
+        fresh = fetch_data_for_date(today_str)
+        if not fresh or not fresh.get("Stages"):
+            logging.warning("Live poll returned no stages, keeping current schedule.")
+            return None
+        changes = apply_live_update(self.schedule, fresh)
+        if changes and self.sync(today_str):
+            # a full update landed while the feed was polled: patch its copy instead
+            changes = apply_live_update(self.schedule, fresh)
+        if changes:
+            save_schedule(self.schedule.to_json(), today_str)
+            self.version = self.source(today_str)[1]
+            write_change_log(today_str, changes)
+            for change in changes:
+                logging.info(f"{change['type']} {change['Eid']}: {change['Tr1']}-{change['Tr2']} ({change['Eps']})")
+        LAST_SUCCESS.set(int(time.time()), mode="live")
+        return changes
+
+def run_live(interval=LIVE_POLL_INTERVAL):
+    logging.info(f"Starting live mode, polling every {interval}s...")
+    updater = LiveUpdater()
+    while True:
+        started = time.monotonic()
+        try:
+            updater.tick()
+        except Exception:
+            logging.error(f"Live tick failed:\n{traceback.format_exc()}")
+        RUN_SECONDS.set(round(time.monotonic() - started, 6), mode="live")
+        write_metrics(LIVE_METRICS_TEXTFILE)
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
 
 # -----------------------------
 # Run once (for Render Scheduled Job)
 # -----------------------------
 if __name__ == "__main__":
-    updateToday()
+    parser = argparse.ArgumentParser(description="Goal2Gol scraper")
+    parser.add_argument("--live", action="store_true", help="poll today's livescore feed and patch changed events")
+    parser.add_argument("--interval", type=float, default=LIVE_POLL_INTERVAL, help="live poll interval in seconds")
+    parser.add_argument("--days-back", type=int, default=SCHEDULE_DAYS_BACK, help="past days merged into the schedule")
+    parser.add_argument("--days-ahead", type=int, default=SCHEDULE_DAYS_AHEAD, help="future days merged into the schedule")
+    parser.add_argument("--stages", help="comma separated stages to run instead of the default set")
+    parser.add_argument("--list-stages", action="store_true", help="print the update stages and exit")
+    args = parser.parse_args()
+    SCHEDULE_DAYS_BACK, SCHEDULE_DAYS_AHEAD = max(0, args.days_back), max(0, args.days_ahead)
+    if args.list_stages:
+        for stage in UPDATE_STAGES:
+            deps = f" (after {', '.join(stage.deps)})" if stage.deps else ""
+            print(f"{stage.name}{'' if stage.default else ' [on request]'}: timeout {stage.timeout}s{deps}")
+    elif args.live:
+        run_live(args.interval)
+    else:
+        try:
+            results = updateToday(args.stages.split(",") if args.stages else None)
+        except ValueError as e:
+            parser.error(str(e))
+        if any(not r.ok for r in results.values()):
+            raise SystemExit(1)
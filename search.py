@@ -0,0 +1,218 @@
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from snapshot import normalize_name
+from standings import standings_name
+from records import expand_schedule
+
+# league fixture feed -> display name, then other names it goes by
+LEAGUE_NAMES = {
+    "premier-league": ("Premier League", "EPL", "English Premier League"),
+    "serie-a": ("Serie A",),
+    "efl-championship": ("Championship", "EFL Championship"),
+    "uefa-champions-league": ("Champions League", "UEFA Champions League", "UCL"),
+    "eredivisie": ("Eredivisie",),
+    "por-primeira-liga": ("Primeira Liga", "Liga Portugal"),
+    "tur-super-lig": ("Süper Lig",),
+    "ita-league-1": ("Ligue 1",),
+    "bundesliga": ("Bundesliga",),
+    "mls": ("MLS", "Major League Soccer"),
+    "la-liga": ("La Liga", "LaLiga"),
+    "europa-league": ("Europa League", "UEFA Europa League", "UEL"),
+}
+
+# fixture feed team name -> the names people (and livescore) use for it
+TEAM_ALIASES = {
+    "Man Utd": ("Manchester United", "Man United"),
+    "Man City": ("Manchester City",),
+    "Spurs": ("Tottenham", "Tottenham Hotspur"),
+    "Tottenham": ("Spurs", "Tottenham Hotspur"),
+    "Nott'm Forest": ("Nottingham Forest",),
+    "Wolves": ("Wolverhampton", "Wolverhampton Wanderers"),
+    "Newcastle": ("Newcastle United",),
+    "West Ham": ("West Ham United",),
+    "Leeds": ("Leeds United",),
+    "Brighton": ("Brighton & Hove Albion", "Brighton and Hove Albion"),
+    "Atleti": ("Atletico Madrid", "Atlético de Madrid"),
+    "Atlético de Madrid": ("Atletico Madrid", "Atleti"),
+    "B. Dortmund": ("Borussia Dortmund", "Dortmund", "BVB"),
+    "Bayern München": ("Bayern Munich", "Bayern"),
+    "FC Bayern München": ("Bayern Munich", "Bayern"),
+    "Leverkusen": ("Bayer Leverkusen",),
+    "Frankfurt": ("Eintracht Frankfurt",),
+    "Inter": ("Inter Milan", "Internazionale"),
+    "Milan": ("AC Milan",),
+    "Paris": ("Paris Saint-Germain", "PSG"),
+    "Paris Saint-Germain": ("PSG",),
+    "Olympique de Marseille": ("Marseille", "OM"),
+    "Olympique Lyonnais": ("Lyon",),
+    "LOSC Lille": ("Lille",),
+    "SL Benfica": ("Benfica",),
+    "Sporting CP": ("Sporting Lisbon", "Sporting"),
+    "Crvena Zvezda": ("Red Star Belgrade",),
+    "GNK Dinamo": ("Dinamo Zagreb",),
+    "M. Tel-Aviv": ("Maccabi Tel Aviv",),
+    "Copenhagen": ("FC Copenhagen", "FC København"),
+}
+
+# letters NFKD leaves alone
+FOLD_LETTERS = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ß": "ss", "đ": "d", "ł": "l", "ı": "i", "þ": "th"})
+# below this a fuzzy match is not trusted to stand in for a slug
+RESOLVE_MIN_SCORE = 0.5
+# names scoring this close to the best one make a resolve ambiguous; at most this many are listed
+RESOLVE_MARGIN = 0.05
+RESOLVE_MAX_MATCHES = 10
+# trigram similarity a search result needs to be listed
+SEARCH_MIN_SCORE = 0.3
+
+class AmbiguousName(Exception):
+    def __init__(self, name, matches):
+        super().__init__(f"'{name}' matches {len(matches)} names")
+        self.name = name
+        self.matches = matches
+
+def fold(name):
+    # "Nott'm Forest" -> "nottm forest", "Bodø/Glimt" -> "bodo glimt", "cl-atleti" -> "cl atleti"
+    folded = normalize_name(name).translate(FOLD_LETTERS)
+    folded = re.sub(r"['.’]", "", folded)
+    return " ".join(re.sub(r"[\W_]+", " ", folded).split())
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# -----------------------------
+# Index built at scrape time
+# -----------------------------
+def build_name_index(league_fixtures, team_index, schedule):
+    # league_fixtures: feed -> rows, team_index: slug -> {"league", "team"}, schedule: a day in either schedule format
+    entries = []
+    keys = defaultdict(list)
+
+    def add(entry, names):
+        entries.append(entry)
+        for key in {fold(name) for name in names if name}:
+            if key:
+                keys[key].append(len(entries) - 1)
+
+    for feed in league_fixtures:
+        names = LEAGUE_NAMES.get(feed) or (feed.replace("-", " ").title(),)
+        add(
+            {"kind": "league", "name": names[0], "slug": feed, "standings": standings_name(feed)},
+            (*names, feed, standings_name(feed)),
+        )
+
+    slugs = defaultdict(list)
+    for slug, entry in team_index.items():
+        slugs[(entry["league"], entry["team"])].append(slug)
+    for (league, team), team_slugs in sorted(slugs.items()):
+        team_slugs.sort(key=lambda s: (len(s), s))
+        add(
+            {"kind": "team", "name": team, "slug": team_slugs[0], "league": league},
+            (team, *TEAM_ALIASES.get(team, ()), *team_slugs),
+        )
+
+    # livescore names: teams and competitions the fixture feeds do not cover stay searchable,
+    # without a slug; a livescore team already known by that name adds nothing
+    competitions = set()
+    for stage in expand_schedule(schedule or {}).get("Stages", []):
+        country = stage.get("Cnm")
+        league_id = stage.get("Cid") or stage.get("Sid")
+        if stage.get("Snm") and league_id not in competitions:
+            competitions.add(league_id)
+            add(
+                {"kind": "competition", "name": stage["Snm"], "country": country, "leagueId": league_id},
+                (stage["Snm"], f"{country} {stage['Snm']}" if country else None),
+            )
+        for evt in stage.get("Events", []):
+            for side in ("T1", "T2"):
+                name = (evt.get(side) or [{}])[0].get("Nm")
+                key = fold(name)
+                if key and key not in keys:
+                    add({"kind": "team", "name": name, "country": country}, (name,))
+
+    return {"entries": entries, "keys": dict(keys)}
+
+# -----------------------------
+# Lookup
+# -----------------------------
+class NameIndex:
+    def __init__(self, data):
+        self.entries = data.get("entries", [])
+        self.keys = data.get("keys", {})
+        self.sorted_keys = sorted(self.keys)
+        # word -> keys containing it, for autocomplete on any word ("united" -> "man united")
+        words = defaultdict(set)
+        self.grams = defaultdict(list)
+        self.gram_counts = {}
+        for key in self.sorted_keys:
+            for word in key.split(" "):
+                words[word].add(key)
+            grams = trigrams(key)
+            self.gram_counts[key] = len(grams)
+            for gram in grams:
+                self.grams[gram].append(key)
+        self.words = {word: sorted(keys) for word, keys in words.items()}
+        self.sorted_words = sorted(self.words)
+
+    def _prefixed(self, sorted_items, prefix):
+        start = bisect_left(sorted_items, prefix)
+        for item in sorted_items[start:]:
+            if not item.startswith(prefix):
+                break
+            yield item
+
+    def scores(self, query):
+        # key -> score: exact 2, key prefix 1-1.5, word prefix 0.75-1, else trigram similarity
+        key = fold(query)
+        if not key:
+            return {}
+        found = {}
+        if key in self.keys:
+            found[key] = 2.0
+        for candidate in self._prefixed(self.sorted_keys, key):
+            found.setdefault(candidate, 1.0 + 0.5 * len(key) / len(candidate))
+        if " " not in key:
+            for word in self._prefixed(self.sorted_words, key):
+                for candidate in self.words[word]:
+                    found.setdefault(candidate, 0.75 + 0.25 * len(key) / len(candidate))
+        grams = trigrams(key)
+        shared = Counter(candidate for gram in grams for candidate in self.grams.get(gram, ()))
+        for candidate, count in shared.items():
+            if candidate not in found:
+                score = 2 * count / (len(grams) + self.gram_counts[candidate])
+                if score >= SEARCH_MIN_SCORE:
+                    found[candidate] = score
+        return found
+
+    def search(self, query, kind=None, limit=10):
+        best = {}
+        for key, score in self.scores(query).items():
+            for i in self.keys[key]:
+                if kind is None or self.entries[i]["kind"] == kind:
+                    best[i] = max(best.get(i, 0.0), score)
+        ranked = sorted(best.items(), key=lambda item: (-item[1], self.entries[item[0]]["name"]))
+        return [dict(self.entries[i], score=round(score, 3)) for i, score in ranked[:limit]]
+
+    def resolve(self, name, kind, league=None):
+        # the entry with a slug a route can serve; within league first when one is given.
+        # Raises AmbiguousName, with the contenders, when another entry scores about as well
+        best = {}
+        for key, score in self.scores(name).items():
+            if score < RESOLVE_MIN_SCORE:
+                continue
+            for i in self.keys[key]:
+                entry = self.entries[i]
+                if entry["kind"] != kind or "slug" not in entry:
+                    continue
+                rank = (league is not None and entry.get("league") == league, score)
+                best[i] = max(best.get(i, rank), rank)
+        if not best:
+            return None
+        ranked = sorted(best.items(), key=lambda item: (not item[1][0], -item[1][1], self.entries[item[0]]["name"]))
+        (top, (in_league, score)), runners_up = ranked[0], ranked[1:]
+        close = [i for i, rank in runners_up if rank[0] == in_league and score - rank[1] <= RESOLVE_MARGIN]
+        if close:
+            matches = [dict(self.entries[i], score=round(best[i][1], 3)) for i in [top, *close]]
+            raise AmbiguousName(name, matches[:RESOLVE_MAX_MATCHES])
+        return self.entries[top]
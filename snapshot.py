@@ -0,0 +1,303 @@
+import os
+import json
+import threading
+import unicodedata
+from collections import defaultdict, OrderedDict
+from store import open_store
+from fsutil import atomic_write
+from metrics import registry
+from archive import read_archived_day, archived_day_version
+from records import is_compact, EID, STAGE, HOME, AWAY, ESD, EPS, TR1, TR2
+
+DATA_FOLDER = "data"
+SCHEDULES_FOLDER = os.path.join(DATA_FOLDER, "schedules")
+# {"file": "20250912.json"}, rewritten atomically by the scraper after each schedule write
+CURRENT_SCHEDULE_FILE = os.path.join(DATA_FOLDER, "current_schedule.json")
+
+NOT_LIVE_STATUSES = {"NS", "FT", "Sched", "Cancelled", "Postponed", "Awarded"}
+FIXTURE_STATUSES = {"NS", "Sched"}
+FINISHED_STATUSES = {"FT"}
+
+FILE_LOAD_SECONDS = registry.histogram("goal2gol_file_load_seconds", "Time to read and parse a JSON data file", ("kind",))
+FILE_LOAD_BYTES = registry.counter("goal2gol_file_load_bytes_total", "Bytes of JSON data files parsed", ("kind",))
+SNAPSHOT_BUILD_SECONDS = registry.histogram("goal2gol_snapshot_build_seconds", "Time to flatten and index a schedule", ("source",))
+SNAPSHOT_RELOADS = registry.counter("goal2gol_snapshot_reloads_total", "Schedule snapshot reloads by result", ("result",))
+SCHEDULE_MATCHES = registry.gauge("goal2gol_schedule_matches", "Matches in the current schedule snapshot")
+SCHEDULE_BYTES = registry.gauge("goal2gol_schedule_bytes", "Size of the current schedule file")
+
+def normalize_name(name):
+    # lower-cased, accent-folded, single-spaced: "Atlético  Madrid" -> "atletico madrid"
+    folded = unicodedata.normalize("NFKD", name or "")
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(folded.lower().split())
+
+def status_bucket(status):
+    if status in FIXTURE_STATUSES:
+        return "fixtures"
+    if status in FINISHED_STATUSES:
+        return "finished"
+    if status in NOT_LIVE_STATUSES:
+        return "other"
+    return "live"
+
+# -----------------------------
+# Schedule flattening
+# -----------------------------
+def latest_schedule_file():
+    # constant time via the current pointer; the directory scan is only a fallback for trees without one
+    path = current_schedule_file()
+    if path is not None:
+        return path
+    try:
+        files = sorted(f for f in os.listdir(SCHEDULES_FOLDER) if f.endswith(".json"))
+    except FileNotFoundError:
+        return None
+    if not files:
+        return None
+    return os.path.join(SCHEDULES_FOLDER, files[-1])
+
+_pointer = (None, None)
+
+def current_schedule_file():
+    global _pointer
+    try:
+        version = file_version(CURRENT_SCHEDULE_FILE)
+    except OSError:
+        return None
+    cached_version, path = _pointer
+    if cached_version == version:
+        return path
+    try:
+        with open(CURRENT_SCHEDULE_FILE, encoding="utf-8") as f:
+            path = os.path.join(SCHEDULES_FOLDER, os.path.basename(json.load(f)["file"]))
+    except Exception:
+        return None
+    _pointer = (version, path)
+    return path
+
+def publish_current_schedule(path):
+    payload = json.dumps({"file": os.path.basename(path)}).encode("utf-8")
+    atomic_write(CURRENT_SCHEDULE_FILE, payload)
+
+def read_json_file(path, kind):
+    with FILE_LOAD_SECONDS.time(kind=kind):
+        with open(path, "rb") as f:
+            raw = f.read()
+        FILE_LOAD_BYTES.inc(len(raw), kind=kind)
+        return json.loads(raw)
+
+def flatten_schedule(data):
+    if is_compact(data):
+        return flatten_records(data)
+    all_matches = []
+    for league in data.get("Stages", []):
+        league_name = league.get("Snm", "Unknown League")
+        league_id = league.get("Cid") or league.get("Sid")
+        for evt in league.get("Events", []):
+            home_team = evt.get("T1")[0].get("Nm", "N/A") if evt.get("T1") else "N/A"
+            away_team = evt.get("T2")[0].get("Nm", "N/A") if evt.get("T2") else "N/A"
+            all_matches.append({
+                "leagueName": league_name,
+                "leagueId": league_id,
+                "homeTeamName": home_team,
+                "awayTeamName": away_team,
+                "matchTime": evt.get("Esd"),
+                "matchStatus": evt.get("Eps"),
+                "homeScore": evt.get("Tr1"),
+                "awayScore": evt.get("Tr2"),
+                "matchId": evt.get("Eid")
+            })
+    return all_matches
+
+def flatten_records(data):
+    # names come from the interned tables, each built once per schedule
+    teams = data["teams"]
+    stages = [("Unknown League" if snm is None else snm, cid or sid) for sid, cid, snm, cnm in data["stages"]]
+    return [
+        {
+            "leagueName": stages[r[STAGE]][0],
+            "leagueId": stages[r[STAGE]][1],
+            "homeTeamName": teams[r[HOME]] if r[HOME] is not None else "N/A",
+            "awayTeamName": teams[r[AWAY]] if r[AWAY] is not None else "N/A",
+            "matchTime": r[ESD],
+            "matchStatus": r[EPS],
+            "homeScore": r[TR1],
+            "awayScore": r[TR2],
+            "matchId": r[EID],
+        }
+        for r in data["events"]
+    ]
+
+def collect_leagues(data):
+    leagues = []
+    seen = set()
+    if is_compact(data):
+        data = {"Stages": [
+            {"Sid": sid, "Cid": cid, "Snm": "Unknown League" if snm is None else snm} for sid, cid, snm, cnm in data["stages"]
+        ]}
+    for league in data.get("Stages", []):
+        league_name = league.get("Snm", "Unknown League")
+        league_id = league.get("Cid") or league.get("Sid")
+        if league_id not in seen:
+            leagues.append({"leagueName": league_name, "leagueId": league_id})
+            seen.add(league_id)
+    return leagues
+
+# -----------------------------
+# Process-level snapshot cache
+# -----------------------------
+class ScheduleSnapshot:
+    def __init__(self, version, data):
+        self.version = version
+        # seconds since the epoch for file-backed snapshots, used for Last-Modified
+        self.last_modified = version[1] // 1_000_000_000 if len(version) > 1 and isinstance(version[1], int) else None
+        self.matches = flatten_schedule(data)
+        self.live = [m for m in self.matches if m["matchStatus"] not in NOT_LIVE_STATUSES]
+        self.fixtures = [m for m in self.matches if m["matchStatus"] in FIXTURE_STATUSES]
+        self.leagues = collect_leagues(data)
+
+        # positions into self.matches, ascending, so filtered results keep the feed order
+        self.by_league_id = defaultdict(list)
+        self.by_league_name = defaultdict(list)
+        self.by_status = defaultdict(list)
+        self.by_team = defaultdict(list)
+        self.by_match_id = {}
+        for i, m in enumerate(self.matches):
+            self.by_match_id[str(m["matchId"])] = i
+            self.by_league_id[str(m["leagueId"])].append(i)
+            self.by_league_name[normalize_name(m["leagueName"])].append(i)
+            self.by_status[status_bucket(m["matchStatus"])].append(i)
+            self.by_status[m["matchStatus"]].append(i)
+            self.by_team[normalize_name(m["homeTeamName"])].append(i)
+            if m["awayTeamName"] != m["homeTeamName"]:
+                self.by_team[normalize_name(m["awayTeamName"])].append(i)
+
+    def query(self, league=None, team=None, status=None):
+        candidates = []
+        if league is not None:
+            candidates.append(self.by_league_id.get(league) or self.by_league_name.get(normalize_name(league), []))
+        if team is not None:
+            candidates.append(self.by_team.get(normalize_name(team), []))
+        if status is not None:
+            candidates.append(self.by_status.get(status, []))
+        if not candidates:
+            return range(len(self.matches))
+
+        candidates.sort(key=len)
+        smallest, others = candidates[0], [set(c) for c in candidates[1:]]
+        return [i for i in smallest if all(i in other for other in others)]
+
+_snapshot_lock = threading.Lock()
+_snapshot = None
+
+def file_version(path):
+    # name + mtime + size identifies a schedule file without reading it
+    st = os.stat(path)
+    return (os.path.basename(path), st.st_mtime_ns, st.st_size)
+
+def _file_source():
+    path = latest_schedule_file()
+    if path is None:
+        return None, None
+    version = file_version(path)
+    return version, lambda: read_json_file(path, "schedule")
+
+def _store_source(store):
+    date = store.latest_schedule_date()
+    if date is None:
+        return None, None
+    return ("db", date, store.version("schedule", date)), lambda: store.load_schedule(date)
+
+def schedule_source():
+    # (version, load) of the schedule currently being served, without reading it
+    store = open_store()
+    return _store_source(store) if store is not None else _file_source()
+
+def get_schedule_snapshot():
+    global _snapshot
+    try:
+        version, load = schedule_source()
+    except Exception:
+        return _snapshot
+    if version is None:
+        return None
+
+    current = _snapshot
+    if current is not None and current.version == version:
+        return current
+
+    # stale-while-revalidate: while another thread rebuilds, requests keep the previous snapshot
+    # instead of queueing behind the parse; only a process with nothing to serve yet waits
+    if not _snapshot_lock.acquire(blocking=current is None):
+        SNAPSHOT_RELOADS.inc(result="stale")
+        return current
+    try:
+        # another thread may have reloaded while we waited for the lock
+        if _snapshot is not None and _snapshot.version == version:
+            return _snapshot
+        try:
+            data = load()
+        except Exception:
+            SNAPSHOT_RELOADS.inc(result="error")
+            return _snapshot
+        if not data:
+            SNAPSHOT_RELOADS.inc(result="empty")
+            return _snapshot
+        with SNAPSHOT_BUILD_SECONDS.time(source="current"):
+            _snapshot = ScheduleSnapshot(version, data)
+        SNAPSHOT_RELOADS.inc(result="ok")
+        SCHEDULE_MATCHES.set(len(_snapshot.matches))
+        if version[0] != "db":
+            SCHEDULE_BYTES.set(version[2])
+        return _snapshot
+    finally:
+        _snapshot_lock.release()
+
+# -----------------------------
+# Snapshots of past days
+# -----------------------------
+MAX_DAY_SNAPSHOTS = 16
+_day_snapshots = OrderedDict()
+_day_lock = threading.Lock()
+
+def _day_source(date_str):
+    store = open_store()
+    if store is not None:
+        version = store.version("schedule", date_str)
+        if version is not None:
+            return ("db", date_str, version), lambda: store.load_schedule(date_str)
+    path = os.path.join(SCHEDULES_FOLDER, f"{date_str}.json")
+    if os.path.isfile(path):
+        return file_version(path), lambda: read_json_file(path, "schedule")
+    version = archived_day_version(date_str)
+    if version is not None:
+        return version, lambda: read_archived_day(date_str)
+    return None, None
+
+def get_day_snapshot(date_str):
+    # a loose daily file, the store, or a seek into the monthly archive; a few recent days stay cached
+    try:
+        version, load = _day_source(date_str)
+    except Exception:
+        return None
+    if version is None:
+        return None
+    with _day_lock:
+        cached = _day_snapshots.get(date_str)
+        if cached is not None and cached.version == version:
+            _day_snapshots.move_to_end(date_str)
+            return cached
+    try:
+        data = load()
+    except Exception:
+        return None
+    if not data:
+        return None
+    with SNAPSHOT_BUILD_SECONDS.time(source="day"):
+        snapshot = ScheduleSnapshot(version, data)
+    with _day_lock:
+        _day_snapshots[date_str] = snapshot
+        _day_snapshots.move_to_end(date_str)
+        while len(_day_snapshots) > MAX_DAY_SNAPSHOTS:
+            _day_snapshots.popitem(last=False)
+    return snapshot
@@ -0,0 +1,113 @@
+POINTS_FOR_WIN = 3
+POINTS_FOR_DRAW = 1
+
+# standings name -> league fixture feed, where the two differ
+STANDINGS_FEEDS = {"ligue-1": "ita-league-1"}
+# cup competitions: their feeds mix league phase and knockout rounds, no single table
+CUP_FEEDS = {"uefa-champions-league", "europa-league"}
+
+def standings_feed(league):
+    feed = STANDINGS_FEEDS.get(league, league)
+    return None if feed in CUP_FEEDS else feed
+
+def standings_name(feed):
+    for league, league_feed in STANDINGS_FEEDS.items():
+        if league_feed == feed:
+            return league
+    return feed
+
+# -----------------------------
+# Standings computed from league fixtures
+# -----------------------------
+def fixture_result(fixture):
+    home_score = fixture.get("HomeTeamScore")
+    away_score = fixture.get("AwayTeamScore")
+    if home_score is None or away_score is None:
+        return None
+    return (fixture.get("HomeTeam"), fixture.get("AwayTeam"), int(home_score), int(away_score))
+
+def fixture_key(fixture):
+    return fixture.get("MatchNumber") or (fixture.get("RoundNumber"), fixture.get("HomeTeam"), fixture.get("AwayTeam"))
+
+class StandingsTable:
+    def __init__(self):
+        # team -> [games, wins, draws, losses, goalsFor, goalsAgainst, points]
+        self.teams = {}
+        # fixture key -> result currently counted in the table
+        self.applied = {}
+
+    def _team(self, name):
+        row = self.teams.get(name)
+        if row is None:
+            row = self.teams[name] = [0, 0, 0, 0, 0, 0, 0]
+        return row
+
+    def _count(self, result, sign):
+        home, away, home_score, away_score = result
+        for team, scored, conceded in ((home, home_score, away_score), (away, away_score, home_score)):
+            row = self._team(team)
+            row[0] += sign
+            if scored > conceded:
+                row[1] += sign
+                row[6] += sign * POINTS_FOR_WIN
+            elif scored == conceded:
+                row[2] += sign
+                row[6] += sign * POINTS_FOR_DRAW
+            else:
+                row[3] += sign
+            row[4] += sign * scored
+            row[5] += sign * conceded
+
+    def update(self, fixtures):
+        # only fixtures whose result differs from what is already counted touch the table
+        changed = 0
+        seen = set()
+        for fixture in fixtures:
+            for name in (fixture.get("HomeTeam"), fixture.get("AwayTeam")):
+                if name:
+                    self._team(name)
+            key = fixture_key(fixture)
+            seen.add(key)
+            result = fixture_result(fixture)
+            previous = self.applied.get(key)
+            if result == previous:
+                continue
+            if previous is not None:
+                self._count(previous, -1)
+                del self.applied[key]
+            if result is not None:
+                self._count(result, 1)
+                self.applied[key] = result
+            changed += 1
+        for key in [key for key in self.applied if key not in seen]:
+            self._count(self.applied.pop(key), -1)
+            changed += 1
+        return changed
+
+    def rows(self):
+        ranked = sorted(
+            self.teams.items(),
+            key=lambda item: (-item[1][6], -(item[1][4] - item[1][5]), -item[1][4], item[0]),
+        )
+        return [
+            {
+                "rank": rank,
+                "team": {"name": name},
+                "games": games,
+                "wins": wins,
+                "draws": draws,
+                "losses": losses,
+                "goalsFor": goals_for,
+                "goalsAgainst": goals_against,
+                "goalDifference": goals_for - goals_against,
+                "points": points,
+            }
+            for rank, (name, (games, wins, draws, losses, goals_for, goals_against, points)) in enumerate(ranked, 1)
+        ]
+
+def compute_standings(fixtures, as_of_round=None):
+    if as_of_round is not None:
+        fixtures = [f for f in fixtures if (f.get("RoundNumber") or 0) <= as_of_round]
+    table = StandingsTable()
+    table.update(fixtures)
+    return table.rows()
@@ -0,0 +1,302 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+import contextlib
+from fsutil import atomic_write
+from records import expand_schedule, encode_schedule
+
+# Set GOAL2GOL_DB to a file path to enable the SQLite backend; unset keeps the JSON tree only.
+DB_PATH = os.environ.get("GOAL2GOL_DB")
+
+DATA_FOLDER = "data"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+    PRIMARY KEY (kind, name)
+);
+CREATE TABLE IF NOT EXISTS stages (
+    date TEXT NOT NULL,
+    sid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (date, sid)
+);
+CREATE TABLE IF NOT EXISTS events (
+    date TEXT NOT NULL,
+    eid TEXT NOT NULL,
+    sid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    league_id TEXT,
+    league_name TEXT,
+    home TEXT,
+    away TEXT,
+    start_time INTEGER,
+    status TEXT,
+    home_score TEXT,
+    away_score TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (date, eid)
+);
+CREATE INDEX IF NOT EXISTS events_league ON events (date, league_id);
+CREATE INDEX IF NOT EXISTS events_status ON events (date, status);
+CREATE TABLE IF NOT EXISTS league_fixtures (
+    league TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    round INTEGER,
+    date_utc TEXT,
+    home TEXT,
+    away TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (league, position)
+);
+CREATE INDEX IF NOT EXISTS league_fixtures_home ON league_fixtures (home);
+CREATE INDEX IF NOT EXISTS league_fixtures_away ON league_fixtures (away);
+CREATE TABLE IF NOT EXISTS team_fixtures (
+    team TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (team, position)
+);
+CREATE TABLE IF NOT EXISTS standings (
+    league TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    team TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (league, position)
+);
+"""
+
+def dumps(content):
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+
+# -----------------------------
+# Store
+# -----------------------------
+class Store:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        # one connection per thread: the API serves sync routes from a thread pool
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextlib.contextmanager
+    def transaction(self):
+        # nested calls join the outer transaction, so a whole scrape stage commits at once
+        conn = self.connection()
+        if self._local.depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield conn
+        except Exception:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.execute("COMMIT")
+
+    def _bump(self, conn, kind, name):
+        conn.execute(
+            "INSERT INTO versions (kind, name, version) VALUES (?, ?, 1) "
+            "ON CONFLICT (kind, name) DO UPDATE SET version = version + 1, "
+            "updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')",
+            (kind, name),
+        )
+
+    def version(self, kind, name):
+        row = self.connection().execute(
+            "SELECT version FROM versions WHERE kind = ? AND name = ?", (kind, name)
+        ).fetchone()
+        return row[0] if row else None
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def save_schedule(self, date, data):
+        # compact records go in as the livescore-shaped rows the tables were built around
+        data = expand_schedule(data)
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM stages WHERE date = ?", (date,))
+            conn.execute("DELETE FROM events WHERE date = ?", (date,))
+            stage_rows = []
+            event_rows = []
+            for stage_pos, stage in enumerate(data.get("Stages", [])):
+                sid = stage.get("Sid")
+                if not sid:
+                    continue
+                league_id = stage.get("Cid") or sid
+                stage_rows.append((date, sid, stage_pos, dumps(dict(stage, Events=[]))))
+                for event_pos, evt in enumerate(stage.get("Events", [])):
+                    event_rows.append((
+                        date, evt.get("Eid"), sid, event_pos, league_id, stage.get("Snm"),
+                        evt.get("T1")[0].get("Nm") if evt.get("T1") else None,
+                        evt.get("T2")[0].get("Nm") if evt.get("T2") else None,
+                        evt.get("Esd"), evt.get("Eps"), evt.get("Tr1"), evt.get("Tr2"), dumps(evt),
+                    ))
+            conn.executemany("INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?)", stage_rows)
+            conn.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", event_rows
+            )
+            self._bump(conn, "schedule", date)
+
+    def delete_schedule(self, date):
+        # once the day is in the monthly archive, or past retention
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM stages WHERE date = ?", (date,))
+            conn.execute("DELETE FROM events WHERE date = ?", (date,))
+            conn.execute("DELETE FROM versions WHERE kind = 'schedule' AND name = ?", (date,))
+
+    def save_league_fixtures(self, league, rows):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM league_fixtures WHERE league = ?", (league,))
+            conn.executemany(
+                "INSERT INTO league_fixtures VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(league, i, r.get("RoundNumber"), r.get("DateUtc"), r.get("HomeTeam"), r.get("AwayTeam"), dumps(r))
+                 for i, r in enumerate(rows)],
+            )
+            self._bump(conn, "league_fixtures", league)
+
+    def save_team_fixtures(self, team, rows):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM team_fixtures WHERE team = ?", (team,))
+            conn.executemany(
+                "INSERT INTO team_fixtures VALUES (?, ?, ?)", [(team, i, dumps(r)) for i, r in enumerate(rows)]
+            )
+            self._bump(conn, "team_fixtures", team)
+
+    def save_standings(self, league, rows):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM standings WHERE league = ?", (league,))
+            conn.executemany(
+                "INSERT INTO standings VALUES (?, ?, ?, ?)",
+                [(league, i, (r.get("team") or {}).get("name"), dumps(r)) for i, r in enumerate(rows)],
+            )
+            self._bump(conn, "standings", league)
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def _rows(self, sql, params):
+        return [json.loads(row[0]) for row in self.connection().execute(sql, params)]
+
+    def latest_schedule_date(self):
+        row = self.connection().execute("SELECT MAX(name) FROM versions WHERE kind = 'schedule'").fetchone()
+        return row[0] if row else None
+
+    def schedule_dates(self):
+        return [row[0] for row in self.connection().execute(
+            "SELECT name FROM versions WHERE kind = 'schedule' ORDER BY name"
+        )]
+
+    def load_schedule(self, date):
+        conn = self.connection()
+        stages = {}
+        ordered = []
+        for sid, data in conn.execute("SELECT sid, data FROM stages WHERE date = ? ORDER BY position", (date,)):
+            stage = json.loads(data)
+            stage["Events"] = []
+            stages[sid] = stage
+            ordered.append(stage)
+        if not ordered:
+            return None
+        for sid, data in conn.execute("SELECT sid, data FROM events WHERE date = ? ORDER BY sid, position", (date,)):
+            stages[sid]["Events"].append(json.loads(data))
+        return {"Stages": ordered}
+
+    def league_fixtures(self, league):
+        return self._rows("SELECT data FROM league_fixtures WHERE league = ? ORDER BY position", (league,))
+
+    def league_team_fixtures(self, league, team):
+        return self._rows(
+            "SELECT data FROM league_fixtures WHERE league = ? AND (home = ? OR away = ?) ORDER BY position",
+            (league, team, team),
+        )
+
+    def team_fixtures(self, team):
+        return self._rows("SELECT data FROM team_fixtures WHERE team = ? ORDER BY position", (team,))
+
+    def standings(self, league):
+        return self._rows("SELECT data FROM standings WHERE league = ? ORDER BY position", (league,))
+
+    # -----------------------------
+    # JSON tree import / export
+    # -----------------------------
+    def export_json(self, data_folder=DATA_FOLDER):
+        targets = {
+            "league_fixtures": (os.path.join(data_folder, "league_fixtures"), self.league_fixtures),
+            "team_fixtures": (os.path.join(data_folder, "season_fixtures"), self.team_fixtures),
+            "standings": (os.path.join(data_folder, "standings"), self.standings),
+            "schedule": (os.path.join(data_folder, "schedules"), self.load_schedule),
+        }
+        for folder, _ in targets.values():
+            os.makedirs(folder, exist_ok=True)
+        names = self.connection().execute("SELECT kind, name FROM versions ORDER BY kind, name").fetchall()
+        for kind, name in names:
+            folder, read = targets[kind]
+            if kind == "schedule":
+                # the same compact encoding scraper.save_schedule writes, so import + export round-trips
+                payload = encode_schedule(read(name))
+            else:
+                payload = json.dumps(read(name), ensure_ascii=False, indent=2).encode("utf-8")
+            atomic_write(os.path.join(folder, f"{name}.json"), payload)
+
+    def import_json(self, data_folder=DATA_FOLDER):
+        sources = [
+            (os.path.join(data_folder, "league_fixtures"), self.save_league_fixtures),
+            (os.path.join(data_folder, "season_fixtures"), self.save_team_fixtures),
+            (os.path.join(data_folder, "standings"), self.save_standings),
+            (os.path.join(data_folder, "schedules"), self.save_schedule),
+        ]
+        with self.transaction():
+            for folder, save in sources:
+                if not os.path.isdir(folder):
+                    continue
+                for filename in sorted(os.listdir(folder)):
+                    if not filename.endswith(".json"):
+                        continue
+                    with open(os.path.join(folder, filename), encoding="utf-8") as f:
+                        save(filename[:-len(".json")], json.load(f))
+
+_store = None
+_store_lock = threading.Lock()
+
+def open_store():
+    global _store
+    if not DB_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = Store(DB_PATH)
+        return _store
+
+# -----------------------------
+# python store.py import|export [data folder]
+# -----------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "export") or not DB_PATH:
+        print("usage: GOAL2GOL_DB=path python store.py import|export [data folder]")
+        sys.exit(1)
+    folder = sys.argv[2] if len(sys.argv) > 2 else DATA_FOLDER
+    if sys.argv[1] == "import":
+        open_store().import_json(folder)
+    else:
+        open_store().export_json(folder)
@@ -0,0 +1,121 @@
+import json
+import asyncio
+import logging
+from snapshot import get_schedule_snapshot
+
+# match fields whose change is pushed to subscribers
+DELTA_FIELDS = ("matchStatus", "homeScore", "awayScore", "matchTime")
+
+def encode_event(event, payload):
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+# -----------------------------
+# Live score broadcaster (Server-Sent Events)
+# -----------------------------
+class Subscriber:
+    def __init__(self, buffer_size):
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+
+class LiveBroadcaster:
+    def __init__(self, poll_interval=1.0, buffer_size=32, heartbeat=15.0, max_subscribers=10000):
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self.subscribers = set()
+        self.version = None
+        self.matches = {}
+        self._snapshot_event = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def ensure_started(self):
+        # lazy start: the first subscriber gets a full snapshot instead of waiting for the first poll
+        if self._task is None:
+            snapshot = await asyncio.to_thread(get_schedule_snapshot)
+            if snapshot is not None and self.version is None:
+                self.publish(snapshot)
+            self.start()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for sub in list(self.subscribers):
+            self._evict(sub)
+
+    @property
+    def full(self):
+        return len(self.subscribers) >= self.max_subscribers
+
+    async def _watch(self):
+        while True:
+            try:
+                # the snapshot reload parses JSON, keep it off the event loop
+                snapshot = await asyncio.to_thread(get_schedule_snapshot)
+                if snapshot is not None and snapshot.version != self.version:
+                    self.publish(snapshot)
+            except Exception:
+                logging.exception("Live stream watcher failed")
+            await asyncio.sleep(self.poll_interval)
+
+    def publish(self, snapshot):
+        fresh = {m["matchId"]: m for m in snapshot.matches}
+        first = self.version is None
+        changed = []
+        if not first:
+            for match_id, match in fresh.items():
+                previous = self.matches.get(match_id)
+                if previous is None or any(previous.get(f) != match.get(f) for f in DELTA_FIELDS):
+                    changed.append(match)
+        self.matches = fresh
+        self.version = snapshot.version
+        self._snapshot_event = None
+
+        if first:
+            # subscribers that connected before the first load got an empty snapshot: send the full one
+            payload = self.snapshot_event()
+        elif changed:
+            # encoded once, shared by every subscriber
+            payload = encode_event("delta", {"matches": changed})
+        else:
+            return
+        for sub in list(self.subscribers):
+            try:
+                sub.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                logging.info("Evicting slow live stream subscriber")
+                self._evict(sub)
+
+    def _evict(self, sub):
+        self.subscribers.discard(sub)
+        # drop the backlog, the client reconnects and starts from a fresh snapshot
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+    def snapshot_event(self):
+        if self._snapshot_event is None:
+            self._snapshot_event = encode_event("snapshot", {"matches": list(self.matches.values())})
+        return self._snapshot_event
+
+    async def stream(self):
+        sub = Subscriber(self.buffer_size)
+        self.subscribers.add(sub)
+        try:
+            yield self.snapshot_event()
+            while True:
+                try:
+                    payload = await asyncio.wait_for(sub.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if payload is None:
+                    break
+                yield payload
+        finally:
+            self.subscribers.discard(sub)
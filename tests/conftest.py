@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# -----------------------------
+# Fault-injecting upstream stub
+# -----------------------------
+class StubUpstream:
+    # path -> fault: {"status": 500} answers with that status, {"delay": 2} sleeps first,
+    # {"fail_first": 2} answers 500 to the first two requests, {"etag": "v1"} sends that ETag and
+    # answers 304 to a matching If-None-Match; paths without a fault answer 200
+    def __init__(self):
+        self.faults = {}
+        self.hits = Counter()
+        # arrival time and client port of every request, and the most requests in flight at once
+        self.requests = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, so connection reuse shows up as one client port
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.hits[self.path] += 1
+                    count = stub.hits[self.path]
+                    stub.requests.append((time.monotonic(), self.client_address[1]))
+                    stub.active += 1
+                    stub.peak = max(stub.peak, stub.active)
+                try:
+                    self._answer(count)
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def _answer(self, count):
+                fault = stub.faults.get(self.path, {})
+                if fault.get("delay"):
+                    time.sleep(fault["delay"])
+                status = fault.get("status", 200)
+                if count <= fault.get("fail_first", 0):
+                    status = 500
+                etag = fault.get("etag")
+                if etag is not None and status == 200 and self.headers.get("If-None-Match") == etag:
+                    status = 304
+                body = json.dumps(fault.get("body", {"path": self.path, "Eps": "FT"})).encode("utf-8")
+                if status == 304:
+                    body = b""
+                try:
+                    self.send_response(status)
+                    if etag is not None:
+                        self.send_header("ETag", etag)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    # the client gave up (timeout) before the answer was written
+                    pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.host = f"127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path):
+        return f"http://{self.host}{path}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub():
+    upstream = StubUpstream()
+    yield upstream
+    upstream.close()
@@ -0,0 +1,70 @@
+import os
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+import matchdetail
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCORE_URLS = (
+    "/api/scores",
+    "/api/scores?include=live,fixtures&limit=2",
+    "/api/scores?status=live",
+    "/api/scores?include=live",
+    "/api/leagues",
+)
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    schedules = os.path.join(REPO, "data", "schedules")
+    latest = sorted(os.listdir(schedules))[-1]
+    os.makedirs(tmp_path / "data" / "schedules")
+    shutil.copy(os.path.join(schedules, latest), tmp_path / "data" / "schedules" / latest)
+    monkeypatch.chdir(tmp_path)
+    return TestClient(api.app)
+
+def etags(client):
+    return {url: client.get(url).headers["etag"] for url in SCORE_URLS}
+
+def test_resources_of_one_data_version_have_distinct_etags(client):
+    tags = etags(client)
+    assert len(set(tags.values())) == len(SCORE_URLS)
+
+def test_etag_only_validates_its_own_resource(client):
+    tags = etags(client)
+    assert client.get("/api/scores", headers={"If-None-Match": tags["/api/scores"]}).status_code == 304
+    assert client.get("/api/leagues", headers={"If-None-Match": tags["/api/scores"]}).status_code == 200
+
+def test_shared_snapshot_serves_the_same_etags(client, monkeypatch):
+    single = etags(client)
+    monkeypatch.setattr(api, "SHARED_SNAPSHOT", True)
+    assert etags(client) == single
+    assert os.listdir(os.path.join("data", "packed"))
+
+def test_scores_contract_versions(client):
+    current = client.get("/api/scores").json()
+    legacy = client.get("/api/scores?v=1").json()
+    assert list(current) == ["all", "nextCursor"]
+    assert list(legacy) == ["live", "fixtures", "all", "nextCursor"]
+    assert legacy["all"] == current["all"]
+    assert client.get("/api/scores?v=1&include=live").json().keys() == {"live", "nextCursor"}
+    assert client.get("/api/scores?v=3").status_code == 422
+
+def test_legacy_contract_in_shared_snapshot_mode(client, monkeypatch):
+    single = client.get("/api/scores?v=1")
+    monkeypatch.setattr(api, "SHARED_SNAPSHOT", True)
+    shared = client.get("/api/scores?v=1")
+    assert shared.content == single.content
+    assert shared.headers["etag"] == single.headers["etag"]
+
+def test_match_detail_etag(client, stub, monkeypatch):
+    monkeypatch.setattr(matchdetail, "MATCH_DETAIL_URL", stub.url("/match/{match_id}"))
+    match_id = client.get("/api/scores").json()["all"][0]["matchId"]
+    first = client.get(f"/api/match/{match_id}")
+    assert first.status_code == 200 and first.json()["path"] == f"/match/{match_id}"
+    again = client.get(f"/api/match/{match_id}", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert stub.hits[f"/match/{match_id}"] == 1
+    assert client.get("/api/match/999999999999").status_code == 404
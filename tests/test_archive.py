@@ -0,0 +1,78 @@
+import os
+import json
+import datetime
+
+import pytest
+
+import archive
+from archive import compact, apply_retention, read_archived_day, find_event_day, load_index
+from records import encode_schedule
+from store import Store
+
+TODAY = datetime.date(2025, 10, 18)
+
+def day(date_str, eids):
+    stage = {"Sid": "s1", "Cid": "1", "Snm": "League", "Cnm": "Country"}
+    events = [{"Eid": eid, "T1": [{"Nm": "Home"}], "T2": [{"Nm": "Away"}], "Esd": int(f"{date_str}150000"), "Eps": "FT",
+               "Tr1": "1", "Tr2": "0"} for eid in eids]
+    return json.loads(encode_schedule({"Stages": [dict(stage, Events=events)]}))
+
+def write_day(date_str, eids):
+    data = day(date_str, eids)
+    with open(os.path.join(archive.SCHEDULES_FOLDER, f"{date_str}.json"), "wb") as f:
+        f.write(encode_schedule(data))
+    return data
+
+def generations(month):
+    return sorted(f for f in os.listdir(archive.ARCHIVE_FOLDER) if f.startswith(f"{month}-"))
+
+@pytest.fixture(autouse=True)
+def data_folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(archive.SCHEDULES_FOLDER)
+
+def test_old_days_round_trip_through_the_archive():
+    written = {d: write_day(d, [f"{d}-1", f"{d}-2"]) for d in ("20250901", "20250902", "20251017")}
+    compact(today=TODAY)
+    assert os.listdir(archive.SCHEDULES_FOLDER) == ["20251017.json"]
+    for date_str in ("20250901", "20250902"):
+        assert read_archived_day(date_str) == written[date_str]
+    assert find_event_day("20250902-1") == "20250902"
+    assert read_archived_day("20251017") is None
+
+def test_rewrite_keeps_the_previous_generation_for_readers():
+    write_day("20250901", ["a"])
+    compact(today=TODAY)
+    old_index = load_index("202509")
+    write_day("20250902", ["b"])
+    compact(today=TODAY)
+    # a reader that loaded the first index just before the swap can still seek into its file
+    assert generations("202509") == ["202509-1.json.gz", "202509-2.json.gz"]
+    offset, length = old_index["days"]["20250901"]
+    with open(os.path.join(archive.ARCHIVE_FOLDER, old_index["file"]), "rb") as f:
+        f.seek(offset)
+        assert f.read(length)
+    write_day("20250903", ["c"])
+    compact(today=TODAY)
+    assert generations("202509") == ["202509-2.json.gz", "202509-3.json.gz"]
+    assert [read_archived_day(d)["events"][0][0] for d in ("20250901", "20250902", "20250903")] == ["a", "b", "c"]
+
+def test_store_only_days_are_archived_and_expire(tmp_path):
+    store = Store(str(tmp_path / "goal2gol.db"))
+    store.save_schedule("20250905", day("20250905", ["x"]))
+    store.save_schedule("20240105", day("20240105", ["y"]))
+    store.save_schedule("20251017", day("20251017", ["z"]))
+    apply_retention(today=TODAY, store=store)
+    assert store.schedule_dates() == ["20250905", "20251017"]
+    compact(today=TODAY, store=store)
+    assert store.schedule_dates() == ["20251017"]
+    assert read_archived_day("20250905")["events"][0][0] == "x"
+
+def test_retention_drops_expired_months():
+    write_day("20240901", ["old"])
+    write_day("20250901", ["new"])
+    compact(today=TODAY)
+    apply_retention(today=TODAY)
+    assert read_archived_day("20240901") is None
+    assert read_archived_day("20250901") is not None
+    assert not [f for f in os.listdir(archive.ARCHIVE_FOLDER) if f.startswith("202409")]
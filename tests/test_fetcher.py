@@ -0,0 +1,212 @@
+import time
+
+import pytest
+
+import fetcher
+from fetcher import Fetcher, Manifest, SourceHealth, fetch_outcome
+
+@pytest.fixture(autouse=True)
+def fast_timings(monkeypatch):
+    monkeypatch.setattr(fetcher, "MIN_TIMEOUT", 0.2)
+    monkeypatch.setattr(fetcher, "RETRY_BACKOFF", 0.01)
+    monkeypatch.setattr(fetcher, "COOL_DOWN", 0.3)
+
+def make_fetcher(**kwargs):
+    kwargs.setdefault("host_interval", 0)
+    kwargs.setdefault("max_workers", 1)
+    return Fetcher(**kwargs)
+
+def fetch(f, urls, timeout=5, deadline=30):
+    return f.fetch_all(urls, deadline=deadline, timeout=timeout, revalidate=set())
+
+def open_circuit(f, stub):
+    stub.faults["/down"] = {"status": 500}
+    fetch(f, {i: stub.url("/down") for i in range(fetcher.FAILURE_THRESHOLD)})
+    assert not f.health.allow(stub.host)
+
+# -----------------------------
+# Pooled engine
+# -----------------------------
+def test_requests_run_concurrently_up_to_max_workers(stub):
+    for i in range(12):
+        stub.faults[f"/slow/{i}"] = {"delay": 0.2}
+    started = time.monotonic()
+    results = fetch(make_fetcher(max_workers=4), {i: stub.url(f"/slow/{i}") for i in range(12)})
+    assert all(r.ok for r in results.values())
+    assert stub.peak == 4
+    # three rounds of four, not twelve requests one after another
+    assert time.monotonic() - started < 12 * 0.2 / 2
+
+def test_requests_to_one_host_are_spaced(stub):
+    fetch(make_fetcher(host_interval=0.1, max_workers=6), {i: stub.url(f"/ok/{i}") for i in range(6)})
+    arrivals = sorted(at for at, _ in stub.requests)
+    assert min(b - a for a, b in zip(arrivals, arrivals[1:])) > 0.08
+
+def test_connections_are_kept_alive(stub):
+    results = fetch(make_fetcher(), {i: stub.url(f"/ok/{i}") for i in range(10)})
+    assert all(r.ok for r in results.values())
+    assert len({port for _, port in stub.requests}) == 1
+
+def test_every_result_reports_its_timing(stub):
+    stub.faults["/slow"] = {"delay": 0.2}
+    results = fetch(make_fetcher(max_workers=4), {"slow": stub.url("/slow"), "ok": stub.url("/ok")})
+    assert results["slow"].elapsed >= 0.2
+    assert 0 < results["ok"].elapsed < results["slow"].elapsed
+
+# -----------------------------
+# Adaptive timeout and retries
+# -----------------------------
+def test_timeout_follows_learned_latency(stub):
+    f = make_fetcher()
+    assert f.health.timeout_for(stub.host, 5) == 5
+    results = fetch(f, {i: stub.url(f"/ok/{i}") for i in range(10)})
+    assert all(r.ok for r in results.values())
+    assert f.health.timeout_for(stub.host, 5) == fetcher.MIN_TIMEOUT
+
+def test_slow_response_is_retried_with_a_longer_timeout(stub):
+    f = make_fetcher()
+    fetch(f, {i: stub.url(f"/ok/{i}") for i in range(10)})
+    stub.faults["/slow"] = {"delay": 0.3}
+    result = fetch(f, {"slow": stub.url("/slow")})["slow"]
+    # 0.2s then 0.4s: the first attempt times out, the retry gets the answer
+    assert result.ok
+    assert stub.hits["/slow"] == 2
+    assert f.health.sources[stub.host]["failures"] == 0
+
+def test_5xx_is_retried_within_the_budget(stub, monkeypatch):
+    monkeypatch.setattr(fetcher, "FAILURE_THRESHOLD", 100)
+    stub.faults["/down"] = {"status": 500}
+    result = fetch(make_fetcher(retries=2), {"down": stub.url("/down")})["down"]
+    assert result.status == 500 and not result.ok
+    assert stub.hits["/down"] == 3
+
+def test_transient_5xx_recovers_on_retry(stub):
+    stub.faults["/flaky"] = {"fail_first": 1}
+    result = fetch(make_fetcher(), {"flaky": stub.url("/flaky")})["flaky"]
+    assert result.ok
+    assert stub.hits["/flaky"] == 2
+
+def test_4xx_is_not_retried_and_keeps_the_circuit_closed(stub):
+    stub.faults["/missing"] = {"status": 404}
+    f = make_fetcher()
+    results = fetch(f, {i: stub.url("/missing") for i in range(10)})
+    assert all(r.status == 404 for r in results.values())
+    assert stub.hits["/missing"] == 10
+    assert f.health.allow(stub.host)
+
+# -----------------------------
+# Circuit breaker
+# -----------------------------
+def test_5xx_opens_the_circuit_and_fast_fails(stub):
+    stub.faults["/down"] = {"status": 500}
+    f = make_fetcher(retries=0)
+    results = fetch(f, {i: stub.url("/down") for i in range(20)})
+    outcomes = [fetch_outcome(results[i]) for i in range(20)]
+    assert stub.hits["/down"] == fetcher.FAILURE_THRESHOLD
+    assert outcomes[fetcher.FAILURE_THRESHOLD:] == ["circuit_open"] * (20 - fetcher.FAILURE_THRESHOLD)
+
+def test_circuit_closes_after_cool_down_when_the_probe_succeeds(stub):
+    f = make_fetcher(retries=0)
+    open_circuit(f, stub)
+    assert fetch(f, {"ok": stub.url("/ok")})["ok"].error.startswith("circuit open")
+    time.sleep(fetcher.COOL_DOWN + 0.05)
+    assert fetch(f, {"ok": stub.url("/ok")})["ok"].ok
+    source = f.health.sources[stub.host]
+    assert source["failures"] == 0 and source["opens"] == 0
+    assert f.health.allow(stub.host)
+
+def test_probe_answered_304_closes_the_circuit(stub, tmp_path):
+    stub.faults["/feed"] = {"etag": "v1"}
+    f = make_fetcher(retries=0, manifest=Manifest(str(tmp_path / "manifest.json")))
+    fetch(f, {"feed": stub.url("/feed")})["feed"].commit()
+    open_circuit(f, stub)
+    time.sleep(fetcher.COOL_DOWN + 0.05)
+    result = f.fetch_all({"feed": stub.url("/feed")}, deadline=30, timeout=5)["feed"]
+    assert result.status == 304 and fetch_outcome(result) == "not_modified"
+    assert f.health.sources[stub.host]["failures"] == 0
+    assert f.health.allow(stub.host) and f.health.allow(stub.host)
+
+def test_probe_with_unchanged_content_closes_the_circuit(stub, tmp_path):
+    f = make_fetcher(retries=0, manifest=Manifest(str(tmp_path / "manifest.json")))
+    fetch(f, {"feed": stub.url("/feed")})["feed"].commit()
+    open_circuit(f, stub)
+    time.sleep(fetcher.COOL_DOWN + 0.05)
+    # no validators, same bytes: the digest check marks it unchanged
+    result = f.fetch_all({"feed": stub.url("/feed")}, deadline=30, timeout=5)["feed"]
+    assert result.status == 200 and result.not_modified
+    assert f.health.allow(stub.host) and f.health.allow(stub.host)
+
+def test_failed_probe_reopens_with_a_longer_cool_down(stub):
+    f = make_fetcher(retries=0)
+    open_circuit(f, stub)
+    time.sleep(fetcher.COOL_DOWN + 0.05)
+    assert fetch(f, {"probe": stub.url("/down")})["probe"].status == 500
+    source = f.health.sources[stub.host]
+    assert source["opens"] == 2
+    assert source["openUntil"] - time.time() > fetcher.COOL_DOWN * 1.5
+    assert not f.health.allow(stub.host)
+
+def test_half_open_lets_one_probe_through():
+    health = SourceHealth()
+    for _ in range(fetcher.FAILURE_THRESHOLD):
+        health.record_failure("upstream", "500")
+    assert not health.allow("upstream")
+    health.sources["upstream"]["openUntil"] = 0
+    assert health.allow("upstream")
+    assert not health.allow("upstream")
+    health.record_success("upstream", 0.05)
+    assert health.allow("upstream") and health.allow("upstream")
+
+def test_health_persists_between_runs(stub, tmp_path):
+    path = str(tmp_path / "source_health.json")
+    f = make_fetcher(retries=0, health=SourceHealth(path))
+    open_circuit(f, stub)
+    reloaded = make_fetcher(health=SourceHealth(path))
+    assert fetch(reloaded, {"ok": stub.url("/ok")})["ok"].error.startswith("circuit open")
+    assert stub.hits["/ok"] == 0
+
+# -----------------------------
+# Validators are kept once the caller stored the body
+# -----------------------------
+def test_validators_wait_for_commit(stub, tmp_path):
+    stub.faults["/feed"] = {"etag": "v1"}
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    f = make_fetcher(manifest=manifest)
+    first = f.fetch_all({"feed": stub.url("/feed")}, deadline=30, timeout=5)["feed"]
+    assert first.ok and manifest.url_entry(stub.url("/feed")) == {}
+    # not committed (the save failed or the result was dropped): the next run fetches the body again
+    again = f.fetch_all({"feed": stub.url("/feed")}, deadline=30, timeout=5)["feed"]
+    assert again.status == 200 and again.data is not None
+    again.commit()
+    assert manifest.url_entry(stub.url("/feed"))["etag"] == "v1"
+    assert f.fetch_all({"feed": stub.url("/feed")}, deadline=30, timeout=5)["feed"].status == 304
+
+# -----------------------------
+# Deadline failures are ours, not the host's
+# -----------------------------
+def test_requests_that_miss_the_deadline_do_not_trip_the_breaker(stub):
+    # at 0.1s per request only about ten of forty can start within one second
+    f = make_fetcher(host_interval=0.1, max_workers=8)
+    results = fetch(f, {i: stub.url(f"/ok/{i}") for i in range(40)}, deadline=1)
+    errors = [r.error for r in results.values() if not r.ok]
+    assert errors and all(error.startswith("deadline exceeded") for error in errors)
+    assert f.health.sources[stub.host]["failures"] == 0
+    assert f.health.allow(stub.host)
+
+def test_timeout_cut_short_by_the_deadline_is_not_a_failure(stub):
+    stub.faults["/slow"] = {"delay": 1}
+    f = make_fetcher()
+    result = fetch(f, {"slow": stub.url("/slow")}, timeout=5, deadline=0.3)["slow"]
+    assert not result.ok
+    # fetch_all returns at the deadline; let the request it left running time out
+    time.sleep(0.5)
+    assert f.health.sources.get(stub.host, {}).get("failures", 0) == 0
+
+def test_deadline_miss_releases_the_half_open_probe(stub):
+    f = make_fetcher(retries=0, host_interval=0.5)
+    open_circuit(f, stub)
+    time.sleep(fetcher.COOL_DOWN + 0.05)
+    # the probe's slot lies past the deadline, so it never reaches the host
+    f._next_slot[stub.host] = time.monotonic() + 1
+    assert fetch(f, {"probe": stub.url("/ok")}, deadline=0.2)["probe"].error.startswith("deadline exceeded")
+    assert f.health.allow(stub.host)
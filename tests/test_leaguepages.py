@@ -0,0 +1,112 @@
+import os
+import json
+import asyncio
+
+import pytest
+
+import bot
+import leaguepages
+from leaguepages import PAGE_ROWS, load_league_data, paginate
+
+TEAMS = ["Arsenal", "Chelsea", "Everton", "Fulham", "Liverpool"]
+
+def fixtures(played):
+    # every pairing home and away, in kickoff order; the first `played` have a result
+    pairs = [(home, away) for home in TEAMS for away in TEAMS if home != away]
+    return [
+        {"MatchNumber": n, "RoundNumber": n // 2 + 1, "DateUtc": f"2025-08-{n + 1:02d} 15:00:00Z",
+         "HomeTeam": home, "AwayTeam": away,
+         "HomeTeamScore": 1 if n < played else None, "AwayTeamScore": 0 if n < played else None}
+        for n, (home, away) in enumerate(pairs)
+    ]
+
+def write_fixtures(played):
+    with open(os.path.join(leaguepages.LEAGUE_FIXTURES_FOLDER, "premier-league.json"), "w", encoding="utf-8") as f:
+        json.dump(fixtures(played), f)
+
+@pytest.fixture(autouse=True)
+def data_folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(leaguepages.LEAGUE_FIXTURES_FOLDER)
+    write_fixtures(played=12)
+    with open(leaguepages.TEAM_INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump({team.lower(): {"league": "premier-league", "team": team} for team in TEAMS}, f)
+
+def test_paginate_numbers_pages_only_when_there_are_several():
+    assert paginate("Empty", []) == ["Empty:\n"]
+    assert paginate("Short", ["a", "b"]) == ["Short:\na\nb"]
+    pages = paginate("Long", [str(i) for i in range(25)])
+    assert [page.split(":")[0] for page in pages] == ["Long (1/3)", "Long (2/3)", "Long (3/3)"]
+
+def test_fixture_lists_open_on_the_next_match():
+    data = load_league_data()
+    pages = data.pages("league", "premier-league")
+    assert len(pages) == 2
+    # twelve played: the thirteenth match is on the second page
+    assert data.first_page("league", "premier-league") == 12 // PAGE_ROWS
+    team_pages = data.pages("team", "arsenal")
+    assert team_pages == ["Arsenal – Premier League fixtures:\n" + "\n".join(
+        leaguepages.fmt_fixture(row) for row in fixtures(12) if "Arsenal" in (row["HomeTeam"], row["AwayTeam"])
+    )]
+    assert data.pages("league", "la-liga") is None
+
+def test_rendered_pages_are_cached_until_the_data_changes():
+    data = load_league_data()
+    pages = data.pages("table", "premier-league")
+    assert data.pages("table", "premier-league") is pages
+    assert load_league_data(data) is data
+    write_fixtures(played=20)
+    fresh = load_league_data(data)
+    assert fresh is not data
+    assert fresh.pages("table", "premier-league") != pages
+
+def test_evicts_the_least_recently_used_lists(monkeypatch):
+    monkeypatch.setattr(leaguepages, "MAX_CACHED_LISTS", 2)
+    data = load_league_data()
+    first = data.pages("team", "arsenal")
+    data.pages("team", "chelsea")
+    data.pages("team", "arsenal")
+    data.pages("team", "everton")
+    assert list(data._pages) == [("team", "arsenal"), ("team", "everton")]
+    assert data.pages("team", "arsenal") is first
+
+# -----------------------------
+# Bot page buttons
+# -----------------------------
+class FakeQuery:
+    def __init__(self, data):
+        self.data = data
+        self.edits = []
+
+    async def answer(self):
+        pass
+
+    async def edit_message_text(self, text, reply_markup=None):
+        self.edits.append((text, reply_markup))
+
+class FakeUpdate:
+    def __init__(self, data):
+        self.callback_query = FakeQuery(data)
+
+def press(data, monkeypatch, pages):
+    async def list_pages(kind, key):
+        return pages
+
+    monkeypatch.setattr(bot, "list_pages", list_pages)
+    update = FakeUpdate(data)
+    asyncio.run(bot.page_callback(update, None))
+    return update.callback_query.edits
+
+def test_page_button_is_clamped_to_the_pages_there_are_now(monkeypatch):
+    pages = ["one", "two", "three"]
+    # the list shrank since the keyboard was sent
+    (text, keyboard), = press("page:league:premier-league:7", monkeypatch, pages)
+    assert text == "three"
+    assert [button.text for button in keyboard.inline_keyboard[0]] == ["« Prev"]
+    (text, keyboard), = press("page:league:premier-league:-2", monkeypatch, pages)
+    assert text == "one"
+    assert [button.callback_data for button in keyboard.inline_keyboard[0]] == ["page:league:premier-league:1"]
+
+def test_page_button_for_a_list_that_is_gone(monkeypatch):
+    (text, keyboard), = press("page:team:nobody:1", monkeypatch, None)
+    assert text == "This list is no longer available." and keyboard is None
@@ -0,0 +1,56 @@
+import os
+import json
+import datetime
+
+import pytest
+
+# the scraper reads its Telegram settings from config.py, which only a configured checkout has
+pytest.importorskip("config")
+import scraper
+from records import encode_schedule
+
+STAGE = {"Sid": "s1", "Cid": "1", "Snm": "League", "Cnm": "Country"}
+
+def feed(*events):
+    rows = [
+        {"Eid": eid, "T1": [{"Nm": f"{eid} home"}], "T2": [{"Nm": f"{eid} away"}], "Eps": status, "Tr1": home, "Tr2": away}
+        for eid, status, home, away in events
+    ]
+    return {"Stages": [dict(STAGE, Events=rows)]}
+
+def saved_events(path):
+    with open(path, encoding="utf-8") as f:
+        return {record[0]: record[5:] for record in json.load(f)["events"]}
+
+@pytest.fixture
+def live(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for folder in (scraper.SCHEDULES_FOLDER, scraper.LIVE_FOLDER):
+        os.makedirs(folder, exist_ok=True)
+    monkeypatch.setattr(scraper, "store", None)
+    today = datetime.datetime.utcnow().date().strftime("%Y%m%d")
+    path = os.path.join(scraper.SCHEDULES_FOLDER, f"{today}.json")
+    with open(path, "wb") as f:
+        f.write(encode_schedule(feed(("1", "NS", "", ""))))
+    polled = {"feed": feed(("1", "12'", "1", "0"))}
+    monkeypatch.setattr(scraper, "fetch_data_for_date", lambda date_str: polled["feed"])
+    return scraper.LiveUpdater(), path, polled
+
+def test_live_tick_patches_the_schedule(live):
+    updater, path, _ = live
+    assert [c["type"] for c in updater.tick()] == ["update"]
+    assert saved_events(path)["1"] == ["12'", "1", "0"]
+    # its own save is not mistaken for another writer's
+    assert not updater.sync(updater.date_str)
+
+def test_full_update_output_is_not_overwritten(live):
+    updater, path, polled = live
+    updater.tick()
+    # the cron full update rewrites the file with a match the live process has never seen
+    with open(path, "wb") as f:
+        f.write(encode_schedule(feed(("1", "12'", "1", "0"), ("2", "NS", "", ""))))
+    polled["feed"] = feed(("1", "30'", "2", "0"))
+    updater.tick()
+    events = saved_events(path)
+    assert set(events) == {"1", "2"}
+    assert events["1"] == ["30'", "2", "0"]
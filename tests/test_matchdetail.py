@@ -0,0 +1,89 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+import matchdetail
+from matchdetail import MatchDetailCache
+
+@pytest.fixture
+def cache(stub, monkeypatch):
+    monkeypatch.setattr(matchdetail, "MATCH_DETAIL_URL", stub.url("/match/{match_id}"))
+    monkeypatch.setattr(matchdetail, "FETCH_WAIT", 1)
+    monkeypatch.setattr(matchdetail, "FETCH_TIMEOUT", 0.5)
+    return MatchDetailCache()
+
+def test_concurrent_requests_share_one_upstream_fetch(cache, stub):
+    stub.faults["/match/1"] = {"delay": 0.3, "body": {"Eid": "1", "Eps": "FT"}}
+    entries = []
+    threads = [threading.Thread(target=lambda: entries.append(cache.get("1"))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stub.hits["/match/1"] == 1
+    assert len(entries) == 20
+    assert len({entry.body.etag for entry in entries}) == 1
+
+def test_upstream_error_serves_the_cached_copy(cache, stub):
+    first = cache.get("2")
+    assert first.body is not None
+    stub.faults["/match/2"] = {"status": 500}
+    first.expires = 0
+    again = cache.get("2")
+    assert again is first
+    assert again.body.raw == first.body.raw
+    assert again.fresh()
+
+def test_upstream_error_without_a_cached_copy_is_remembered_briefly(cache, stub):
+    stub.faults["/match/3"] = {"status": 500}
+    entry = cache.get("3")
+    assert entry.body is None and entry.error
+    hits = stub.hits["/match/3"]
+    assert cache.get("3") is entry
+    assert stub.hits["/match/3"] == hits
+
+def test_warm_batches_fit_the_deadline(cache, stub):
+    assert cache.warm_batch == int((matchdetail.FETCH_WAIT - matchdetail.FETCH_TIMEOUT) / cache.fetcher.host_interval)
+    batches = []
+    fetch = cache.fetch
+    cache.fetch = lambda match_ids: batches.append(len(match_ids)) or fetch(match_ids)
+    match_ids = [str(100 + i) for i in range(23)]
+    assert cache.warm(match_ids) == 23
+    assert max(batches) <= cache.warm_batch
+    assert sum(batches) == 23
+    assert all(cache._entries[match_id].body is not None for match_id in match_ids)
+    assert cache.fetcher.health.allow(stub.host)
+    # everything is fresh now: nothing is due within the horizon
+    assert cache.warm(match_ids) == 0
+
+def test_async_waiters_share_one_fetch_without_holding_threads(cache, stub):
+    stub.faults["/match/4"] = {"delay": 0.3, "body": {"Eid": "4", "Eps": "FT"}}
+    threads = threading.active_count()
+    peak = []
+
+    async def run():
+        tasks = [asyncio.ensure_future(cache.get_async("4")) for _ in range(200)]
+        await asyncio.sleep(0.1)
+        peak.append(threading.active_count())
+        return await asyncio.gather(*tasks)
+
+    entries = asyncio.run(run())
+    assert stub.hits["/match/4"] == 1
+    assert all(entry is entries[0] and entry.body is not None for entry in entries)
+    # one fetch thread plus the fetcher's pool, not one thread per waiter
+    assert peak[0] - threads < 20
+
+def test_async_follower_gives_up_after_the_fetch_wait(monkeypatch):
+    monkeypatch.setattr(matchdetail, "FETCH_WAIT", 0.2)
+    release = threading.Event()
+    cache = MatchDetailCache(fetch=lambda match_ids: release.wait(5) and {})
+    leader = threading.Thread(target=cache.get, args=("5",))
+    leader.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert asyncio.run(cache.get_async("5")) is None
+    assert time.monotonic() - started < 1
+    release.set()
+    leader.join()
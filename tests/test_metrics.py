@@ -0,0 +1,21 @@
+from metrics import Registry
+
+def test_extra_labels_reach_every_sample():
+    registry = Registry()
+    registry.counter("requests_total", "Requests", ("route",)).inc(route="/api/scores")
+    registry.gauge("entries", "Entries").set(3)
+    registry.histogram("seconds", "Latency", buckets=(0.1,)).observe(0.05)
+    lines = [line for line in registry.render((("worker", "42"),)).splitlines() if not line.startswith("#")]
+    assert lines == [
+        'entries{worker="42"} 3',
+        'requests_total{route="/api/scores",worker="42"} 1',
+        'seconds_bucket{worker="42",le="0.1"} 1',
+        'seconds_bucket{worker="42",le="+Inf"} 1',
+        'seconds_sum{worker="42"} 0.05',
+        'seconds_count{worker="42"} 1',
+    ]
+
+def test_render_without_extra_labels_is_unchanged():
+    registry = Registry()
+    registry.counter("requests_total", "Requests", ("route",)).inc(route="/")
+    assert 'requests_total{route="/"} 1' in registry.render().splitlines()
@@ -0,0 +1,71 @@
+import os
+import json
+import shutil
+
+import pytest
+
+import packed
+from packed import PackedSnapshot, publish_current, get_packed_snapshot
+from snapshot import ScheduleSnapshot, schedule_source
+from records import compact_schedule
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def schedule(tmp_path, monkeypatch):
+    schedules = os.path.join(REPO, "data", "schedules")
+    latest = sorted(os.listdir(schedules))[-1]
+    os.makedirs(tmp_path / "data" / "schedules")
+    path = tmp_path / "data" / "schedules" / latest
+    shutil.copy(os.path.join(schedules, latest), path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(packed, "_packed", None)
+    return path
+
+def rewrite(path, drop):
+    # a new schedule version: the same day with its last `drop` events gone
+    with open(path, encoding="utf-8") as f:
+        data = compact_schedule(json.load(f))
+    data["events"] = data["events"][:-drop]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+def current_snapshot():
+    version, load = schedule_source()
+    return ScheduleSnapshot(version, load())
+
+def test_packed_snapshot_reads_back_what_was_published(schedule):
+    expected = current_snapshot()
+    reader = PackedSnapshot(publish_current(), list(expected.version))
+    assert reader.version == expected.version and reader.count == len(expected.matches)
+    body = json.loads(reader.body("scores:all", ("scores",)).raw)
+    assert body == {"all": expected.matches, "nextCursor": None}
+    assert json.loads(reader.rows(reader.group("live"))) == expected.live
+    league = expected.matches[0]["leagueId"]
+    assert list(reader.query(league=league)) == list(expected.query(league, None, None))
+    match = expected.matches[-1]
+    assert reader.position(match["matchId"]) == len(expected.matches) - 1
+
+def test_old_reader_keeps_its_snapshot_through_swaps(schedule):
+    old = PackedSnapshot(publish_current(), None)
+    old_body = bytes(old.body("scores:all", ("scores",)).raw)
+    old_rows = old.rows(range(old.count))
+    for drop in (1, 2):
+        rewrite(schedule, drop)
+        publish_current()
+    # two publishes later the old file is unlinked, and the map still reads the old bytes
+    assert not os.path.exists(old.path)
+    assert bytes(old.body("scores:all", ("scores",)).raw) == old_body
+    assert old.rows(range(old.count)) == old_rows
+    new = PackedSnapshot(os.path.join(packed.PACKED_FOLDER, packed.read_pointer()["file"]), None)
+    assert new.count == old.count - 3
+
+def test_requests_keep_the_current_map_while_another_thread_publishes(schedule):
+    first = get_packed_snapshot()
+    assert get_packed_snapshot() is first
+    rewrite(schedule, 1)
+    with packed._packed_lock:
+        # the publishing thread holds the lock: readers are served the previous snapshot
+        assert get_packed_snapshot() is first
+    swapped = get_packed_snapshot()
+    assert swapped is not first and swapped.count == first.count - 1
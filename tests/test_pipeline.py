@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+import pipeline
+from pipeline import Stage, StageDeadlineExceeded, run_stages, time_left, check_deadline
+
+@pytest.fixture(autouse=True)
+def forget_threads():
+    yield
+    pipeline._threads.clear()
+
+def test_stages_run_after_their_deps():
+    order = []
+    stages = [
+        Stage("b", lambda: order.append("b"), deps=("a",)),
+        Stage("a", lambda: order.append("a")),
+    ]
+    results = run_stages(stages)
+    assert order == ["a", "b"]
+    assert all(r.ok for r in results.values())
+
+def test_failed_dep_skips_the_stage():
+    def fail():
+        raise RuntimeError("upstream down")
+
+    results = run_stages([Stage("a", fail), Stage("b", lambda: None, deps=("a",))])
+    assert results["a"].status == "failed"
+    assert results["b"].status == "skipped"
+
+def test_outside_a_stage_there_is_no_deadline():
+    assert time_left(300) == 300
+    check_deadline()
+
+def test_stage_sees_its_own_deadline():
+    seen = []
+    run_stages([Stage("a", lambda: seen.append(time_left(300)), timeout=5)])
+    assert 4 < seen[0] <= 5
+
+def test_abandoned_stage_stops_at_its_next_write():
+    release = threading.Event()
+    outcome = []
+
+    def slow():
+        release.wait(5)
+        try:
+            check_deadline()
+            outcome.append("wrote")
+        except StageDeadlineExceeded:
+            outcome.append("stopped")
+
+    stage = Stage("slow", slow, timeout=0.2)
+    assert run_stages([stage])["slow"].status == "timeout"
+    # the next run does not start a second copy while the first is still alive
+    assert run_stages([stage])["slow"].status == "skipped"
+    release.set()
+    pipeline._threads["slow"].join(5)
+    assert outcome == ["stopped"]
+    assert run_stages([Stage("slow", lambda: None)])["slow"].ok
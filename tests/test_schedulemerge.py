@@ -0,0 +1,46 @@
+from records import compact_schedule, expand_schedule
+from schedulemerge import ScheduleMerger, merge_stages
+
+def event(eid, status="NS", home="", away="", esd="20251018150000"):
+    evt = {"Eps": status, "Tr1": home, "Tr2": away, "Esd": esd, "T1": [{"Nm": "Home"}], "T2": [{"Nm": "Away"}]}
+    if eid is not None:
+        evt["Eid"] = eid
+    return evt
+
+def day(*stages):
+    return {"Stages": [{"Sid": sid, "Cid": "1", "Snm": sid, "Cnm": "Country", "Events": events} for sid, events in stages]}
+
+def eids(schedule):
+    return [evt.get("Eid") for stage in schedule["Stages"] for evt in stage["Events"]]
+
+def test_fresher_copy_replaces_the_older_one_in_place():
+    merged = merge_stages([
+        day(("s1", [event("1", "FT", "2", "1"), event("2", "NS")])),
+        day(("s1", [event("2", "45'", "0", "0"), event("1", "NS")])),
+    ])
+    assert eids(merged) == ["1", "2"]
+    first, second = merged["Stages"][0]["Events"]
+    assert first["Eps"] == "FT" and second["Eps"] == "45'"
+
+def test_events_without_an_eid_are_dropped_not_merged_by_position():
+    merger = ScheduleMerger()
+    merger.add(day(("s1", [event(None, "FT", "1", "0"), event("1")])))
+    merger.add(day(("s1", [event(None, "NS"), event("2")]), ("s2", [event(None)])))
+    merged = merger.result()
+    assert eids(merged) == ["1", "2"]
+    assert merger.dropped == 3
+
+def test_merged_schedule_survives_compact_records():
+    merger = ScheduleMerger()
+    merger.add(day(("s1", [event("1"), event(None)]), ("s2", [event("2", "FT", "3", "3")])))
+    merged = merger.result()
+    # what the scraper writes holds every event the merger kept
+    assert eids(expand_schedule(compact_schedule(merged))) == eids(merged) == ["1", "2"]
+
+def test_fill_only_adds_days_without_a_fresh_feed():
+    merger = ScheduleMerger()
+    merger.add(day(("s1", [event("1")])))
+    previous = day(("s1", [event("1", "FT"), event("2", esd="20251017190000"), event("3", esd="20251018190000")]))
+    merger.fill(previous, {"20251017"})
+    assert eids(merger.result()) == ["1", "2"]
+    assert merger.result()["Stages"][0]["Events"][0]["Eps"] == "NS"
@@ -0,0 +1,53 @@
+import os
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from search import AmbiguousName, NameIndex, build_name_index
+
+TEAMS = {
+    "premier-league": ("Man City", "Man Utd", "Arsenal", "Newcastle"),
+    "uefa-champions-league": ("Arsenal", "Newcastle"),
+}
+
+def name_index():
+    league_fixtures = {
+        feed: [{"HomeTeam": a, "AwayTeam": b} for a, b in zip(teams, teams[1:])] for feed, teams in TEAMS.items()
+    }
+    team_index = {}
+    for feed, teams in TEAMS.items():
+        prefix = "cl-" if feed == "uefa-champions-league" else ""
+        for team in teams:
+            team_index[prefix + team.lower().replace(" ", "-")] = {"league": feed, "team": team}
+    return build_name_index(league_fixtures, team_index, None)
+
+@pytest.fixture
+def index():
+    return NameIndex(name_index())
+
+def test_a_clear_best_match_resolves(index):
+    assert index.resolve("man city", "team")["slug"] == "man-city"
+    assert index.resolve("Manchester United", "team")["slug"] == "man-utd"
+    assert index.resolve("premier league", "league")["slug"] == "premier-league"
+
+def test_an_ambiguous_prefix_lists_the_candidates(index):
+    with pytest.raises(AmbiguousName) as error:
+        index.resolve("man", "team")
+    assert {m["slug"] for m in error.value.matches} == {"man-city", "man-utd"}
+
+def test_the_same_team_in_two_leagues_needs_the_league(index):
+    with pytest.raises(AmbiguousName) as error:
+        index.resolve("Newcastle United", "team")
+    assert {m["league"] for m in error.value.matches} == set(TEAMS)
+    assert index.resolve("Newcastle United", "team", "uefa-champions-league")["slug"] == "cl-newcastle"
+
+def test_ambiguous_route_answers_409_with_the_matches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    with open(api.NAME_INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump(name_index(), f)
+    response = TestClient(api.app).get("/api/fixtures/premier-league/man")
+    assert response.status_code == 409
+    assert {m["slug"] for m in response.json()["detail"]["matches"]} == {"man-city", "man-utd"}
@@ -0,0 +1,56 @@
+import os
+import json
+
+import pytest
+
+from standings import StandingsTable, compute_standings, standings_feed
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATS = ("rank", "games", "wins", "draws", "losses", "goalsFor", "goalsAgainst", "points")
+
+def load(folder, name):
+    with open(os.path.join(REPO, "data", folder, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def fixture(number, home, away, home_score=None, away_score=None, round_number=1):
+    return {"MatchNumber": number, "RoundNumber": round_number, "HomeTeam": home, "AwayTeam": away,
+            "HomeTeamScore": home_score, "AwayTeamScore": away_score}
+
+@pytest.mark.parametrize("league", ["ligue-1", "por-primeira-liga"])
+def test_computed_table_matches_the_scraped_one(league):
+    # both were scraped the same day; the scraped table spells team names its own way
+    # ("Paris SG", "Famalicao"), so rows are compared by position and numbers
+    scraped = load("standings", league)
+    computed = compute_standings(load("league_fixtures", standings_feed(league)))
+    assert [[int(row[k]) for k in STATS] for row in scraped] == [[row[k] for k in STATS] for row in computed[:len(scraped)]]
+
+def test_ties_break_on_goal_difference_then_goals_scored_then_name():
+    table = compute_standings([
+        fixture(1, "Alpha", "Delta", 3, 1),  # Alpha: 3 pts, +2, 3 scored
+        fixture(2, "Bravo", "Echo", 4, 2),   # Bravo: 3 pts, +2, 4 scored
+        fixture(3, "Charlie", "Foxtrot", 2, 0),  # Charlie: 3 pts, +2, 2 scored
+        fixture(4, "Golf", "Hotel", 1, 1),
+        fixture(5, "India", "Juliet"),
+    ])
+    assert [row["team"]["name"] for row in table] == [
+        "Bravo", "Alpha", "Charlie", "Golf", "Hotel", "India", "Juliet", "Echo", "Delta", "Foxtrot",
+    ]
+    assert [row["rank"] for row in table] == list(range(1, 11))
+    assert table[3]["points"] == table[4]["points"] == 1
+    # teams without a result yet are listed with an empty record
+    assert table[5]["games"] == 0
+
+def test_incremental_updates_match_a_full_recompute():
+    fixtures = [fixture(1, "A", "B", 1, 0), fixture(2, "C", "D", 0, 0), fixture(3, "A", "C", round_number=2)]
+    table = StandingsTable()
+    table.update(fixtures)
+    # a corrected score, a withdrawn result and a newly played match
+    fixtures = [fixture(1, "A", "B", 1, 2), fixture(2, "C", "D"), fixture(3, "A", "C", 2, 2, round_number=2)]
+    assert table.update(fixtures) == 3
+    assert table.rows() == compute_standings(fixtures)
+    assert table.update(fixtures) == 0
+
+def test_as_of_round_ignores_later_rounds():
+    fixtures = [fixture(1, "A", "B", 1, 0), fixture(2, "B", "A", 3, 0, round_number=2)]
+    first = {row["team"]["name"]: row["points"] for row in compute_standings(fixtures, as_of_round=1)}
+    assert first == {"A": 3, "B": 0}
@@ -0,0 +1,39 @@
+import os
+import json
+
+from store import Store
+from records import CompactSchedule, compact_schedule, encode_schedule
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def day_schedule():
+    schedules = os.path.join(REPO, "data", "schedules")
+    with open(os.path.join(schedules, sorted(os.listdir(schedules))[-1]), encoding="utf-8") as f:
+        return compact_schedule(json.load(f))
+
+def live_patched(data):
+    # what a live tick writes: an existing event updated and a new one with new teams upserted
+    schedule = CompactSchedule.load(data)
+    stage = {"Sid": "new-stage", "Cid": "1", "Snm": "New League", "Cnm": "Nowhere"}
+    schedule.upsert(stage, {"Eid": "new-1", "T1": [{"Nm": "Home FC"}], "T2": [{"Nm": "Away FC"}], "Eps": "NS"})
+    first = data["events"][0]
+    row = data["stages"][first[1]]
+    schedule.upsert(
+        {"Sid": row[0], "Cid": row[1], "Snm": row[2], "Cnm": row[3]},
+        {"Eid": first[0], "T1": [{"Nm": "Renamed United"}], "T2": [{"Nm": data["teams"][first[3]]}], "Eps": "HT"},
+    )
+    return schedule.to_json()
+
+def test_import_then_export_gives_back_the_scraper_files(tmp_path):
+    source = tmp_path / "source" / "schedules"
+    source.mkdir(parents=True)
+    full = day_schedule()
+    files = {"20250101.json": encode_schedule(full), "20250102.json": encode_schedule(live_patched(full))}
+    for name, payload in files.items():
+        (source / name).write_bytes(payload)
+
+    store = Store(str(tmp_path / "goal2gol.db"))
+    store.import_json(str(tmp_path / "source"))
+    store.export_json(str(tmp_path / "export"))
+    for name, payload in files.items():
+        assert (tmp_path / "export" / "schedules" / name).read_bytes() == payload
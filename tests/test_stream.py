@@ -0,0 +1,28 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+from stream import LiveBroadcaster
+
+def match(match_id, home_score):
+    return {"matchId": match_id, "matchStatus": "1'", "homeScore": home_score, "awayScore": 0, "matchTime": None}
+
+def decode(payload):
+    event, data = payload.decode("utf-8").strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+def test_subscriber_before_first_load_gets_the_full_snapshot():
+    async def run():
+        broadcaster = LiveBroadcaster()
+        stream = broadcaster.stream()
+        assert decode(await anext(stream)) == ("snapshot", {"matches": []})
+
+        broadcaster.publish(SimpleNamespace(version=1, matches=[match(1, 0), match(2, 0)]))
+        event, data = decode(await asyncio.wait_for(anext(stream), 1))
+        assert event == "snapshot" and len(data["matches"]) == 2
+
+        broadcaster.publish(SimpleNamespace(version=2, matches=[match(1, 1), match(2, 0)]))
+        assert decode(await asyncio.wait_for(anext(stream), 1)) == ("delta", {"matches": [match(1, 1)]})
+        await stream.aclose()
+
+    asyncio.run(run())